@@ -2,8 +2,9 @@
 from django.contrib import admin
 from .models import (
     User, DoctorProfile, PatientProfile, Medicine,
-    Appointment, Prescription, PrescriptionItem,
-    ChatMessage, CallRecording,
+    Appointment, AppointmentSlot, WorkingHours, AvailabilityException,
+    Prescription, PrescriptionItem,
+    ChatMessage, CallRecording, RecordingUpload,
 )
 
 
@@ -41,6 +42,24 @@ class AppointmentAdmin(admin.ModelAdmin):
     search_fields = ['patient__first_name', 'doctor__user__first_name']
 
 
+@admin.register(AppointmentSlot)
+class AppointmentSlotAdmin(admin.ModelAdmin):
+    list_display = ['doctor', 'date', 'start_time', 'duration_minutes', 'appointment']
+    list_filter = ['date']
+
+
+@admin.register(WorkingHours)
+class WorkingHoursAdmin(admin.ModelAdmin):
+    list_display = ['doctor', 'weekday', 'start_time', 'end_time']
+    list_filter = ['weekday']
+
+
+@admin.register(AvailabilityException)
+class AvailabilityExceptionAdmin(admin.ModelAdmin):
+    list_display = ['doctor', 'date', 'kind', 'start_time', 'end_time']
+    list_filter = ['kind', 'date']
+
+
 @admin.register(Prescription)
 class PrescriptionAdmin(admin.ModelAdmin):
     list_display = ['id', 'doctor', 'patient', 'created_at']
@@ -60,4 +79,10 @@ class ChatMessageAdmin(admin.ModelAdmin):
 
 @admin.register(CallRecording)
 class CallRecordingAdmin(admin.ModelAdmin):
-    list_display = ['appointment', 'duration_seconds', 'file_size', 'created_at']
+    list_display = ['appointment', 'duration_seconds', 'file_size', 'processing_status', 'created_at']
+    list_filter = ['processing_status']
+
+
+@admin.register(RecordingUpload)
+class RecordingUploadAdmin(admin.ModelAdmin):
+    list_display = ['id', 'appointment', 'owner', 'received', 'total_size', 'updated_at']
@@ -6,3 +6,6 @@ class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
     verbose_name = 'Virtual Hospital API'
+
+    def ready(self):
+        from . import checks, signals  # noqa: F401  (registers the system checks and cache invalidation receivers)
@@ -0,0 +1,145 @@
+"""
+Async read endpoints for ASGI deployments (ASYNC_READ_VIEWS).
+
+The doctor directory, medicine list, appointment list and chat history are
+served by coroutines that fetch through Django's async ORM, so under an ASGI
+server a slow query parks the request instead of holding a worker thread.
+
+Each endpoint reuses its DRF view class for authentication, permissions,
+querysets and serializers; only the I/O is awaited. Authentication runs in
+a worker thread, since tokens issued without claims load the User row. Any
+method other than GET is handed to the regular synchronous view, so writes
+behave exactly as under WSGI.
+"""
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import status
+from rest_framework.exceptions import APIException, AuthenticationFailed, NotAuthenticated
+from rest_framework.renderers import JSONRenderer
+
+from .authentication import ClaimsJWTAuthentication
+from .caching import doctor_directory_key
+from .serializers import AppointmentRowSerializer, ChatMessageSerializer
+from .views import (
+    CHAT_SINCE_ERROR, AppointmentViewSet, DoctorListView, MedicineViewSet,
+    chat_history, chat_messages, chat_paginator, doctor_directory_response,
+    doctor_directory_snapshot,
+)
+
+
+def async_read_view(fallback):
+    """Serve GET with the decorated coroutine and other methods with `fallback`."""
+    fallback = sync_to_async(fallback)
+
+    def decorator(handler):
+        @csrf_exempt
+        @wraps(handler)
+        async def view(request, *args, **kwargs):
+            if request.method != 'GET':
+                return await fallback(request, *args, **kwargs)
+            try:
+                return await handler(request, *args, **kwargs)
+            except APIException as exc:
+                return _error_response(request, exc)
+        return view
+    return decorator
+
+
+async def _init_view(view_class, request, action=None, **kwargs):
+    """Set up a DRF view for `request` and run its auth and permission checks.
+
+    Returns the view; its `request` attribute is the wrapped DRF request.
+    """
+    view = view_class()
+    view.args, view.kwargs = (), kwargs
+    view.format_kwarg = None
+    view.headers = {}
+    if action:
+        view.action_map = {'get': action}
+    view.request = view.initialize_request(request, **kwargs)
+
+    await sync_to_async(_authorize)(view)
+    return view
+
+
+def _authorize(view):
+    # In one worker-thread hop: a token minted before claims were embedded
+    # loads the User row, as may permissions reading fields beyond the claims
+    view.perform_authentication(view.request)
+    view.check_permissions(view.request)
+
+
+def _render(data, status_code=status.HTTP_200_OK, headers=None):
+    return HttpResponse(JSONRenderer().render(data), status=status_code,
+                        content_type='application/json', headers=headers)
+
+
+def _error_response(request, exc):
+    """Mirror DRF's exception handler for the errors these views can raise."""
+    data = exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail}
+    headers = {}
+    if isinstance(exc, (NotAuthenticated, AuthenticationFailed)):
+        headers['WWW-Authenticate'] = ClaimsJWTAuthentication().authenticate_header(request)
+    if getattr(exc, 'wait', None):
+        headers['Retry-After'] = str(int(exc.wait))
+    return _render(data, exc.status_code, headers)
+
+
+# ─── Doctors ──────────────────────────────────────────────────────────────────
+
+@async_read_view(DoctorListView.as_view())
+async def doctor_list(request):
+    view = await _init_view(DoctorListView, request)
+    search = view.request.query_params.get('search', '')
+    key = await sync_to_async(doctor_directory_key)(request.build_absolute_uri('/'), search)
+    snapshot = await cache.aget(key)
+    if snapshot is None:
+        # Ranking may rebuild the in-memory search index, which is sync ORM work
+        queryset = await sync_to_async(view.filter_queryset)(view.get_queryset())
+        doctors = [doctor async for doctor in queryset]
+        snapshot = doctor_directory_snapshot(view.get_serializer(doctors, many=True).data)
+        await cache.aset(key, snapshot, settings.DOCTOR_DIRECTORY_CACHE_TTL)
+    return doctor_directory_response(request, snapshot)
+
+
+# ─── Appointments ─────────────────────────────────────────────────────────────
+
+@async_read_view(AppointmentViewSet.as_view({'get': 'list', 'post': 'create'}))
+async def appointment_list(request):
+    view = await _init_view(AppointmentViewSet, request, action='list')
+    queryset = AppointmentRowSerializer.rows(view.filter_queryset(view.get_queryset()))
+    page = await view.paginator.apaginate_queryset(queryset, view.request, view=view)
+    return _render({
+        'next': view.paginator.get_next_link(),
+        'results': AppointmentRowSerializer(page, many=True).data,
+    })
+
+
+# ─── Medicines ────────────────────────────────────────────────────────────────
+
+@async_read_view(MedicineViewSet.as_view({'get': 'list', 'post': 'create'}))
+async def medicine_list(request):
+    view = await _init_view(MedicineViewSet, request, action='list')
+    queryset = await sync_to_async(view.filter_queryset)(view.get_queryset())
+    medicines = [medicine async for medicine in queryset]
+    return _render(view.get_serializer(medicines, many=True).data)
+
+
+# ─── Chat Messages ───────────────────────────────────────────────────────────
+
+@async_read_view(chat_history)
+async def chat_history_list(request, appointment_id):
+    view = await _init_view(chat_history.cls, request, appointment_id=appointment_id)
+    messages = chat_messages(appointment_id, view.request.query_params.get('since'))
+    if messages is None:
+        return _render({'since': CHAT_SINCE_ERROR}, status.HTTP_400_BAD_REQUEST)
+
+    paginator = chat_paginator(view.request)
+    page = await paginator.apaginate_queryset(messages, view.request)
+    serializer = ChatMessageSerializer(page, many=True, context={'request': view.request})
+    return _render({'next': paginator.get_next_link(), 'results': serializer.data})
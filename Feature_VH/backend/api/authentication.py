@@ -0,0 +1,130 @@
+"""
+Stateless JWT authentication for the Virtual Hospital API.
+
+Access tokens carry the user's role, username, display name and superuser
+flag as claims (see `tokens_for_user`). `ClaimsJWTAuthentication` turns a
+validated token into a `ClaimsUser` that answers those fields from the token
+and only loads the User row when a view touches anything else, so the role
+checks in permissions.py cost no query.
+
+Claims are fixed when the token is issued: a role change or deactivation
+takes effect when the user next logs in or the access token expires. Views
+that do load the row still reject deleted and inactive users with 401, as do
+tokens issued without the claims, which load it up front.
+"""
+from django.utils.functional import SimpleLazyObject, empty
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .models import User
+
+# Claims embedded at login/registration and the user attributes they mirror
+USER_CLAIMS = ('role', 'username', 'name', 'is_superuser')
+
+
+def tokens_for_user(user):
+    """Issue a refresh token whose access token carries the USER_CLAIMS."""
+    refresh = RefreshToken.for_user(user)
+    refresh['role'] = user.role
+    refresh['username'] = user.username
+    refresh['name'] = user.get_full_name() or user.username
+    refresh['is_superuser'] = user.is_superuser
+    return refresh
+
+
+def _active_user(user_id):
+    """The User row for a token, refused like JWTAuthentication refuses it."""
+    try:
+        user = User.objects.get(**{api_settings.USER_ID_FIELD: user_id})
+    except User.DoesNotExist:
+        raise AuthenticationFailed('User not found', code='user_not_found')
+    if not user.is_active:
+        raise AuthenticationFailed('User is inactive', code='user_inactive')
+    return user
+
+
+class ClaimsUser(SimpleLazyObject):
+    """A User whose common fields come from token claims.
+
+    Anything not covered by a claim (including isinstance checks and use as
+    a foreign key value) loads and delegates to the real User row, raising
+    AuthenticationFailed if it is gone or inactive.
+    """
+
+    def __init__(self, token):
+        user_id = token[api_settings.USER_ID_CLAIM]
+        super().__init__(lambda: _active_user(user_id))
+        self.__dict__['_claims'] = token.payload
+        self.__dict__['_user_id'] = user_id
+
+    def _claim(self, name):
+        claims = self.__dict__['_claims']
+        if name in claims:
+            return claims[name]
+        # Token issued before the claim existed: fall back to the row
+        return getattr(self._loaded(), name)
+
+    def _loaded(self):
+        if self._wrapped is empty:
+            self._setup()
+        return self._wrapped
+
+    @property
+    def has_claims(self):
+        """Whether the token carries every USER_CLAIMS entry (no row needed)."""
+        claims = self.__dict__['_claims']
+        return all(name in claims for name in USER_CLAIMS)
+
+    @property
+    def id(self):
+        return self.__dict__['_user_id']
+
+    @property
+    def pk(self):
+        return self.__dict__['_user_id']
+
+    @property
+    def role(self):
+        return self._claim('role')
+
+    @property
+    def username(self):
+        return self._claim('username')
+
+    @property
+    def is_superuser(self):
+        return self._claim('is_superuser')
+
+    @property
+    def display_name(self):
+        claims = self.__dict__['_claims']
+        if 'name' in claims:
+            return claims['name']
+        user = self._loaded()
+        return user.get_full_name() or user.username
+
+    @property
+    def is_authenticated(self):
+        return True
+
+    @property
+    def is_anonymous(self):
+        return False
+
+    def __bool__(self):
+        return True
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """JWT authentication that builds the user from claims instead of a query."""
+
+    def get_user(self, validated_token):
+        if api_settings.USER_ID_CLAIM not in validated_token:
+            raise InvalidToken('Token contained no recognizable user identification')
+        user = ClaimsUser(validated_token)
+        if not user.has_claims:
+            # Issued before the claims existed: check the row now, as before
+            user._loaded()
+        return user
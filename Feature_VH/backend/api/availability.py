@@ -0,0 +1,189 @@
+"""
+Doctor availability calendar and its materialized free/busy bitmaps.
+
+A doctor's working time on a date is their WorkingHours for that weekday
+(or the default day from settings when they have none), adjusted by that
+date's AvailabilityExceptions. DoctorDay stores, per doctor and day, which
+slots of that time are still free as a bitmask, so questions like "which
+cardiologists are free Thursday afternoon" are one indexed lookup on
+(speciality, date) plus a bitwise test, with no scan of appointments.
+
+The bitmaps are kept current incrementally:
+
+* booking a slot clears its bit with a conditional UPDATE (`claim`), which
+  also refuses slots outside working time or already taken;
+* freeing a slot sets the bit again if it is inside working time (`release`);
+* calendar or profile edits rebuild that doctor's days (`rebuild`);
+* the generate_slots command extends the horizon day by day.
+"""
+from collections import defaultdict
+from datetime import time, timedelta
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections, router
+from django.db.models import F
+from django.utils import timezone
+
+from .models import AppointmentSlot, AvailabilityException, DoctorDay, DoctorProfile, WorkingHours
+
+# Bits available in DoctorDay.free_mask (a signed 64-bit column)
+MAX_SLOTS_PER_DAY = 63
+
+
+def slots_per_day():
+    count = 24 * 60 // settings.APPOINTMENT_SLOT_MINUTES
+    if count > MAX_SLOTS_PER_DAY:
+        raise ImproperlyConfigured('APPOINTMENT_SLOT_MINUTES must be at least 23 to fit a day in 63 bits.')
+    return count
+
+
+def _minutes(value):
+    return value.hour * 60 + value.minute
+
+
+def slot_bit(start_time):
+    return 1 << (_minutes(start_time) // settings.APPOINTMENT_SLOT_MINUTES)
+
+
+def range_mask(start=None, end=None):
+    """Bits of the slots that lie wholly within [start, end) (whole day by default)."""
+    size = settings.APPOINTMENT_SLOT_MINUTES
+    first = -(-_minutes(start) // size) if start else 0
+    # An end of 00:00 means midnight at the end of the day
+    last = _minutes(end) // size if end and end != time(0) else slots_per_day()
+    return sum(1 << i for i in range(first, min(last, slots_per_day())))
+
+
+def slot_times(mask):
+    """Start times of the slots set in mask."""
+    size = settings.APPOINTMENT_SLOT_MINUTES
+    return [time(*divmod(i * size, 60)) for i in range(slots_per_day()) if mask >> i & 1]
+
+
+def working_mask(day, hours, exceptions):
+    """Slots of `day` inside working time.
+
+    `hours` maps weekday -> [(start, end)] (None: use the default working
+    day), `exceptions` is that date's AvailabilityExceptions.
+    """
+    if hours is None:
+        windows = ([(settings.APPOINTMENT_DAY_START, settings.APPOINTMENT_DAY_END)]
+                   if day.weekday() in settings.APPOINTMENT_WORKING_DAYS else [])
+    else:
+        windows = hours.get(day.weekday(), [])
+    mask = 0
+    for start, end in windows:
+        mask |= range_mask(start, end)
+    for exc in exceptions:
+        window = range_mask(exc.start_time, exc.end_time)
+        mask = mask | window if exc.kind == 'extra' else mask & ~window
+    return mask
+
+
+def _calendars(doctor_ids, dates):
+    """Working hours and exceptions of many doctors in two queries."""
+    hours = defaultdict(lambda: defaultdict(list))
+    for row in WorkingHours.objects.filter(doctor_id__in=doctor_ids).values_list(
+            'doctor_id', 'weekday', 'start_time', 'end_time'):
+        hours[row[0]][row[1]].append((row[2], row[3]))
+    exceptions = defaultdict(list)
+    for exc in AvailabilityException.objects.filter(doctor_id__in=doctor_ids, date__in=dates):
+        exceptions[exc.doctor_id, exc.date].append(exc)
+    return hours, exceptions
+
+
+def _conflict_target():
+    """unique_fields for the upsert; MySQL's ON DUPLICATE KEY UPDATE takes none
+    and relies on the (doctor, date) unique index instead."""
+    features = connections[router.db_for_write(DoctorDay)].features
+    return ['doctor', 'date'] if features.supports_update_conflicts_with_target else None
+
+
+def rebuild(doctor_ids=None, start=None, days=None, batch=500):
+    """Recompute DoctorDay rows for the doctors over [start, start + days).
+
+    Defaults to every doctor over AVAILABILITY_HORIZON_DAYS from today.
+    Returns the number of rows written.
+    """
+    start = start or timezone.localdate()
+    days = settings.AVAILABILITY_HORIZON_DAYS if days is None else days
+    dates = [start + timedelta(days=n) for n in range(days)]
+    doctors = DoctorProfile.objects.order_by('pk')
+    if doctor_ids is not None:
+        doctors = doctors.filter(pk__in=doctor_ids)
+    doctors = list(doctors.values_list('pk', 'speciality', 'available'))
+
+    written = 0
+    for offset in range(0, len(doctors), batch):
+        chunk = doctors[offset:offset + batch]
+        ids = [pk for pk, _, _ in chunk]
+        hours, exceptions = _calendars(ids, dates)
+        booked = defaultdict(int)
+        for doctor_id, day, start_time in AppointmentSlot.objects.filter(
+                doctor_id__in=ids, date__in=dates, appointment__isnull=False).values_list(
+                'doctor_id', 'date', 'start_time'):
+            booked[doctor_id, day] |= slot_bit(start_time)
+
+        rows = []
+        for doctor_id, speciality, available in chunk:
+            calendar = hours.get(doctor_id)
+            for day in dates:
+                mask = 0
+                if available:
+                    mask = working_mask(day, calendar, exceptions[doctor_id, day]) & ~booked[doctor_id, day]
+                rows.append(DoctorDay(doctor_id=doctor_id, date=day, speciality=speciality, free_mask=mask))
+        DoctorDay.objects.bulk_create(
+            rows, batch_size=1000, update_conflicts=True,
+            unique_fields=_conflict_target(), update_fields=['speciality', 'free_mask'],
+        )
+        written += len(rows)
+    return written
+
+
+def _ensure_day(doctor_id, day):
+    if not DoctorDay.objects.filter(doctor_id=doctor_id, date=day).exists():
+        rebuild([doctor_id], day, 1)
+
+
+def claim(doctor_id, day, start_time):
+    """Mark a slot busy; False if it is outside working time or already taken.
+
+    The bit is tested and cleared in one UPDATE, so concurrent claims of the
+    same slot cannot both succeed.
+    """
+    _ensure_day(doctor_id, day)
+    bit = slot_bit(start_time)
+    return bool(
+        DoctorDay.objects.filter(doctor_id=doctor_id, date=day)
+        .alias(slot=F('free_mask').bitand(bit)).filter(slot=bit)
+        .update(free_mask=F('free_mask') - bit)
+    )
+
+
+def release(doctor_id, day, start_time):
+    """Mark a slot free again if it lies inside the doctor's working time."""
+    available = DoctorProfile.objects.filter(pk=doctor_id).values_list('available', flat=True).first()
+    hours, exceptions = _calendars([doctor_id], [day])
+    bit = slot_bit(start_time)
+    if not available or not working_mask(day, hours.get(doctor_id), exceptions[doctor_id, day]) & bit:
+        return
+    (DoctorDay.objects.filter(doctor_id=doctor_id, date=day)
+     .alias(slot=F('free_mask').bitand(bit)).filter(slot=0)
+     .update(free_mask=F('free_mask') + bit))
+
+
+def free_doctors(speciality, date_from, date_to=None, start=None, end=None):
+    """Doctor days with at least one free slot in [start, end) on each date.
+
+    Returns (DoctorDay, [free start times]) pairs ordered by date, with the
+    doctor and user joined in.
+    """
+    mask = range_mask(start, end)
+    days = (
+        DoctorDay.objects.filter(speciality=speciality, date__range=(date_from, date_to or date_from))
+        .alias(window=F('free_mask').bitand(mask)).exclude(window=0)
+        .select_related('doctor__user').order_by('date', 'doctor_id')
+    )
+    return [(day, slot_times(day.free_mask & mask)) for day in days]
+
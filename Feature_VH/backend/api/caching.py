@@ -0,0 +1,34 @@
+"""
+Cache keys and invalidation helpers for cached API responses.
+"""
+import hashlib
+
+from django.core.cache import cache
+
+ADMIN_STATS_KEY = 'api:admin_stats'
+DOCTOR_DIRECTORY_VERSION_KEY = 'api:doctors:version'
+
+
+def invalidate_admin_stats():
+    """Drop the cached admin dashboard stats."""
+    cache.delete(ADMIN_STATS_KEY)
+
+
+def doctor_directory_key(base_url: str, search: str) -> str:
+    """Snapshot key for one rendering of the doctor directory.
+
+    Keys embed a version number, so bumping it invalidates every cached
+    search term at once. The base URL is part of the key because photo
+    URLs are absolute.
+    """
+    version = cache.get_or_set(DOCTOR_DIRECTORY_VERSION_KEY, 1, None)
+    digest = hashlib.sha1(f'{base_url}|{search}'.encode()).hexdigest()
+    return f'api:doctors:v{version}:{digest}'
+
+
+def invalidate_doctor_directory():
+    """Retire every cached doctor directory snapshot."""
+    try:
+        cache.incr(DOCTOR_DIRECTORY_VERSION_KEY)
+    except ValueError:
+        cache.set(DOCTOR_DIRECTORY_VERSION_KEY, 1, None)
@@ -0,0 +1,21 @@
+"""
+System checks for the api app.
+"""
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+
+@register(Tags.caches)
+def shared_cache_check(app_configs, **kwargs):
+    """Warn when production runs on per-process caches."""
+    if settings.DEBUG or settings.SHARED_CACHE:
+        return []
+    return [Warning(
+        'No shared cache is configured (REDIS_URL is unset), so each worker process '
+        'keeps its own cache.',
+        hint='Set REDIS_URL. Until then, other workers only pick up writes once their '
+             'copies expire: search indexes after SEARCH_INDEX_MAX_AGE seconds, the '
+             'doctor directory after DOCTOR_DIRECTORY_CACHE_TTL and the admin stats '
+             'after ADMIN_STATS_CACHE_TTL.',
+        id='api.W001',
+    )]
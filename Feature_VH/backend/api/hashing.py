@@ -0,0 +1,53 @@
+"""
+Bounded password verification for the login endpoint.
+
+The password hasher is deliberately slow, so unbounded concurrent logins can
+pin every worker core. Verification runs on a small thread pool instead
+(OpenSSL's PBKDF2 releases the GIL, so the pool caps real CPU use), and an
+admission semaphore rejects attempts outright once the pool and its short
+queue are full, keeping latency predictable for the logins that are admitted.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+from django.conf import settings
+from django.contrib.auth.hashers import check_password
+
+
+class HasherBusy(Exception):
+    """Raised when the hasher pool cannot take or finish an attempt in time."""
+
+
+_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix='password-hash',
+)
+_slots = threading.BoundedSemaphore(settings.PASSWORD_HASH_WORKERS + settings.PASSWORD_HASH_QUEUE)
+
+
+def _verify(raw_password, encoded):
+    """Check the password; also report whether the stored hash needs upgrading."""
+    upgrade = []
+    ok = check_password(raw_password, encoded, setter=upgrade.append)
+    return ok, bool(upgrade)
+
+
+def verify_password(user, raw_password):
+    """Check raw_password against user on the bounded hasher pool.
+
+    Rehashing (when the hasher settings changed) happens here on the request
+    thread so the pool threads never touch the database.
+    """
+    if not _slots.acquire(blocking=False):
+        raise HasherBusy()
+    # The slot is held until the hash finishes, even if we stop waiting for it
+    future = _executor.submit(_verify, raw_password, user.password)
+    future.add_done_callback(lambda _: _slots.release())
+    try:
+        ok, upgrade = future.result(timeout=settings.PASSWORD_HASH_TIMEOUT)
+    except TimeoutError:
+        raise HasherBusy()
+
+    if ok and upgrade:
+        user.set_password(raw_password)
+        user.save(update_fields=['password'])
+    return ok
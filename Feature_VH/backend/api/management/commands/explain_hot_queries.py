@@ -0,0 +1,110 @@
+"""
+Run EXPLAIN on the hot queries issued by api/views.py, api/slots.py and
+api/availability.py and fail if any of them is planned as a full table scan.
+Usage: python manage.py explain_hot_queries [-v 2]
+
+HotQueryPlanTests in api/tests.py runs the same check in the test suite,
+where SQLite (which has no table statistics) plans from the indexes alone.
+Run the command against a database with production-like row counts too: on
+near-empty tables MySQL and PostgreSQL prefer a scan regardless of the
+available indexes.
+"""
+import re
+from datetime import date, datetime, time, timezone
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import F, Q
+
+from api.availability import range_mask
+from api.models import User, Appointment, AppointmentSlot, ChatMessage, DoctorDay
+from api.pagination import AppointmentPagination, ChatHistoryPagination, RecentChatPagination
+from api.serializers import AppointmentRowSerializer
+
+# Per-vendor patterns that identify a full scan of a table in EXPLAIN output
+FULL_SCAN_PATTERNS = {
+    'sqlite': re.compile(r'\bSCAN (?!.*\bUSING\b.*\bINDEX\b)\w+', re.MULTILINE),
+    'mysql': re.compile(r'TableFullScan|\bALL\b'),
+    'postgresql': re.compile(r'Seq Scan'),
+}
+
+
+# Placeholder values; EXPLAIN only cares about the query shape
+DAY = date(2000, 1, 1)
+MOMENT = datetime(2000, 1, 1, tzinfo=timezone.utc)
+
+
+def _keyset_pages(name, queryset, paginator):
+    """First and following keyset pages of `queryset`, as the paginator runs them."""
+    first = queryset.order_by(*paginator.ordering)
+    placeholders = {'date': DAY, 'created_at': MOMENT, 'timestamp': MOMENT}
+    key = [placeholders.get(field, 1) for field, _ in paginator.key_fields()]
+    return [
+        (f'{name}: first page', first[:paginator.page_size + 1]),
+        (f'{name}: next page', first.filter(paginator.after(key))[:paginator.page_size + 1]),
+    ]
+
+
+def hot_queries():
+    """(name, queryset) pairs mirroring the lookups made by the API."""
+    appointments = Appointment.objects.select_related('patient', 'doctor__user')
+    messages = ChatMessage.objects.filter(appointment_id=1).select_related('sender')
+    return [
+        *_keyset_pages('appointments: doctor list',
+                       AppointmentRowSerializer.rows(appointments.filter(doctor__user_id=1)),
+                       AppointmentPagination()),
+        *_keyset_pages('appointments: patient list',
+                       AppointmentRowSerializer.rows(appointments.filter(patient_id=1)),
+                       AppointmentPagination()),
+        ('appointments: status filter',
+         appointments.filter(status__in=['pending']).order_by(*AppointmentPagination.ordering)),
+        ('appointments: changed since',
+         appointments.filter(updated_at__gt=MOMENT).order_by(*AppointmentPagination.ordering)),
+        ('token_auth: username or email',
+         User.objects.filter(Q(username='login') | Q(email='login'))),
+        *_keyset_pages('chat_history', messages, ChatHistoryPagination()),
+        *_keyset_pages('chat_history: latest', messages, RecentChatPagination()),
+        ('chat_history: since message id',
+         messages.filter(id__gt=1).order_by(*ChatHistoryPagination.ordering)),
+        ('slots: claim doctor day',
+         DoctorDay.objects.filter(doctor_id=1, date=DAY)
+         .alias(slot=F('free_mask').bitand(1)).filter(slot=1)),
+        ('slots: reserve slot',
+         AppointmentSlot.objects.filter(doctor_id=1, date=DAY, start_time=time(9),
+                                        appointment__isnull=True)),
+        ('slots: release',
+         AppointmentSlot.objects.filter(appointment_id=1)),
+        ('slots: next available',
+         DoctorDay.objects.filter(doctor_id=1, date__gte=DAY, free_mask__gt=0)
+         .order_by('date').only('date', 'free_mask')),
+        ('availability: free doctors',
+         DoctorDay.objects.filter(speciality='General', date__range=(DAY, DAY))
+         .alias(window=F('free_mask').bitand(range_mask())).exclude(window=0)
+         .select_related('doctor__user').order_by('date', 'doctor_id')),
+        ('availability: booked slots of rebuilt doctors',
+         AppointmentSlot.objects.filter(doctor_id__in=[1], date__in=[DAY], appointment__isnull=False)
+         .values_list('doctor_id', 'date', 'start_time')),
+    ]
+
+
+class Command(BaseCommand):
+    help = 'EXPLAIN the hot API queries and fail if any regresses to a full table scan'
+
+    def handle(self, *args, **options):
+        pattern = FULL_SCAN_PATTERNS.get(connection.vendor)
+        if pattern is None:
+            raise CommandError(f'No full-scan detection for database vendor "{connection.vendor}".')
+
+        regressions = []
+        for name, queryset in hot_queries():
+            plan = queryset.explain()
+            if pattern.search(plan):
+                regressions.append(name)
+                self.stdout.write(self.style.ERROR(f'  ✗ {name}: full table scan'))
+            else:
+                self.stdout.write(self.style.SUCCESS(f'  ✓ {name}'))
+            if options['verbosity'] > 1:
+                self.stdout.write(f'      {plan}'.replace('\n', '\n      '))
+
+        if regressions:
+            raise CommandError(f'{len(regressions)} hot quer{"y" if len(regressions) == 1 else "ies"} regressed to a full scan.')
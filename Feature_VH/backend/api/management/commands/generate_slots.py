@@ -0,0 +1,27 @@
+"""
+Rebuild the doctors' availability bitmaps for the coming days, so the
+calendar horizon keeps moving forward.
+Usage: python manage.py generate_slots [--days N]  (default AVAILABILITY_HORIZON_DAYS)
+
+Run it daily (cron / scheduler). Slot rows are created only when a slot is
+booked, so this writes one DoctorDay row per doctor and day, not one row per
+free slot.
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from api import availability
+
+
+class Command(BaseCommand):
+    help = 'Refresh doctor availability for the coming days'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=None,
+                            help='How many days ahead to fill (default AVAILABILITY_HORIZON_DAYS)')
+
+    def handle(self, *args, **options):
+        days = options['days'] or settings.AVAILABILITY_HORIZON_DAYS
+        written = availability.rebuild(start=timezone.localdate(), days=days)
+        self.stdout.write(self.style.SUCCESS(f'Refreshed {written} doctor day(s).'))
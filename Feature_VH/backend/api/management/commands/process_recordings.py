@@ -0,0 +1,39 @@
+"""
+Run post-processing for call recordings that have not been processed yet
+(e.g. recordings stored before the pipeline existed, failed runs, or runs
+lost when their web process restarted or crashed).
+Usage: python manage.py process_recordings [--failed] [--stale-after SECONDS]
+"""
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from django.utils import timezone
+
+from api import processing
+from api.models import CallRecording
+
+
+class Command(BaseCommand):
+    help = 'Process pending call recordings and wait for them to finish'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--failed', action='store_true', help='Also retry failed recordings')
+        parser.add_argument('--stale-after', type=int, default=3600,
+                            help="Retry recordings still 'processing' after this many seconds (default 3600)")
+
+    def handle(self, *args, **options):
+        statuses = ['pending', 'failed'] if options['failed'] else ['pending']
+        stale = timezone.now() - timedelta(seconds=options['stale_after'])
+        ids = list(CallRecording.objects.filter(
+            Q(processing_status__in=statuses)
+            | Q(processing_status='processing', processing_started_at__lt=stale)
+            | Q(processing_status='processing', processing_started_at__isnull=True)
+        ).values_list('pk', flat=True))
+        futures = [f for f in (processing.submit(pk) for pk in ids) if f is not None]
+        for future in futures:
+            future.exception()
+        processing.shutdown()
+
+        done = CallRecording.objects.filter(pk__in=ids, processing_status='ready').count()
+        self.stdout.write(self.style.SUCCESS(f'Processed {done} of {len(ids)} recording(s).'))
@@ -0,0 +1,28 @@
+"""
+Delete chunked recording uploads that were abandoned before finalizing,
+together with their partial files.
+Usage: python manage.py purge_recording_uploads [--hours 24]
+"""
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from api import uploads
+from api.models import RecordingUpload
+
+
+class Command(BaseCommand):
+    help = 'Delete recording uploads that have not received a chunk recently'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=int, default=24,
+                            help='Purge uploads idle for longer than this (default 24)')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(hours=options['hours'])
+        stale = list(RecordingUpload.objects.filter(updated_at__lt=cutoff))
+        for upload in stale:
+            upload.delete()
+            uploads.discard(upload)
+        self.stdout.write(self.style.SUCCESS(f'Purged {len(stale)} stale upload(s).'))
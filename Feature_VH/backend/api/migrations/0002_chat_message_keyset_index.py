@@ -0,0 +1,17 @@
+# Generated by Django 5.1.5 on 2026-10-17 20:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='chatmessage',
+            index=models.Index(fields=['appointment', 'timestamp', 'id'], name='chat_appt_ts_id_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.1.5 on 2026-10-17 20:32
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_hot_query_indexes_squashed_0004_drop_last_login_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecordingUpload',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('filename', models.CharField(max_length=255)),
+                ('total_size', models.PositiveIntegerField(help_text='Declared file size in bytes')),
+                ('received', models.PositiveIntegerField(default=0, help_text='Bytes written so far (next chunk offset)')),
+                ('duration_seconds', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('appointment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recording_uploads', to='api.appointment')),
+                ('owner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recording_uploads', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'recording_uploads',
+            },
+        ),
+    ]
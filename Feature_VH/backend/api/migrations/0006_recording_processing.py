@@ -0,0 +1,23 @@
+# Generated by Django 5.1.5 on 2026-10-17 20:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_recording_uploads'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='callrecording',
+            name='processing_status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('processing', 'Processing'), ('ready', 'Ready'), ('failed', 'Failed')], default='pending', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='callrecording',
+            name='waveform',
+            field=models.JSONField(blank=True, default=list, help_text='Peak levels (0..1) for a preview'),
+        ),
+    ]
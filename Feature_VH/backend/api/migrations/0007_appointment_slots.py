@@ -0,0 +1,31 @@
+# Generated by Django 5.1.5 on 2026-10-17 20:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_recording_processing'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AppointmentSlot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('start_time', models.TimeField()),
+                ('duration_minutes', models.PositiveSmallIntegerField(default=30)),
+                ('appointment', models.OneToOneField(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='slot', to='api.appointment')),
+                ('doctor', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, related_name='slots', to='api.doctorprofile')),
+            ],
+            options={
+                'db_table': 'appointment_slots',
+                'ordering': ['date', 'start_time'],
+                'indexes': [models.Index(fields=['doctor', 'appointment', 'date', 'start_time'], name='slot_doctor_free_idx')],
+                'constraints': [models.UniqueConstraint(fields=('doctor', 'date', 'start_time'), name='slot_doctor_start_uniq')],
+            },
+        ),
+    ]
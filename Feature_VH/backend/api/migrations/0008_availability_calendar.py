@@ -0,0 +1,60 @@
+# Generated by Django 5.1.5 on 2026-10-17 20:38
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_appointment_slots'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WorkingHours',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('weekday', models.PositiveSmallIntegerField(choices=[(0, 'Monday'), (1, 'Tuesday'), (2, 'Wednesday'), (3, 'Thursday'), (4, 'Friday'), (5, 'Saturday'), (6, 'Sunday')])),
+                ('start_time', models.TimeField()),
+                ('end_time', models.TimeField()),
+                ('doctor', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, related_name='working_hours', to='api.doctorprofile')),
+            ],
+            options={
+                'db_table': 'doctor_working_hours',
+                'ordering': ['weekday', 'start_time'],
+            },
+        ),
+        migrations.CreateModel(
+            name='AvailabilityException',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('kind', models.CharField(choices=[('off', 'Time off'), ('extra', 'Extra hours')], default='off', max_length=10)),
+                ('start_time', models.TimeField(blank=True, null=True)),
+                ('end_time', models.TimeField(blank=True, null=True)),
+                ('note', models.CharField(blank=True, default='', max_length=255)),
+                ('doctor', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, related_name='availability_exceptions', to='api.doctorprofile')),
+            ],
+            options={
+                'db_table': 'doctor_availability_exceptions',
+                'ordering': ['date', 'start_time'],
+                'indexes': [models.Index(fields=['doctor', 'date'], name='avail_exc_doctor_date_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='DoctorDay',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('speciality', models.CharField(max_length=100)),
+                ('free_mask', models.BigIntegerField(default=0)),
+                ('doctor', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, related_name='days', to='api.doctorprofile')),
+            ],
+            options={
+                'db_table': 'doctor_days',
+                'indexes': [models.Index(fields=['speciality', 'date'], name='doctor_day_speciality_idx')],
+                'constraints': [models.UniqueConstraint(fields=('doctor', 'date'), name='doctor_day_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.1.5 on 2026-10-17 20:53
+
+from django.db import migrations, models
+
+
+def fill_normalized_names(apps, schema_editor):
+    Medicine = apps.get_model('api', 'Medicine')
+    medicines = list(Medicine.objects.only('pk', 'name'))
+    for medicine in medicines:
+        medicine.normalized_name = ' '.join(medicine.name.lower().split())
+    Medicine.objects.bulk_update(medicines, ['normalized_name'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_availability_calendar'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='medicine',
+            name='normalized_name',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=200),
+        ),
+        migrations.RunPython(fill_normalized_names, migrations.RunPython.noop),
+    ]
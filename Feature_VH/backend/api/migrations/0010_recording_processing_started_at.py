@@ -0,0 +1,18 @@
+# Generated by Django 5.1.5 on 2026-10-17 20:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_medicine_normalized_name'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='callrecording',
+            name='processing_started_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,52 @@
+from django.conf import settings
+from django.db import migrations
+from django.db.models import F
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+
+def backfill_slots(apps, schema_editor):
+    """Give upcoming appointments booked before slots existed their slot.
+
+    Each claims its AppointmentSlot row and clears its bit in an already
+    built DoctorDay bitmap, so the slot can no longer be booked again. Days
+    without a bitmap are built from the slot rows when first needed. Times
+    that are free-form or off the slot grid have no slot and are skipped, as
+    is the later of two appointments that share a slot.
+    """
+    from api.availability import slot_bit
+    from api.slots import parse_start
+
+    Appointment = apps.get_model('api', 'Appointment')
+    AppointmentSlot = apps.get_model('api', 'AppointmentSlot')
+    DoctorDay = apps.get_model('api', 'DoctorDay')
+
+    appointments = (Appointment.objects.filter(date__gte=timezone.localdate(), slot__isnull=True)
+                    .exclude(status='declined').order_by('created_at', 'pk')
+                    .values_list('pk', 'doctor_id', 'date', 'time'))
+    for pk, doctor_id, day, value in appointments.iterator():
+        try:
+            start = parse_start(value)
+        except ValidationError:
+            continue
+        slot, _ = AppointmentSlot.objects.get_or_create(
+            doctor_id=doctor_id, date=day, start_time=start,
+            defaults={'duration_minutes': settings.APPOINTMENT_SLOT_MINUTES})
+        if slot.appointment_id is not None:
+            continue
+        AppointmentSlot.objects.filter(pk=slot.pk).update(appointment_id=pk)
+        bit = slot_bit(start)
+        (DoctorDay.objects.filter(doctor_id=doctor_id, date=day)
+         .alias(slot=F('free_mask').bitand(bit)).filter(slot=bit)
+         .update(free_mask=F('free_mask') - bit))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_appointment_updated_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_slots, migrations.RunPython.noop),
+    ]
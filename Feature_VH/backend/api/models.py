@@ -1,14 +1,25 @@
 """
 Database models for the Virtual Hospital Platform.
 """
+import uuid
+
 from django.contrib.auth.models import AbstractUser
 from django.core.exceptions import ValidationError
 from django.db import models
 
+MAX_RECORDING_SIZE = 50 * 1024 * 1024  # 50 MB
+# File types accepted for call recordings
+RECORDING_EXTENSIONS = ('.webm', '.mp4', '.m4a', '.ogg', '.mkv', '.mp3', '.wav')
+
+
+def normalize_name(name):
+    """Case- and whitespace-insensitive form of a name."""
+    return ' '.join(name.lower().split()) if name else ''
+
 
 def validate_file_size_50mb(value):
     """Validate that uploaded file does not exceed 50 MB."""
-    max_size = 50 * 1024 * 1024  # 50 MB
+    max_size = MAX_RECORDING_SIZE
     if value.size > max_size:
         raise ValidationError(f'File size must not exceed 50 MB. Current size: {value.size / (1024*1024):.1f} MB.')
 
@@ -28,6 +39,10 @@ class User(AbstractUser):
 
     class Meta:
         db_table = 'users'
+        indexes = [
+            # token_auth looks users up by username OR email
+            models.Index(fields=['email'], name='users_email_idx'),
+        ]
 
     def __str__(self):
         return f"{self.get_full_name()} ({self.role})"
@@ -41,6 +56,8 @@ class Medicine(models.Model):
     price = models.DecimalField(max_digits=10, decimal_places=2, default=0.00)
     stock = models.PositiveIntegerField(default=0)
     image = models.ImageField(upload_to='medicines/', blank=True, null=True)
+    # normalize_name(name), for exact lookups by name
+    normalized_name = models.CharField(max_length=200, db_index=True, editable=False, default='')
 
     class Meta:
         db_table = 'medicines'
@@ -49,6 +66,13 @@ class Medicine(models.Model):
     def __str__(self):
         return f"{self.name} ({self.category})"
 
+    def save(self, *args, **kwargs):
+        self.normalized_name = normalize_name(self.name)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'name' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'normalized_name'}
+        super().save(*args, **kwargs)
+
 
 # ─── 2. Profile Models (Depend on User) ──────────────────────────────────────
 
@@ -64,12 +88,23 @@ class DoctorProfile(models.Model):
     available = models.BooleanField(default=True)
     image = models.ImageField(upload_to='doctors/', blank=True, null=True)
 
+    # (speciality, available) as last read or written, which the availability
+    # bitmaps were built from; None for unsaved or partially loaded rows
+    loaded_availability = None
+
     class Meta:
         db_table = 'doctor_profiles'
 
     def __str__(self):
         return f"Dr. {self.user.get_full_name()} – {self.speciality}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if 'speciality' in instance.__dict__ and 'available' in instance.__dict__:
+            instance.loaded_availability = (instance.speciality, instance.available)
+        return instance
+
 
 class PatientProfile(models.Model):
     """Extended profile for patients."""
@@ -129,11 +164,135 @@ class Appointment(models.Model):
     class Meta:
         db_table = 'appointments'
         ordering = ['-date', '-created_at']
+        indexes = [
+            # Per-role appointment lists, read newest-first
+            models.Index(fields=['doctor', 'date', 'created_at'], name='appt_doctor_date_idx'),
+            models.Index(fields=['patient', 'date', 'created_at'], name='appt_patient_date_idx'),
+            models.Index(fields=['status'], name='appt_status_idx'),
+            # Incremental refreshes (`since`) of the appointment lists
+            models.Index(fields=['updated_at'], name='appt_updated_idx'),
+        ]
 
     def __str__(self):
         return f"Appointment #{self.pk} – {self.patient.get_full_name()} ↔ Dr. {self.doctor.user.get_full_name()}"
 
 
+class AppointmentSlot(models.Model):
+    """A bookable slot in a doctor's schedule.
+
+    Slots sit on a fixed grid (APPOINTMENT_SLOT_MINUTES), so the unique
+    (doctor, date, start_time) constraint rules out both duplicate and
+    overlapping slots. Rows are created when a slot is first booked (free
+    time lives in DoctorDay's bitmap) and stay free while `appointment` is
+    empty after a release; see api/slots.py for the atomic reserve/release
+    operations.
+
+    Like Appointment.doctor, the foreign keys of this model and of the
+    calendar models below (WorkingHours, AvailabilityException, DoctorDay)
+    have no database constraint: Django adds FK constraints with ALTER TABLE
+    after creating the table, which TiDB rejects. Their CASCADE and SET_NULL
+    are carried out by Django's delete collector instead, so doctors and
+    appointments must be deleted through the ORM, not with raw SQL.
+    """
+    doctor = models.ForeignKey('DoctorProfile', on_delete=models.CASCADE, related_name='slots', db_constraint=False)
+    date = models.DateField()
+    start_time = models.TimeField()
+    duration_minutes = models.PositiveSmallIntegerField(default=30)
+    appointment = models.OneToOneField('Appointment', on_delete=models.SET_NULL, null=True, blank=True,
+                                       related_name='slot', db_constraint=False)
+
+    class Meta:
+        db_table = 'appointment_slots'
+        ordering = ['date', 'start_time']
+        constraints = [
+            models.UniqueConstraint(fields=['doctor', 'date', 'start_time'], name='slot_doctor_start_uniq'),
+        ]
+        indexes = [
+            # Next free slots of a doctor: appointment IS NULL, then chronological
+            models.Index(fields=['doctor', 'appointment', 'date', 'start_time'], name='slot_doctor_free_idx'),
+        ]
+
+    def __str__(self):
+        return f"Dr. {self.doctor_id} {self.date} {self.start_time:%H:%M} ({'booked' if self.appointment_id else 'free'})"
+
+
+class WorkingHours(models.Model):
+    """A doctor's regular working window on one weekday (several allowed).
+
+    `doctor` has no database FK constraint (see AppointmentSlot).
+    """
+    WEEKDAY_CHOICES = (
+        (0, 'Monday'), (1, 'Tuesday'), (2, 'Wednesday'), (3, 'Thursday'),
+        (4, 'Friday'), (5, 'Saturday'), (6, 'Sunday'),
+    )
+    doctor = models.ForeignKey('DoctorProfile', on_delete=models.CASCADE, related_name='working_hours', db_constraint=False)
+    weekday = models.PositiveSmallIntegerField(choices=WEEKDAY_CHOICES)
+    start_time = models.TimeField()
+    end_time = models.TimeField()
+
+    class Meta:
+        db_table = 'doctor_working_hours'
+        ordering = ['weekday', 'start_time']
+
+    def __str__(self):
+        return f"Dr. {self.doctor_id} {self.get_weekday_display()} {self.start_time:%H:%M}–{self.end_time:%H:%M}"
+
+
+class AvailabilityException(models.Model):
+    """A one-off change to a doctor's hours on a date: time off or extra hours.
+
+    Without start/end times the exception covers the whole day. `doctor` has
+    no database FK constraint (see AppointmentSlot).
+    """
+    KIND_CHOICES = (
+        ('off', 'Time off'),
+        ('extra', 'Extra hours'),
+    )
+    doctor = models.ForeignKey('DoctorProfile', on_delete=models.CASCADE, related_name='availability_exceptions', db_constraint=False)
+    date = models.DateField()
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES, default='off')
+    start_time = models.TimeField(null=True, blank=True)
+    end_time = models.TimeField(null=True, blank=True)
+    note = models.CharField(max_length=255, blank=True, default='')
+
+    class Meta:
+        db_table = 'doctor_availability_exceptions'
+        ordering = ['date', 'start_time']
+        indexes = [
+            models.Index(fields=['doctor', 'date'], name='avail_exc_doctor_date_idx'),
+        ]
+
+    def __str__(self):
+        return f"Dr. {self.doctor_id} {self.date} {self.get_kind_display()}"
+
+
+class DoctorDay(models.Model):
+    """Materialized free/busy bitmap of one doctor on one day.
+
+    Bit i of `free_mask` is set when the slot starting i * APPOINTMENT_SLOT_MINUTES
+    after midnight is inside working hours and not booked. `speciality` is
+    copied from the profile so "who is free" is one (speciality, date) index
+    lookup. Maintained by api/availability.py. `doctor` has no database FK
+    constraint (see AppointmentSlot).
+    """
+    doctor = models.ForeignKey('DoctorProfile', on_delete=models.CASCADE, related_name='days', db_constraint=False)
+    date = models.DateField()
+    speciality = models.CharField(max_length=100)
+    free_mask = models.BigIntegerField(default=0)
+
+    class Meta:
+        db_table = 'doctor_days'
+        constraints = [
+            models.UniqueConstraint(fields=['doctor', 'date'], name='doctor_day_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['speciality', 'date'], name='doctor_day_speciality_idx'),
+        ]
+
+    def __str__(self):
+        return f"Dr. {self.doctor_id} {self.date} ({bin(self.free_mask).count('1')} free slots)"
+
+
 class Prescription(models.Model):
     """Prescription issued by a doctor for an appointment."""
     appointment = models.ForeignKey('Appointment', on_delete=models.CASCADE, related_name='prescriptions', null=True, blank=True)
@@ -175,17 +334,35 @@ class ChatMessage(models.Model):
     class Meta:
         db_table = 'chat_messages'
         ordering = ['timestamp']
+        indexes = [
+            # Keyset pagination of an appointment's history
+            models.Index(fields=['appointment', 'timestamp', 'id'], name='chat_appt_ts_id_idx'),
+        ]
 
     def __str__(self):
         return f"[{self.timestamp:%H:%M}] {self.sender.get_full_name()}: {self.message[:50]}"
 
 
 class CallRecording(models.Model):
-    """Recorded call for an appointment (max 50 MB)."""
+    """Recorded call for an appointment (max 50 MB).
+
+    New recordings are post-processed in the background (api/processing.py),
+    which measures the real duration, re-encodes the file and stores a
+    waveform preview.
+    """
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('processing', 'Processing'),
+        ('ready', 'Ready'),
+        ('failed', 'Failed'),
+    )
     appointment = models.ForeignKey('Appointment', on_delete=models.CASCADE, related_name='recordings')
     recording_file = models.FileField(upload_to='recordings/', validators=[validate_file_size_50mb])
     duration_seconds = models.PositiveIntegerField(default=0)
     file_size = models.PositiveIntegerField(default=0, help_text='File size in bytes')
+    processing_status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    waveform = models.JSONField(default=list, blank=True, help_text='Peak levels (0..1) for a preview')
+    processing_started_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
@@ -198,4 +375,27 @@ class CallRecording(models.Model):
         super().save(*args, **kwargs)
 
     def __str__(self):
-        return f"Recording for Appointment #{self.appointment_id} ({self.file_size / (1024*1024):.1f} MB)"
\ No newline at end of file
+        return f"Recording for Appointment #{self.appointment_id} ({self.file_size / (1024*1024):.1f} MB)"
+
+
+class RecordingUpload(models.Model):
+    """In-progress chunked upload of a call recording.
+
+    Chunks are appended to a partial file on disk at `received`; finalizing
+    moves the file into storage as a CallRecording and deletes this row.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    appointment = models.ForeignKey('Appointment', on_delete=models.CASCADE, related_name='recording_uploads')
+    owner = models.ForeignKey('User', on_delete=models.CASCADE, related_name='recording_uploads')
+    filename = models.CharField(max_length=255)
+    total_size = models.PositiveIntegerField(help_text='Declared file size in bytes')
+    received = models.PositiveIntegerField(default=0, help_text='Bytes written so far (next chunk offset)')
+    duration_seconds = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'recording_uploads'
+
+    def __str__(self):
+        return f"Upload {self.pk} for Appointment #{self.appointment_id} ({self.received}/{self.total_size} bytes)"
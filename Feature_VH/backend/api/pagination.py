@@ -0,0 +1,138 @@
+"""
+Keyset (cursor) pagination for the Virtual Hospital API.
+"""
+import base64
+import json
+
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """Paginate on a composite key instead of OFFSET.
+
+    `ordering` lists the key columns (prefix '-' for descending) and must end
+    in a unique column such as 'id'. The cursor is the key of the last row of
+    the previous page, so every page is a single index range scan no matter
+    how deep the client has paged.
+    """
+    ordering = ('id',)
+    page_size = 100
+    max_page_size = 500
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'limit'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self._page(list(self._window(queryset, request)))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """paginate_queryset for async views, fetching through the async ORM."""
+        return self._page([row async for row in self._window(queryset, request)])
+
+    def _window(self, queryset, request):
+        """Queryset for the requested page plus one row to detect a next page."""
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        queryset = queryset.order_by(*self.ordering)
+
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            queryset = queryset.filter(self.after(self._decode(cursor, queryset.model)))
+        return queryset[:self.page_size + 1]
+
+    def _page(self, rows):
+        self.has_next = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        self.last_key = self.key_of(rows[-1]) if rows else None
+        return rows
+
+    def get_paginated_response(self, data):
+        return Response({'next': self.get_next_link(), 'results': data})
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self._encode(self.last_key))
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except (TypeError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    # ── Key helpers ──────────────────────────────────────────────────────────
+
+    def key_fields(self):
+        """(column, descending) pairs of the key, in `ordering` order."""
+        return [(name.lstrip('-'), name.startswith('-')) for name in self.ordering]
+
+    def key_of(self, obj):
+        """Key of a row (model instance or values() dict)."""
+        if isinstance(obj, dict):
+            return [obj[name] for name, _ in self.key_fields()]
+        return [getattr(obj, name) for name, _ in self.key_fields()]
+
+    def after(self, key):
+        """Q matching rows strictly after `key` in `ordering`."""
+        condition = Q()
+        equal = Q()
+        for (name, descending), value in zip(self.key_fields(), key):
+            lookup = f'{name}__lt' if descending else f'{name}__gt'
+            condition |= equal & Q(**{lookup: value})
+            equal &= Q(**{name: value})
+        return condition
+
+    def _encode(self, key):
+        raw = json.dumps([v.isoformat() if hasattr(v, 'isoformat') else v for v in key])
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+    def _decode(self, cursor, model):
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            fields = self.key_fields()
+            if not isinstance(values, list) or len(values) != len(fields):
+                raise ValueError
+            return [model._meta.get_field(name).to_python(value)
+                    for (name, _), value in zip(fields, values)]
+        except Exception:
+            raise ValidationError({self.cursor_query_param: 'Invalid cursor.'})
+
+
+class ChatHistoryPagination(KeysetPagination):
+    """Oldest-first chat history, paged on (timestamp, id)."""
+    ordering = ('timestamp', 'id')
+    page_size = 100
+
+
+class RecentChatPagination(ChatHistoryPagination):
+    """Chat history from the newest message backwards.
+
+    Pages are walked newest-first so the first request returns the latest
+    messages and `next` leads to older ones; each page is still returned
+    oldest-first so it can be prepended as is.
+    """
+    ordering = ('-timestamp', '-id')
+
+    def _page(self, rows):
+        return super()._page(rows)[::-1]
+
+
+class AppointmentPagination(KeysetPagination):
+    """Newest-first appointments, paged on (date, created_at, id)."""
+    ordering = ('-date', '-created_at', '-id')
+    page_size = 50
@@ -1,9 +1,27 @@
 """
 Custom permissions for the Virtual Hospital API.
 """
+from django.db.models import Q
 from rest_framework import permissions
 
 
+def is_admin(user):
+    return user.role == 'admin' or user.is_superuser
+
+
+def appointments_of(user, prefix=''):
+    """Q limiting appointments (at `prefix`) to the user's own; no limit for admins."""
+    if is_admin(user):
+        return Q()
+    return Q(**{f'{prefix}patient_id': user.pk}) | Q(**{f'{prefix}doctor__user_id': user.pk})
+
+
+def is_participant(user, appointment):
+    """Whether user is the appointment's patient or doctor, or an admin."""
+    return (is_admin(user) or appointment.patient_id == user.pk
+            or appointment.doctor.user_id == user.pk)
+
+
 class IsDoctor(permissions.BasePermission):
     """Allow access only to users with role 'doctor'."""
     def has_permission(self, request, view):
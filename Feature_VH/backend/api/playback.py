@@ -0,0 +1,154 @@
+"""
+Playback of call recordings with HTTP Range support.
+
+Responses never read the file into Python: whole files and open-ended ranges
+(`bytes=N-`, what browsers send when seeking) are FileResponses over the
+stored file, which the WSGI server can push with sendfile; bounded ranges
+are streamed in blocks. Under ASGI, where neither sendfile nor synchronous
+streaming is available, every body is streamed in blocks through an async
+iterator (api/streaming.py). With RECORDING_ACCEL_REDIRECT_PREFIX set, Django
+only authorizes the request and hands the file (and Range handling) to the
+front proxy through X-Accel-Redirect, which is the better option under ASGI.
+
+Media elements cannot send an Authorization header, so recordings also get
+short-lived signed playback URLs (`stream_url`).
+"""
+import mimetypes
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core import signing
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.urls import reverse
+
+from . import streaming
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+# Bytes per block when streaming under ASGI
+ASGI_BLOCK_SIZE = 64 * 1024
+
+_signer = signing.TimestampSigner(salt='api.playback')
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def playback_url(request, recording):
+    """Absolute, signed URL that plays `recording` without an auth header."""
+    sig = _signer.sign(str(recording.pk)).split(':', 1)[1]
+    path = reverse('recording-stream', args=[recording.pk])
+    return request.build_absolute_uri(f'{path}?sig={sig}')
+
+
+def valid_signature(recording_id, sig):
+    try:
+        _signer.unsign(f'{recording_id}:{sig}', max_age=settings.RECORDING_URL_MAX_AGE)
+    except signing.BadSignature:
+        return False
+    return True
+
+
+def parse_range(header, size):
+    """Inclusive (start, end) for a single-range header, or None for the whole file.
+
+    Multi-range and malformed headers are ignored (whole file), as RFC 9110
+    allows.
+    """
+    match = RANGE_RE.match(header.strip()) if header else None
+    if not match or match.groups() == ('', ''):
+        return None
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+        if start > end:
+            raise RangeNotSatisfiable()
+    else:
+        # Suffix range: the final N bytes
+        length = int(last)
+        if length == 0:
+            raise RangeNotSatisfiable()
+        start, end = max(size - length, 0), size - 1
+    return start, end
+
+
+class _RangeReader:
+    """Read-only view of `length` bytes of an open file from its current position."""
+
+    def __init__(self, file, length):
+        self.file = file
+        self.name = file.name
+        self.remaining = length
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file.close()
+
+
+def _blocks(field, start, length):
+    """Read `length` bytes of a stored file from `start`, opening it lazily."""
+    with field.open('rb') as file:
+        file.seek(start)
+        while length > 0:
+            block = file.read(min(ASGI_BLOCK_SIZE, length))
+            if not block:
+                break
+            length -= len(block)
+            yield block
+
+
+def recording_response(request, recording):
+    """Serve a recording's file, honouring a single Range request."""
+    field = recording.recording_file
+    content_type = mimetypes.guess_type(field.name)[0] or 'application/octet-stream'
+
+    prefix = settings.RECORDING_ACCEL_REDIRECT_PREFIX
+    if prefix:
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = f"{prefix.rstrip('/')}/{quote(field.name)}"
+        return response
+
+    size = field.size
+    try:
+        byte_range = parse_range(request.headers.get('Range'), size)
+    except RangeNotSatisfiable:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+
+    if streaming.is_asgi(request):
+        start, end = byte_range or (0, size - 1)
+        response = StreamingHttpResponse(
+            streaming.aiterate(_blocks(field, start, end - start + 1), thread_sensitive=False),
+            content_type=content_type, status=200 if byte_range is None else 206,
+        )
+        response['Content-Length'] = str(end - start + 1)
+        if byte_range is not None:
+            response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Accept-Ranges'] = 'bytes'
+        return response
+
+    file = field.open('rb')
+    if byte_range is None:
+        response = FileResponse(file, content_type=content_type)
+    else:
+        start, end = byte_range
+        file.seek(start)
+        if end == size - 1:
+            # Runs to EOF: keep the real file so sendfile still applies
+            response = FileResponse(file, content_type=content_type, status=206)
+        else:
+            response = FileResponse(_RangeReader(file, end - start + 1),
+                                    content_type=content_type, status=206)
+        response['Content-Length'] = str(end - start + 1)
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    response['Accept-Ranges'] = 'bytes'
+    return response
@@ -0,0 +1,135 @@
+"""
+Presence registry: which users currently hold a realtime connection.
+
+The realtime service reports connects, disconnects and periodic heartbeats;
+the API reads the registry. Each realtime worker records its own membership
+per user, expiring PRESENCE_TTL seconds after its last heartbeat, so one
+worker's disconnect never hides a user still connected through another, and
+a crashed worker's users drop off on their own.
+
+With REDIS_URL set, memberships live in a sorted set scored by expiry time
+and each user's details in a key with a TTL; every update is a single atomic
+Redis command, so concurrent workers never overwrite each other. Without it,
+the registry is kept in process memory, which only serves deployments
+running the API and the realtime service in one process (config/combined.py).
+"""
+import json
+import os
+import socket
+import threading
+import time
+
+from django.conf import settings
+from django.utils import timezone
+
+
+class MemoryPresenceStore:
+    """Memberships held in this process."""
+
+    def __init__(self):
+        # "<user id>:<worker>" -> expiry time, and user id -> entry
+        self._members = {}
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def touch(self, worker, entries, ttl):
+        expires = time.time() + ttl
+        with self._lock:
+            for entry in entries:
+                self._members[f"{entry['id']}:{worker}"] = expires
+                self._entries[entry['id']] = entry
+
+    def leave(self, worker, user_id):
+        with self._lock:
+            self._members.pop(f'{user_id}:{worker}', None)
+
+    def online(self):
+        now = time.time()
+        with self._lock:
+            for member, expires in list(self._members.items()):
+                if expires <= now:
+                    del self._members[member]
+            ids = {int(member.split(':', 1)[0]) for member in self._members}
+            for user_id in set(self._entries) - ids:
+                del self._entries[user_id]
+            return [self._entries[user_id] for user_id in ids]
+
+
+class RedisPresenceStore:
+    """Memberships shared by every process pointing at the same Redis server.
+
+    A pre-built client may be passed instead of a URL (e.g. a fakeredis
+    instance for local testing).
+    """
+
+    def __init__(self, url=None, client=None, prefix='vh:presence:'):
+        if client is None:
+            import redis
+            client = redis.from_url(url)
+        self._client = client
+        self.members_key = prefix + 'members'
+        self.user_key = prefix + 'user:{}'
+
+    def touch(self, worker, entries, ttl):
+        pipe = self._client.pipeline(transaction=False)
+        pipe.zadd(self.members_key, {f"{entry['id']}:{worker}": time.time() + ttl for entry in entries})
+        for entry in entries:
+            pipe.set(self.user_key.format(entry['id']), json.dumps(entry), ex=ttl)
+        pipe.execute()
+
+    def leave(self, worker, user_id):
+        self._client.zrem(self.members_key, f'{user_id}:{worker}')
+
+    def online(self):
+        pipe = self._client.pipeline()
+        pipe.zremrangebyscore(self.members_key, '-inf', time.time())
+        pipe.zrange(self.members_key, 0, -1)
+        _, members = pipe.execute()
+        ids = sorted({int(member.split(b':', 1)[0]) for member in members})
+        if not ids:
+            return []
+        values = self._client.mget([self.user_key.format(user_id) for user_id in ids])
+        return [json.loads(value) for value in values if value is not None]
+
+
+def get_store():
+    """Build the presence store configured by REDIS_URL."""
+    if settings.REDIS_URL:
+        return RedisPresenceStore(settings.REDIS_URL)
+    return MemoryPresenceStore()
+
+
+class PresenceRegistry:
+    """Online users, as reported by this process's realtime connections."""
+
+    def __init__(self, ttl: int = None, store=None, worker: str = None):
+        self.ttl = ttl or settings.PRESENCE_TTL
+        self.store = store if store is not None else get_store()
+        self.worker = worker or f'{socket.gethostname()}:{os.getpid()}'
+
+    def touch_many(self, users):
+        """Mark users online; `users` is an iterable of (id, name, role)."""
+        now = timezone.now().isoformat()
+        entries = [
+            {'id': user_id, 'name': name, 'role': role, 'last_active': now}
+            for user_id, name, role in users
+        ]
+        if entries:
+            self.store.touch(self.worker, entries, self.ttl)
+
+    def touch(self, user_id: int, name: str, role: str):
+        self.touch_many([(user_id, name, role)])
+
+    def leave(self, user_id: int):
+        """Drop this worker's connection of a user; others keep theirs."""
+        self.store.leave(self.worker, user_id)
+
+    def online(self, role: str = None):
+        """Presence entries of online users, optionally filtered by role."""
+        entries = self.store.online()
+        if role:
+            entries = [entry for entry in entries if entry['role'] == role]
+        return sorted(entries, key=lambda entry: entry['id'])
+
+
+presence = PresenceRegistry()
@@ -0,0 +1,139 @@
+"""
+Background post-processing of call recordings.
+
+Saving a new CallRecording schedules it (after the transaction commits) on a
+process pool, so the upload request returns straight away and ffmpeg's CPU
+work stays off the web workers' threads. The worker (api/transcode.py)
+measures the real duration, re-encodes the file and builds a waveform; the
+result is written back to the row from this process when the job finishes.
+
+Processing needs the file on a local path (FileSystemStorage). A pool whose
+worker died (e.g. ffmpeg killed for memory) fails its jobs and is replaced on
+the next submission. Recordings left in 'processing' by a process that went
+away are picked up again by the process_recordings command once stale.
+"""
+import multiprocessing
+import os
+import shlex
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+from django.core.files import File
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from . import transcode
+from .models import CallRecording
+
+_executor = None
+
+
+def _pool():
+    global _executor
+    if _executor is None:
+        # Spawned, not forked: web workers hold DB connections and threads
+        _executor = ProcessPoolExecutor(
+            max_workers=settings.RECORDING_PROCESS_WORKERS,
+            mp_context=multiprocessing.get_context('spawn'),
+        )
+    return _executor
+
+
+def _discard_pool(pool):
+    """Forget a broken pool so the next submission starts a fresh one."""
+    global _executor
+    if _executor is pool:
+        _executor = None
+        pool.shutdown(wait=False)
+
+
+def schedule(recording):
+    """Queue a recording for processing once the current transaction commits.
+
+    Robust: a failure to queue never turns the already-committed upload into
+    an error response.
+    """
+    transaction.on_commit(lambda: submit(recording.pk), robust=True)
+
+
+def submit(recording_id):
+    """Hand one recording to the pool; returns the future."""
+    recording = CallRecording.objects.get(pk=recording_id)
+    try:
+        src = recording.recording_file.path
+    except NotImplementedError:
+        CallRecording.objects.filter(pk=recording_id).update(processing_status='failed')
+        return None
+    CallRecording.objects.filter(pk=recording_id).update(
+        processing_status='processing', processing_started_at=timezone.now())
+
+    root, ext = os.path.splitext(src)
+    job = (
+        transcode.process, settings.RECORDING_FFMPEG, src, f'{root}.transcoded{ext}',
+        shlex.split(settings.RECORDING_TRANSCODE_ARGS), settings.RECORDING_WAVEFORM_POINTS,
+        settings.RECORDING_PROCESS_TIMEOUT,
+    )
+    try:
+        pool = _pool()
+        try:
+            future = pool.submit(*job)
+        except BrokenProcessPool:
+            _discard_pool(pool)
+            pool = _pool()
+            future = pool.submit(*job)
+    except Exception:
+        CallRecording.objects.filter(pk=recording_id).update(processing_status='failed')
+        raise
+    future.add_done_callback(lambda done: _finished(recording_id, src, done, pool))
+    return future
+
+
+def _finished(recording_id, src, future, pool):
+    """Store a finished job's results (runs on the pool's management thread)."""
+    close_old_connections()
+    try:
+        try:
+            result = future.result()
+        except BrokenProcessPool:
+            # A worker died and took the pool's queued jobs with it
+            _discard_pool(pool)
+            CallRecording.objects.filter(pk=recording_id).update(processing_status='failed')
+            return
+        except Exception:
+            CallRecording.objects.filter(pk=recording_id).update(processing_status='failed')
+            return
+        apply_result(recording_id, src, result)
+    finally:
+        close_old_connections()
+
+
+def apply_result(recording_id, src, result):
+    """Write a job's measurements (and smaller file, if any) to the recording."""
+    recording = CallRecording.objects.filter(pk=recording_id).first()
+    output = result['output']
+    if recording is None or not recording.recording_file or recording.recording_file.path != src:
+        # Deleted or replaced while processing
+        if output:
+            os.remove(output)
+        return
+
+    recording.duration_seconds = round(result['duration'])
+    recording.waveform = result['waveform']
+    recording.processing_status = 'ready'
+    if output:
+        old_name = recording.recording_file.name
+        with open(output, 'rb') as transcoded:
+            recording.recording_file.save(os.path.basename(old_name), File(transcoded), save=False)
+        os.remove(output)
+        recording.recording_file.storage.delete(old_name)
+    recording.save(update_fields=['recording_file', 'file_size', 'duration_seconds',
+                                  'waveform', 'processing_status'])
+
+
+def shutdown():
+    """Wait for queued jobs (and their result callbacks) and stop the pool."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+        _executor = None
@@ -0,0 +1,303 @@
+"""
+In-process ranked search over doctors and medicines.
+
+Each SearchIndex is an inverted index (term -> {pk: weighted term frequency})
+over a few weighted text columns of one model. Queries match every query
+word against indexed terms exactly, by prefix, or within one typo, and rank
+documents by field-weighted TF-IDF. Indexes are built lazily from a single
+values_list() query and patched in place by the signal handlers in
+signals.py once the writing transaction commits; a generation counter in the
+shared cache tells other worker processes when their copy is out of date.
+Without a shared cache (no REDIS_URL) that counter is per-process, so each
+worker also treats its copy as out of date once it is SEARCH_INDEX_MAX_AGE
+seconds old. Out-of-date copies keep serving searches while a fresh one is
+built in a background thread and swapped in; only the very first build
+blocks.
+"""
+import copy
+import math
+import re
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, List, Sequence, Set
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Case, IntegerField, When
+from rest_framework import filters
+
+from .models import DoctorProfile, Medicine
+
+TOKEN_RE = re.compile(r'\w+')
+
+# Relative weight of each way a query word can match an indexed term
+EXACT_MATCH, PREFIX_MATCH, TYPO_MATCH = 1.0, 0.7, 0.4
+MIN_PREFIX_LENGTH = 2
+MIN_TYPO_LENGTH = 4
+MAX_RESULTS = 200
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_RE.findall(text.lower()) if text else []
+
+
+def _deletes(term: str) -> Set[str]:
+    """The term with each single character removed."""
+    return {term[:i] + term[i + 1:] for i in range(len(term))}
+
+
+def _within_one_edit(a: str, b: str) -> bool:
+    """True if a and b differ by one insertion, deletion, substitution or adjacent swap."""
+    if a == b:
+        return True
+    la, lb = len(a), len(b)
+    if abs(la - lb) > 1:
+        return False
+    i = 0
+    while i < min(la, lb) and a[i] == b[i]:
+        i += 1
+    if la == lb:
+        return a[i + 1:] == b[i + 1:] or (
+            i + 1 < la and a[i] == b[i + 1] and a[i + 1] == b[i] and a[i + 2:] == b[i + 2:]
+        )
+    return a[i + 1:] == b[i:] if la > lb else a[i:] == b[i + 1:]
+
+
+class SyncedIndex:
+    """Base for lazily built in-process indexes kept in sync across workers.
+
+    Subclasses implement _reset(), _index_row(row) and _unindex(pk) and list
+    the attributes _reset() creates in `state`; rows come from
+    values_list('pk', *self.columns).
+    """
+    columns: Sequence[str] = ()
+    state: Sequence[str] = ()
+
+    def __init__(self, name: str, model):
+        self.name = name
+        self.model = model
+        self.generation_key = f'search:{name}:generation'
+        self._lock = threading.RLock()
+        self._built = False
+        self._built_at = 0.0
+        self._generation = None
+        # Background rebuild in progress, and the updates it must replay
+        self._rebuilder = None
+        self._replay = None
+
+    def _rows(self, **filters):
+        return self.model.objects.filter(**filters).values_list('pk', *self.columns).iterator(chunk_size=2000)
+
+    def rebuild(self):
+        with self._lock:
+            self._reset()
+            for row in self._rows():
+                self._index_row(row)
+            self._built = True
+            self._built_at = time.monotonic()
+            self._generation = cache.get_or_set(self.generation_key, 0, None)
+
+    def _ensure_current(self):
+        if not self._built:
+            self.rebuild()
+        elif cache.get(self.generation_key, 0) != self._generation:
+            self._rebuild_in_background()
+        elif not settings.SHARED_CACHE and time.monotonic() - self._built_at > settings.SEARCH_INDEX_MAX_AGE:
+            # Other workers' writes cannot reach our generation counter
+            self._rebuild_in_background()
+
+    def _rebuild_in_background(self):
+        with self._lock:
+            if self._rebuilder is not None:
+                return
+            self._replay = []
+            self._rebuilder = threading.Thread(target=self._rebuild_and_swap, daemon=True,
+                                               name=f'search-index-{self.name}')
+            self._rebuilder.start()
+
+    def _rebuild_and_swap(self):
+        """Build a fresh copy without the lock, then swap it in."""
+        try:
+            generation = cache.get_or_set(self.generation_key, 0, None)
+            fresh = copy.copy(self)
+            fresh._reset()
+            for row in self._rows():
+                fresh._index_row(row)
+            with self._lock:
+                for name in self.state:
+                    setattr(self, name, getattr(fresh, name))
+                # Local writes that landed while the copy was being built
+                for update in self._replay:
+                    update()
+                if cache.get(self.generation_key, 0) == generation + len(self._replay):
+                    generation += len(self._replay)
+                self._generation = generation
+                self._built_at = time.monotonic()
+        finally:
+            with self._lock:
+                self._rebuilder = None
+                self._replay = None
+            connection.close()
+
+    # ── Incremental updates (called from signal handlers) ──────────────────
+
+    def refresh(self, **filters):
+        """Re-index the rows matching `filters` after they were saved."""
+        self._apply(lambda: [self._replace(row) for row in self._rows(**filters)])
+
+    def discard(self, pk: int):
+        """Drop a deleted row from the index."""
+        self._apply(lambda: self._unindex(pk))
+
+    def _replace(self, row):
+        self._unindex(row[0])
+        self._index_row(row)
+
+    def _apply(self, update):
+        with self._lock:
+            try:
+                generation = cache.incr(self.generation_key)
+            except ValueError:
+                cache.set(self.generation_key, 0, None)
+                generation = 0
+            if not self._built:
+                return
+            # Patch in place even if other workers wrote meanwhile: searches see
+            # this write at once, and theirs with the next background rebuild
+            update()
+            if self._replay is not None:
+                self._replay.append(update)
+            if generation == (self._generation or 0) + 1:
+                self._generation = generation
+
+
+class SearchIndex(SyncedIndex):
+    """Inverted index over weighted text columns of one model."""
+    state = ('_postings', '_doc_terms', '_variants', '_sorted_terms', '_sorted_dirty')
+
+    def __init__(self, name: str, model, fields: Dict[str, float]):
+        super().__init__(name, model)
+        self.columns = list(fields)
+        self.weights = list(fields.values())
+        self._reset()
+
+    def _reset(self):
+        self._postings: Dict[str, Dict[int, float]] = {}
+        self._doc_terms: Dict[int, Set[str]] = {}
+        self._variants: Dict[str, Set[str]] = defaultdict(set)
+        self._sorted_terms: List[str] = []
+        self._sorted_dirty = True
+
+    def _index_row(self, row):
+        pk, values = row[0], row[1:]
+        weights: Dict[str, float] = defaultdict(float)
+        for weight, value in zip(self.weights, values):
+            for term in tokenize(value):
+                weights[term] += weight
+        for term, weight in weights.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                self._sorted_dirty = True
+                if len(term) >= MIN_TYPO_LENGTH - 1:
+                    for variant in _deletes(term) | {term}:
+                        self._variants[variant].add(term)
+            postings[pk] = weight
+        self._doc_terms[pk] = set(weights)
+
+    def _unindex(self, pk: int):
+        for term in self._doc_terms.pop(pk, ()):
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            postings.pop(pk, None)
+            if not postings:
+                del self._postings[term]
+                self._sorted_dirty = True
+                for variant in _deletes(term) | {term}:
+                    terms = self._variants.get(variant)
+                    if terms is not None:
+                        terms.discard(term)
+                        if not terms:
+                            del self._variants[variant]
+
+    # ── Querying ────────────────────────────────────────────────────────────
+
+    def _matches(self, word: str) -> Dict[str, float]:
+        """Indexed terms matching one query word, with their match weight."""
+        matches: Dict[str, float] = {}
+        if len(word) >= MIN_PREFIX_LENGTH:
+            if self._sorted_dirty:
+                self._sorted_terms = sorted(self._postings)
+                self._sorted_dirty = False
+            terms = self._sorted_terms
+            i = bisect_left(terms, word)
+            while i < len(terms) and terms[i].startswith(word):
+                matches[terms[i]] = PREFIX_MATCH
+                i += 1
+        if len(word) >= MIN_TYPO_LENGTH:
+            for variant in _deletes(word) | {word}:
+                for term in self._variants.get(variant, ()):
+                    if term not in matches and _within_one_edit(word, term):
+                        matches[term] = TYPO_MATCH
+        if word in self._postings:
+            matches[word] = EXACT_MATCH
+        return matches
+
+    def search(self, query: str, limit: int = MAX_RESULTS) -> List[int]:
+        """Primary keys of documents matching every query word, best first."""
+        words = tokenize(query)
+        if not words:
+            return []
+        with self._lock:
+            self._ensure_current()
+            total = max(len(self._doc_terms), 1)
+            scores: Dict[int, float] = None
+            for word in words:
+                word_scores: Dict[int, float] = defaultdict(float)
+                for term, match_weight in self._matches(word).items():
+                    postings = self._postings[term]
+                    idf = math.log(1 + total / len(postings))
+                    for pk, tf in postings.items():
+                        score = match_weight * tf * idf
+                        if score > word_scores[pk]:
+                            word_scores[pk] = score
+                if scores is None:
+                    scores = dict(word_scores)
+                else:
+                    scores = {pk: s + word_scores[pk] for pk, s in scores.items() if pk in word_scores}
+                if not scores:
+                    return []
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return [pk for pk, _ in ranked[:limit]]
+
+
+doctor_index = SearchIndex('doctors', DoctorProfile, {
+    'speciality': 2.0,
+    'user__first_name': 1.5,
+    'user__last_name': 1.5,
+})
+
+medicine_index = SearchIndex('medicines', Medicine, {
+    'name': 2.0,
+    'category': 1.0,
+    'description': 0.5,
+})
+
+
+class RankedSearchFilter(filters.SearchFilter):
+    """SearchFilter backed by the view's `search_index` instead of LIKE '%term%'."""
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, '')
+        if not query.strip():
+            return queryset
+        pks = view.search_index.search(query)
+        if not pks:
+            return queryset.none()
+        rank = Case(*(When(pk=pk, then=position) for position, pk in enumerate(pks)),
+                    output_field=IntegerField())
+        return queryset.filter(pk__in=pks).order_by(rank)
@@ -3,11 +3,22 @@ DRF Serializers for the Virtual Hospital API.
 """
 from rest_framework import serializers
 from django.contrib.auth.password_validation import validate_password
+from django.core.exceptions import SuspiciousFileOperation
+from django.db import transaction
+from django.db.models import Value
+from django.db.models.functions import Concat, Trim
+from django.utils.text import get_valid_filename
 from .models import (
     User, DoctorProfile, PatientProfile, Medicine,
-    Appointment, Prescription, PrescriptionItem,
-    ChatMessage, CallRecording,
+    Appointment, AppointmentSlot, WorkingHours, AvailabilityException,
+    Prescription, PrescriptionItem,
+    ChatMessage, CallRecording, RecordingUpload, MAX_RECORDING_SIZE, RECORDING_EXTENSIONS, normalize_name,
 )
+from .caching import invalidate_admin_stats
+from . import slots
+from .permissions import is_participant
+from .playback import playback_url
+from .search import medicine_index
 
 
 # ─── User Serializers ────────────────────────────────────────────────────────
@@ -110,7 +121,7 @@ class PatientProfileUpdateSerializer(serializers.ModelSerializer):
 class MedicineSerializer(serializers.ModelSerializer):
     class Meta:
         model = Medicine
-        fields = '__all__'
+        fields = ['id', 'name', 'category', 'description', 'price', 'stock', 'image']
 
 
 # ─── Appointment Serializers ──────────────────────────────────────────────────
@@ -126,9 +137,9 @@ class AppointmentSerializer(serializers.ModelSerializer):
     class Meta:
         model = Appointment
         fields = ['id', 'patient', 'doctor', 'date', 'time', 'reason',
-                  'status', 'appointment_type', 'type', 'created_at',
+                  'status', 'appointment_type', 'type', 'created_at', 'updated_at',
                   'patientName', 'doctorName']
-        read_only_fields = ['id', 'created_at']
+        read_only_fields = ['id', 'created_at', 'updated_at']
 
     def get_patient(self, obj):
         return {
@@ -155,8 +166,66 @@ class AppointmentSerializer(serializers.ModelSerializer):
         return f"Dr. {obj.doctor.user.get_full_name()}" if obj.doctor else 'Unknown Doctor'
 
 
+class AppointmentRowSerializer(serializers.BaseSerializer):
+    """Read-only fast path producing the same shape as AppointmentSerializer.
+
+    Works on rows from `AppointmentRowSerializer.rows(queryset)`, which
+    fetches only the needed columns with full names concatenated in SQL, so
+    rendering a row is a single dict build with no model instances or
+    per-field method dispatch.
+    """
+    _date = serializers.DateField()
+    _datetime = serializers.DateTimeField()
+
+    @staticmethod
+    def rows(queryset):
+        def full_name(prefix):
+            return Trim(Concat(f'{prefix}first_name', Value(' '), f'{prefix}last_name'))
+
+        return queryset.values(
+            'id', 'date', 'time', 'reason', 'status', 'appointment_type', 'created_at', 'updated_at',
+            'patient_id', 'patient__first_name', 'patient__last_name',
+            'doctor_id', 'doctor__user__first_name', 'doctor__user__last_name',
+            patient_full_name=full_name('patient__'),
+            doctor_full_name=full_name('doctor__user__'),
+        )
+
+    def to_representation(self, row):
+        return {
+            'id': row['id'],
+            'patient': {
+                'id': row['patient_id'],
+                'user': {
+                    'first_name': row['patient__first_name'],
+                    'last_name': row['patient__last_name'],
+                },
+            },
+            'doctor': {
+                'id': row['doctor_id'],
+                'user': {
+                    'first_name': row['doctor__user__first_name'],
+                    'last_name': row['doctor__user__last_name'],
+                },
+            },
+            'date': self._date.to_representation(row['date']),
+            'time': row['time'],
+            'reason': row['reason'],
+            'status': row['status'],
+            'appointment_type': row['appointment_type'],
+            'type': row['appointment_type'],
+            'created_at': self._datetime.to_representation(row['created_at']),
+            'updated_at': self._datetime.to_representation(row['updated_at']),
+            'patientName': row['patient_full_name'] or 'Unknown Patient',
+            'doctorName': f"Dr. {row['doctor_full_name']}" if row['doctor_id'] else 'Unknown Doctor',
+        }
+
+
 class AppointmentCreateSerializer(serializers.Serializer):
-    """Create serializer matching frontend payload exactly."""
+    """Create serializer matching frontend payload exactly.
+
+    The appointment claims the doctor's slot at date/time atomically; a
+    slot that is already taken fails the request with 409.
+    """
     doctor_id = serializers.IntegerField()
     date = serializers.DateField()
     time = serializers.CharField(max_length=10)
@@ -165,20 +234,62 @@ class AppointmentCreateSerializer(serializers.Serializer):
         choices=['video', 'in-person'], required=False, default='video'
     )
 
+    def validate_time(self, value):
+        return slots.parse_start(value)
+
     def create(self, validated_data):
         request = self.context['request']
         doctor = DoctorProfile.objects.get(id=validated_data['doctor_id'])
-        appointment = Appointment.objects.create(
-            patient=request.user,
-            doctor=doctor,
-            date=validated_data['date'],
-            time=validated_data['time'],
-            reason=validated_data.get('reason', ''),
-            appointment_type=validated_data.get('appointment_type', 'video'),
-        )
+        start_time = validated_data['time']
+        with transaction.atomic():
+            appointment = Appointment.objects.create(
+                patient_id=request.user.pk,
+                doctor=doctor,
+                date=validated_data['date'],
+                time=start_time.strftime('%H:%M'),
+                reason=validated_data.get('reason', ''),
+                appointment_type=validated_data.get('appointment_type', 'video'),
+            )
+            slots.reserve(doctor.pk, validated_data['date'], start_time, appointment)
         return appointment
 
 
+class AppointmentSlotSerializer(serializers.ModelSerializer):
+    start_time = serializers.TimeField(format='%H:%M')
+
+    class Meta:
+        model = AppointmentSlot
+        fields = ['date', 'start_time', 'duration_minutes']
+
+
+class WorkingHoursSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = WorkingHours
+        fields = ['id', 'weekday', 'start_time', 'end_time']
+
+    def validate(self, attrs):
+        start = attrs.get('start_time', getattr(self.instance, 'start_time', None))
+        end = attrs.get('end_time', getattr(self.instance, 'end_time', None))
+        if start >= end:
+            raise serializers.ValidationError({'end_time': 'Must be after start_time.'})
+        return attrs
+
+
+class AvailabilityExceptionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = AvailabilityException
+        fields = ['id', 'date', 'kind', 'start_time', 'end_time', 'note']
+
+    def validate(self, attrs):
+        start = attrs.get('start_time', getattr(self.instance, 'start_time', None))
+        end = attrs.get('end_time', getattr(self.instance, 'end_time', None))
+        if (start is None) != (end is None):
+            raise serializers.ValidationError('Give both start_time and end_time, or neither for the whole day.')
+        if start is not None and start >= end:
+            raise serializers.ValidationError({'end_time': 'Must be after start_time.'})
+        return attrs
+
+
 # ─── Prescription Serializers ────────────────────────────────────────────────
 
 class PrescriptionItemSerializer(serializers.ModelSerializer):
@@ -218,31 +329,77 @@ class PrescriptionCreateSerializer(serializers.Serializer):
         request = self.context['request']
         medicines_data = validated_data.pop('medicines', [])
 
-        prescription = Prescription.objects.create(
-            doctor=request.user,
-            patient_id=validated_data['patient_id'],
-            appointment_id=validated_data.get('appointment_id'),
-            notes=validated_data.get('notes', ''),
-        )
+        with transaction.atomic():
+            prescription = Prescription.objects.create(
+                doctor_id=request.user.pk,
+                patient_id=validated_data['patient_id'],
+                appointment_id=validated_data.get('appointment_id'),
+                notes=validated_data.get('notes', ''),
+            )
 
-        for med_data in medicines_data:
-            # Find medicine by name or ID
-            medicine_name = med_data.get('medicine', '')
-            medicine = Medicine.objects.filter(name__icontains=medicine_name).first()
-            if not medicine:
-                # Create medicine on the fly if not found
-                medicine = Medicine.objects.create(name=medicine_name)
-
-            PrescriptionItem.objects.create(
-                prescription=prescription,
-                medicine=medicine,
-                dosage=med_data.get('dosage', ''),
-                frequency=med_data.get('frequency', ''),
-                duration=med_data.get('duration', ''),
+            medicine_ids = self._resolve_medicines(
+                [med_data.get('medicine', '') for med_data in medicines_data]
             )
+            PrescriptionItem.objects.bulk_create([
+                PrescriptionItem(
+                    prescription=prescription,
+                    medicine_id=medicine_ids[med_data.get('medicine', '')],
+                    dosage=med_data.get('dosage', ''),
+                    frequency=med_data.get('frequency', ''),
+                    duration=med_data.get('duration', ''),
+                )
+                for med_data in medicines_data
+            ])
 
         return prescription
 
+    def validate_medicines(self, value):
+        names = [item.get('medicine') for item in value]
+        if not all(isinstance(name, str) and normalize_name(name) for name in names):
+            raise serializers.ValidationError('Every item needs a medicine name.')
+        return value
+
+    @staticmethod
+    def _resolve_medicines(names):
+        """Map each medicine name to a Medicine id, creating unknown ones.
+
+        Names match case- and whitespace-insensitively in one query on the
+        indexed normalized_name column. What is still unknown is created in
+        one bulk INSERT, once per normalized name.
+        """
+        keys = {name: normalize_name(name) for name in names}
+        wanted = set(keys.values())
+
+        found = {}
+        rows = (Medicine.objects.filter(normalized_name__in=wanted)
+                .order_by('-pk').values_list('normalized_name', 'pk'))
+        for key, pk in rows:
+            found[key] = pk  # lowest pk per name wins
+
+        # Create medicine on the fly if not found
+        missing = {}
+        for name, key in keys.items():
+            if key not in found:
+                missing.setdefault(key, name.strip())
+        if missing:
+            Medicine.objects.bulk_create([
+                Medicine(name=name, normalized_name=key) for key, name in missing.items()
+            ])
+            created = dict(
+                Medicine.objects.filter(normalized_name__in=missing).order_by('-pk')
+                .values_list('normalized_name', 'pk')
+            )
+            found.update(created)
+            # bulk_create skips post_save, so refresh the cached views by hand
+            new_pks = list(created.values())
+            transaction.on_commit(lambda: _medicines_created(new_pks))
+        return {name: found[key] for name, key in keys.items()}
+
+
+def _medicines_created(pks):
+    invalidate_admin_stats()
+    medicine_index.refresh(pk__in=pks)
+
 
 # ─── Chat Serializers ─────────────────────────────────────────────────────────
 
@@ -263,8 +420,61 @@ class ChatMessageSerializer(serializers.ModelSerializer):
 # ─── Call Recording Serializers ───────────────────────────────────────────────
 
 class CallRecordingSerializer(serializers.ModelSerializer):
+    stream_url = serializers.SerializerMethodField()
+
     class Meta:
         model = CallRecording
         fields = ['id', 'appointment', 'recording_file', 'duration_seconds',
-                  'file_size', 'created_at']
-        read_only_fields = ['id', 'file_size', 'created_at']
+                  'file_size', 'processing_status', 'waveform', 'created_at', 'stream_url']
+        read_only_fields = ['id', 'file_size', 'processing_status', 'waveform', 'created_at']
+
+    def validate_appointment(self, value):
+        return _participant_appointment(self.context['request'], value)
+
+    def get_stream_url(self, obj):
+        # The signed URL works without credentials, so only participants get one
+        request = self.context.get('request')
+        if obj.pk and request and is_participant(request.user, obj.appointment):
+            return playback_url(request, obj)
+        return None
+
+
+def _participant_appointment(request, appointment):
+    if not is_participant(request.user, appointment):
+        raise serializers.ValidationError('You are not a participant of this appointment.')
+    return appointment
+
+
+class RecordingUploadSerializer(serializers.ModelSerializer):
+    """Start a chunked recording upload; the declared size is checked up front."""
+    offset = serializers.IntegerField(source='received', read_only=True)
+
+    class Meta:
+        model = RecordingUpload
+        fields = ['id', 'appointment', 'filename', 'total_size', 'duration_seconds', 'offset']
+        read_only_fields = ['id']
+
+    def validate_appointment(self, value):
+        return _participant_appointment(self.context['request'], value)
+
+    def validate_filename(self, value):
+        # Only the base name is kept: the file is stored under recordings/
+        name = value.replace('\\', '/').rsplit('/', 1)[-1].strip()
+        try:
+            name = get_valid_filename(name)
+        except SuspiciousFileOperation:
+            raise serializers.ValidationError('Invalid file name.')
+        if name.startswith('.') or not name.lower().endswith(RECORDING_EXTENSIONS):
+            raise serializers.ValidationError(
+                f"File type not supported. Use one of: {', '.join(RECORDING_EXTENSIONS)}."
+            )
+        return name
+
+    def validate_total_size(self, value):
+        if value <= 0:
+            raise serializers.ValidationError('File size must be positive.')
+        if value > MAX_RECORDING_SIZE:
+            raise serializers.ValidationError(
+                f'File size must not exceed 50 MB. Declared size: {value / (1024*1024):.1f} MB.'
+            )
+        return value
@@ -0,0 +1,107 @@
+"""
+Model signal handlers that keep cached API data in sync with writes.
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .caching import invalidate_admin_stats, invalidate_doctor_directory
+from . import availability, processing, slots
+from .models import (
+    User, DoctorProfile, PatientProfile, Medicine, Appointment, CallRecording,
+    WorkingHours, AvailabilityException,
+)
+from .search import doctor_index, medicine_index
+from .serializers import DoctorProfileSerializer, UserSerializer
+
+# Model fields the doctor directory renders
+DIRECTORY_USER_FIELDS = frozenset(UserSerializer.Meta.fields)
+DIRECTORY_PROFILE_FIELDS = frozenset(DoctorProfileSerializer.Meta.fields)
+
+
+@receiver([post_save, post_delete], sender=User)
+@receiver([post_save, post_delete], sender=DoctorProfile)
+@receiver([post_save, post_delete], sender=PatientProfile)
+@receiver([post_save, post_delete], sender=Medicine)
+@receiver([post_save, post_delete], sender=Appointment)
+def admin_stats_changed(sender, **kwargs):
+    invalidate_admin_stats()
+
+
+def _touches(update_fields, fields):
+    """Whether a save with these update_fields may have changed any of `fields`."""
+    return update_fields is None or not fields.isdisjoint(update_fields)
+
+
+@receiver(post_save, sender=User)
+def doctor_directory_user_saved(sender, instance, update_fields=None, **kwargs):
+    # Patients and last_login/password updates never change the directory
+    if instance.role == 'doctor' and _touches(update_fields, DIRECTORY_USER_FIELDS):
+        invalidate_doctor_directory()
+
+
+# Deleting a doctor's User cascades to the profile, which lands here too
+@receiver([post_save, post_delete], sender=DoctorProfile)
+def doctor_directory_changed(sender, update_fields=None, **kwargs):
+    if _touches(update_fields, DIRECTORY_PROFILE_FIELDS):
+        invalidate_doctor_directory()
+
+
+# Index updates wait for the commit so a rolled-back write never reaches
+# searches and the refresh query sees the committed row
+
+@receiver(post_save, sender=DoctorProfile)
+def doctor_saved(sender, instance, **kwargs):
+    transaction.on_commit(lambda: doctor_index.refresh(pk=instance.pk))
+
+
+@receiver(post_save, sender=DoctorProfile)
+def doctor_availability_changed(sender, instance, created, update_fields=None, **kwargs):
+    if not _touches(update_fields, {'speciality', 'available'}):
+        return
+    # A full save() of an unchanged profile leaves the bitmaps as they are
+    current = (instance.speciality, instance.available)
+    if created or instance.loaded_availability != current:
+        availability.rebuild([instance.pk])
+        instance.loaded_availability = current
+
+
+@receiver([post_save, post_delete], sender=WorkingHours)
+@receiver([post_save, post_delete], sender=AvailabilityException)
+def calendar_changed(sender, instance, **kwargs):
+    availability.rebuild([instance.doctor_id])
+
+
+@receiver(pre_delete, sender=Appointment)
+def appointment_deleted(sender, instance, **kwargs):
+    # The slot's FK would be nulled anyway; this also frees its bitmap bit
+    slots.release(instance)
+
+
+@receiver(post_delete, sender=DoctorProfile)
+def doctor_deleted(sender, instance, **kwargs):
+    pk = instance.pk
+    transaction.on_commit(lambda: doctor_index.discard(pk))
+
+
+@receiver(post_save, sender=User)
+def doctor_user_saved(sender, instance, update_fields=None, **kwargs):
+    if instance.role == 'doctor' and _touches(update_fields, {'first_name', 'last_name'}):
+        transaction.on_commit(lambda: doctor_index.refresh(user_id=instance.pk))
+
+
+@receiver(post_save, sender=Medicine)
+def medicine_saved(sender, instance, **kwargs):
+    transaction.on_commit(lambda: medicine_index.refresh(pk=instance.pk))
+
+
+@receiver(post_delete, sender=Medicine)
+def medicine_deleted(sender, instance, **kwargs):
+    pk = instance.pk
+    transaction.on_commit(lambda: medicine_index.discard(pk))
+
+
+@receiver(post_save, sender=CallRecording)
+def recording_saved(sender, instance, created, **kwargs):
+    if created and instance.recording_file:
+        processing.schedule(instance)
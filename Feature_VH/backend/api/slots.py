@@ -0,0 +1,111 @@
+"""
+Appointment slot booking.
+
+A booking first claims its slot in the doctor's availability bitmap
+(api/availability.py), which refuses times outside working hours, and then
+its AppointmentSlot row with one conditional statement,
+
+    UPDATE appointment_slots SET appointment_id = X
+    WHERE doctor_id = D AND date = ... AND start_time = ... AND appointment_id IS NULL
+
+so of any number of concurrent requests for a slot exactly one updates a
+row and the rest see zero rows and get 409. No locks are held beyond the
+statement. Free slots have no row: the first booking of a slot inserts it
+free with INSERT ... ON CONFLICT DO NOTHING (INSERT IGNORE on MySQL), which
+the unique (doctor, date, start_time) constraint makes idempotent, and
+claims it with the UPDATE above.
+
+"Next available" reads the precomputed bitmaps (one DoctorDay row per
+doctor and day), so it never scans the appointments table.
+"""
+from datetime import datetime
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+
+from . import availability
+from .models import AppointmentSlot, DoctorDay
+
+TIME_FORMATS = ('%H:%M', '%H:%M:%S', '%I:%M %p', '%I:%M%p')
+
+
+class SlotUnavailable(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = 'This slot is not available.'
+    default_code = 'slot_unavailable'
+
+
+def parse_start(value):
+    """Parse a booking time ('14:30', '02:30 PM') and check it is on the slot grid."""
+    for fmt in TIME_FORMATS:
+        try:
+            start = datetime.strptime(value.strip().upper(), fmt).time()
+            break
+        except ValueError:
+            continue
+    else:
+        raise ValidationError('Expected a time such as 14:30.')
+    minutes = start.hour * 60 + start.minute
+    if start.second or minutes % settings.APPOINTMENT_SLOT_MINUTES:
+        raise ValidationError(f'Appointments start on {settings.APPOINTMENT_SLOT_MINUTES}-minute boundaries.')
+    return start
+
+
+def reserve(doctor_id, date, start_time, appointment):
+    """Claim the doctor's slot at date/start_time for appointment.
+
+    Raises SlotUnavailable if someone else holds it. Call inside the
+    transaction that creates the appointment so a lost race rolls it back.
+    """
+    if not availability.claim(doctor_id, date, start_time):
+        raise SlotUnavailable()
+    AppointmentSlot.objects.bulk_create([
+        AppointmentSlot(doctor_id=doctor_id, date=date, start_time=start_time,
+                        duration_minutes=settings.APPOINTMENT_SLOT_MINUTES),
+    ], ignore_conflicts=True)
+    claimed = AppointmentSlot.objects.filter(
+        doctor_id=doctor_id, date=date, start_time=start_time, appointment__isnull=True,
+    ).update(appointment=appointment)
+    if not claimed:
+        raise SlotUnavailable()
+
+
+def reclaim(appointment):
+    """Take the slot back for a declined appointment that is being reinstated.
+
+    Raises SlotUnavailable if it was booked (or left working hours) meanwhile.
+    Appointments whose free-form or off-grid time predates slots never held
+    one and are reinstated without it.
+    """
+    try:
+        start = parse_start(appointment.time)
+    except ValidationError:
+        return
+    reserve(appointment.doctor_id, appointment.date, start, appointment)
+
+
+def release(appointment):
+    """Free the slot held by appointment, if any."""
+    for slot in AppointmentSlot.objects.filter(appointment=appointment):
+        AppointmentSlot.objects.filter(pk=slot.pk).update(appointment=None)
+        availability.release(slot.doctor_id, slot.date, slot.start_time)
+
+
+def next_available(doctor_id, limit=10, after=None):
+    """The doctor's next free slots, soonest first, as unsaved AppointmentSlots."""
+    now = after or timezone.localtime().replace(tzinfo=None)
+    found = []
+    days = (DoctorDay.objects.filter(doctor_id=doctor_id, date__gte=now.date(), free_mask__gt=0)
+            .order_by('date').only('date', 'free_mask'))
+    for day in days.iterator():
+        for start in availability.slot_times(day.free_mask):
+            if day.date == now.date() and start <= now.time():
+                continue
+            found.append(AppointmentSlot(doctor_id=doctor_id, date=day.date, start_time=start,
+                                         duration_minutes=settings.APPOINTMENT_SLOT_MINUTES))
+            if len(found) == limit:
+                return found
+    return found
+
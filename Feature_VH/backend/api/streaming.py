@@ -0,0 +1,41 @@
+"""
+Streaming response bodies that stay streamed under both WSGI and ASGI.
+
+Django's ASGI handler buffers a StreamingHttpResponse over a synchronous
+iterator into a list before sending a byte, and an ASGI server cannot use
+sendfile either. Under ASGI, bodies are therefore handed over as async
+iterators that pull each block from the synchronous source in a worker
+thread, so memory stays at one block however large the body is.
+"""
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+
+
+def is_asgi(request):
+    """Whether `request` (a Django or DRF request) is being served over ASGI."""
+    return isinstance(getattr(request, '_request', request), ASGIRequest)
+
+
+async def aiterate(iterable, thread_sensitive=True):
+    """Async iterator over a synchronous iterable, one item per thread hop.
+
+    Leave `thread_sensitive` on for iterables that use the ORM; plain file
+    reads can run on any thread.
+    """
+    iterator = iter(iterable)
+    step = sync_to_async(next, thread_sensitive=thread_sensitive)
+    done = object()
+    try:
+        while (item := await step(iterator, done)) is not done:
+            yield item
+    finally:
+        close = getattr(iterator, 'close', None)
+        if close is not None:
+            await sync_to_async(close, thread_sensitive=thread_sensitive)()
+
+
+def body(request, iterable, thread_sensitive=True):
+    """`iterable` as a response body suited to the server serving `request`."""
+    if is_asgi(request):
+        return aiterate(iterable, thread_sensitive)
+    return iterable
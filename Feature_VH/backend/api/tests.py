@@ -0,0 +1,596 @@
+"""
+Tests for the API app.
+"""
+import importlib
+import io
+import json
+import shutil
+import tempfile
+import threading
+import time as time_module
+from datetime import date, time, timedelta
+from unittest import mock, skipUnless
+
+from asgiref.sync import sync_to_async
+from django.apps import apps as django_apps
+from django.contrib.auth.models import update_last_login
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.db import DatabaseError, connection, transaction
+from django.urls import clear_url_caches
+from django.test import AsyncClient, RequestFactory, TestCase, TransactionTestCase, override_settings
+from rest_framework.test import APIClient
+from config import urls as root_urls
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from . import availability, playback, presence, slots, throttling, uploads, urls
+from .authentication import tokens_for_user
+from .caching import DOCTOR_DIRECTORY_VERSION_KEY
+from .management.commands.explain_hot_queries import FULL_SCAN_PATTERNS, hot_queries
+from .models import (
+    Appointment, AppointmentSlot, CallRecording, ChatMessage, DoctorDay, DoctorProfile, Medicine,
+    RecordingUpload, User, WorkingHours,
+)
+from .presence import MemoryPresenceStore, PresenceRegistry, RedisPresenceStore
+from .search import medicine_index
+from .serializers import PrescriptionCreateSerializer
+from .views import AppointmentViewSet
+
+try:
+    import fakeredis
+except ImportError:
+    fakeredis = None
+
+
+def make_doctor(username, speciality='General'):
+    user = User.objects.create_user(username=username, password='x', role='doctor')
+    return DoctorProfile.objects.create(user=user, speciality=speciality)
+
+
+def make_patient(username):
+    return User.objects.create_user(username=username, password='x', role='patient')
+
+
+def use_async_read_views(test):
+    """Route the test's requests through the ASYNC_READ_VIEWS endpoints."""
+    def reload_urls():
+        # The root urlconf holds the api resolver, which caches its patterns
+        importlib.reload(urls)
+        importlib.reload(root_urls)
+        clear_url_caches()
+
+    with override_settings(ASYNC_READ_VIEWS=True):
+        reload_urls()
+    test.addCleanup(reload_urls)
+
+
+def client_for(user=None):
+    client = APIClient()
+    if user is not None:
+        client.force_authenticate(user)
+    return client
+
+
+class AvailabilityRebuildTests(TestCase):
+
+    def test_rebuild_on_backend_without_conflict_target(self):
+        """MySQL/TiDB upsert through ON DUPLICATE KEY UPDATE, without unique_fields."""
+        doctor = make_doctor('d1')
+        day = date.today() + timedelta(days=1)
+        WorkingHours.objects.create(doctor=doctor, weekday=day.weekday(),
+                                    start_time=time(9), end_time=time(10))
+
+        def on_duplicate_key(fields, on_conflict, update_fields, unique_fields):
+            # No target is passed on MySQL; the unique (doctor, date) index decides
+            self.assertFalse(list(unique_fields))
+            assignments = ', '.join(f'{column} = EXCLUDED.{column}' for column in update_fields)
+            return f'ON CONFLICT(doctor_id, date) DO UPDATE SET {assignments}'
+
+        with mock.patch.object(connection.features, 'supports_update_conflicts_with_target', False), \
+                mock.patch.object(connection.ops, 'on_conflict_suffix_sql', on_duplicate_key):
+            availability.rebuild([doctor.pk], day, 1)
+            self.assertTrue(availability.claim(doctor.pk, day, time(9)))
+
+        self.assertEqual(DoctorDay.objects.get(doctor=doctor, date=day).free_mask,
+                         availability.slot_bit(time(9, 30)))
+
+
+class DirectorySignalTests(TestCase):
+
+    def setUp(self):
+        self.doctor = DoctorProfile.objects.get(pk=make_doctor('doc').pk)
+
+    def directory_version(self):
+        return cache.get(DOCTOR_DIRECTORY_VERSION_KEY)
+
+    def test_patient_and_last_login_saves_keep_the_directory(self):
+        version = self.directory_version()
+        patient = make_patient('pat')
+        patient.first_name = 'Pat'
+        patient.save()
+        update_last_login(None, self.doctor.user)
+        self.assertEqual(self.directory_version(), version)
+
+        self.doctor.user.first_name = 'Ada'
+        self.doctor.user.save()
+        self.assertNotEqual(self.directory_version(), version)
+
+    def test_unchanged_profile_save_skips_the_availability_rebuild(self):
+        with mock.patch.object(availability, 'rebuild') as rebuild:
+            self.doctor.bio = 'Twenty years in practice'
+            self.doctor.save()
+            rebuild.assert_not_called()
+            self.doctor.available = False
+            self.doctor.save()
+            rebuild.assert_called_once_with([self.doctor.pk])
+
+
+class RecordingAccessTests(TestCase):
+
+    def setUp(self):
+        storage = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, storage)
+        settings_override = override_settings(MEDIA_ROOT=storage, RECORDING_UPLOAD_DIR=f'{storage}/uploads')
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.doctor = make_doctor('doc')
+        self.patient = make_patient('pat')
+        self.outsider = make_patient('other')
+        self.appointment = Appointment.objects.create(
+            patient=self.patient, doctor=self.doctor, date=date.today(), time='10:00')
+        # Processing is scheduled on commit, which TestCase never reaches
+        self.recording = CallRecording.objects.create(
+            appointment=self.appointment, recording_file=ContentFile(b'abc', name='call.webm'))
+
+    def test_participants_get_a_stream_url(self):
+        for user in (self.patient, self.doctor.user):
+            response = client_for(user).get(f'/api/recordings/{self.appointment.pk}/')
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response.data[0]['stream_url'])
+
+    def test_outsiders_cannot_list_or_upload(self):
+        client = client_for(self.outsider)
+        self.assertEqual(client.get(f'/api/recordings/{self.appointment.pk}/').status_code, 404)
+        response = client.post('/api/recordings/uploads/', {
+            'appointment': self.appointment.pk, 'filename': 'call.webm', 'total_size': 10,
+        }, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('appointment', response.data)
+
+    def start_upload(self, filename):
+        return client_for(self.patient).post('/api/recordings/uploads/', {
+            'appointment': self.appointment.pk, 'filename': filename, 'total_size': 3,
+        }, format='json')
+
+    def test_upload_filename_is_reduced_to_a_base_name(self):
+        for filename in ('../../evil.webm', 'sub/dir/evil.webm', '..\\evil.webm'):
+            response = self.start_upload(filename)
+            self.assertEqual(response.status_code, 201, response.data)
+            self.assertEqual(response.data['filename'], 'evil.webm')
+
+        response = self.start_upload('call.webm')
+        url = f"/api/recordings/uploads/{response.data['id']}/"
+        client = client_for(self.patient)
+        client.generic('PATCH', url, b'abc', content_type='application/offset+octet-stream',
+                       HTTP_UPLOAD_OFFSET='0')
+        response = client.post(f'{url}finalize/')
+        self.assertEqual(response.status_code, 201)
+        recording = CallRecording.objects.get(pk=response.data['id'])
+        self.assertRegex(recording.recording_file.name, r'^recordings/call[^/]*\.webm$')
+
+    def test_stale_chunk_does_not_truncate_stored_bytes(self):
+        upload = RecordingUpload.objects.get(pk=self.start_upload('call.webm').data['id'])
+        stale = RecordingUpload.objects.get(pk=upload.pk)
+        self.assertEqual(uploads.append(upload, io.BytesIO(b'abc'), 0, 3), 3)
+        # A retry of the same chunk read the row before the first one finished
+        with self.assertRaises(uploads.OffsetMismatch):
+            uploads.append(stale, io.BytesIO(b'xy'), 0, 2)
+        with open(uploads.partial_path(upload), 'rb') as part:
+            self.assertEqual(part.read(), b'abc')
+
+    def test_upload_rejects_other_file_types(self):
+        for filename in ('notes.txt', '.webm', '..', 'x.webm.exe'):
+            self.assertEqual(self.start_upload(filename).status_code, 400, filename)
+
+
+class ClaimsAuthenticationTests(TestCase):
+
+    def get_me(self, token):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        return client.get('/api/users/me/')
+
+    def test_deleted_user_is_unauthorized(self):
+        user = make_patient('pat')
+        tokens = [tokens_for_user(user).access_token, RefreshToken.for_user(user).access_token]
+        user.delete()
+        for token in tokens:
+            self.assertEqual(self.get_me(token).status_code, 401)
+
+    def test_inactive_user_is_unauthorized(self):
+        user = make_patient('pat')
+        User.objects.filter(pk=user.pk).update(is_active=False)
+        self.assertEqual(self.get_me(tokens_for_user(user).access_token).status_code, 401)
+        self.assertEqual(self.get_me(RefreshToken.for_user(user).access_token).status_code, 401)
+
+    async def test_token_without_claims_on_async_views(self):
+        await sync_to_async(use_async_read_views)(self)
+        user = await sync_to_async(make_patient)('pat')
+        token = RefreshToken.for_user(user).access_token
+        headers = {'Authorization': f'Bearer {token}'}
+        response = await AsyncClient().get('/api/medicines/', headers=headers)
+        self.assertEqual(response.status_code, 200, response.content)
+
+        await User.objects.filter(pk=user.pk).aupdate(is_active=False)
+        self.assertEqual((await AsyncClient().get('/api/medicines/', headers=headers)).status_code, 401)
+
+
+class LoginThrottleTests(TestCase):
+
+    def attempt(self, forwarded_for, username):
+        return APIClient().post('/api/token-auth/', {'username': username, 'password': 'wrong'},
+                                format='json', HTTP_X_FORWARDED_FOR=forwarded_for)
+
+    @override_settings(LOGIN_THROTTLE_RATES={'ip': '2/min', 'login': '100/min'})
+    def test_forged_forwarded_for_does_not_reset_the_ip_bucket(self):
+        with mock.patch.object(throttling, '_store', throttling.MemoryBucketStore()):
+            statuses = [self.attempt(f'10.0.0.{n}', f'user{n}').status_code for n in range(3)]
+        self.assertNotIn(429, statuses[:2])
+        self.assertEqual(statuses[2], 429)
+
+
+class SearchIndexSyncTests(TransactionTestCase):
+
+    def wait_for_rebuild(self):
+        rebuilder = medicine_index._rebuilder
+        if rebuilder is not None:
+            rebuilder.join(5)
+
+    @override_settings(SHARED_CACHE=False, SEARCH_INDEX_MAX_AGE=0)
+    def test_per_process_cache_rebuilds_after_max_age_in_background(self):
+        medicine_index.rebuild()
+        # Written by "another worker": no signal reaches this process's index
+        Medicine.objects.bulk_create([Medicine(name='Paracetamol')])
+        # The stale copy keeps serving while the fresh one is built
+        self.assertEqual(medicine_index.search('paracetamol'), [])
+        self.wait_for_rebuild()
+        self.assertEqual(len(medicine_index.search('paracetamol')), 1)
+
+    def test_saved_row_is_patched_in_after_commit(self):
+        medicine_index.rebuild()
+        with transaction.atomic():
+            Medicine.objects.create(name='Cetirizine')
+            self.assertEqual(medicine_index.search('cetirizine'), [])
+        self.assertEqual(len(medicine_index.search('cetirizine')), 1)
+        self.assertIsNone(medicine_index._rebuilder)
+
+    def test_rolled_back_row_never_reaches_the_index(self):
+        medicine_index.rebuild()
+        with self.assertRaises(DatabaseError):
+            with transaction.atomic():
+                Medicine.objects.create(name='Loratadine')
+                raise DatabaseError
+        self.assertEqual(medicine_index.search('loratadine'), [])
+
+
+class MedicineResolutionTests(TestCase):
+
+    def test_names_differing_in_case_share_one_medicine(self):
+        ids = PrescriptionCreateSerializer._resolve_medicines(['Aspirin', 'aspirin ', 'ASPIRIN'])
+        self.assertEqual(len(set(ids.values())), 1)
+        self.assertEqual(Medicine.objects.filter(normalized_name='aspirin').count(), 1)
+
+    def test_normalized_name_is_not_exposed(self):
+        Medicine.objects.create(name='Ibuprofen')
+        response = client_for(make_patient('reader')).get('/api/medicines/')
+        self.assertEqual(response.status_code, 200)
+        rows = response.json()
+        rows = rows.get('results', rows) if isinstance(rows, dict) else rows
+        self.assertEqual(rows[0]['name'], 'Ibuprofen')
+        self.assertNotIn('normalized_name', rows[0])
+
+
+def next_weekday(weekday):
+    today = date.today()
+    return today + timedelta(days=(weekday - today.weekday() - 1) % 7 + 1)
+
+
+class SlotBookingTests(TestCase):
+
+    def setUp(self):
+        self.doctor = make_doctor('doc')
+        self.day = next_weekday(0)
+        self.first = make_patient('first')
+        self.second = make_patient('second')
+
+    def book(self, patient):
+        return client_for(patient).post('/api/appointments/', {
+            'doctor_id': self.doctor.pk, 'date': str(self.day), 'time': '10:00',
+        }, format='json')
+
+    def test_declined_appointment_cannot_be_reapproved_over_a_new_booking(self):
+        self.assertEqual(self.book(self.first).status_code, 201)
+        appointment = Appointment.objects.get(patient=self.first)
+        doctor = client_for(self.doctor.user)
+        url = f'/api/appointments/{appointment.pk}/'
+
+        self.assertEqual(doctor.patch(url, {'status': 'declined'}, format='json').status_code, 200)
+        self.assertEqual(self.book(self.second).status_code, 201)
+        self.assertEqual(doctor.patch(url, {'status': 'approved'}, format='json').status_code, 409)
+        appointment.refresh_from_db()
+        self.assertEqual(appointment.status, 'declined')
+
+    def test_declined_appointment_takes_its_free_slot_back(self):
+        self.book(self.first)
+        appointment = Appointment.objects.get(patient=self.first)
+        doctor = client_for(self.doctor.user)
+        url = f'/api/appointments/{appointment.pk}/'
+        doctor.patch(url, {'status': 'declined'}, format='json')
+        self.assertEqual(doctor.patch(url, {'status': 'approved'}, format='json').status_code, 200)
+        self.assertEqual(self.book(self.second).status_code, 409)
+
+    def test_free_form_time_is_reinstated_without_a_slot(self):
+        appointment = Appointment.objects.create(patient=self.first, doctor=self.doctor, date=self.day,
+                                                 time='after lunch', status='declined')
+        response = client_for(self.doctor.user).patch(f'/api/appointments/{appointment.pk}/',
+                                                      {'status': 'approved'}, format='json')
+        self.assertEqual(response.status_code, 200)
+
+    def test_backfill_claims_slots_of_existing_appointments(self):
+        self.assertEqual(self.book(self.first).status_code, 201)
+        # Bitmap built, then an appointment booked before slots existed
+        earlier = Appointment.objects.create(patient=self.second, doctor=self.doctor,
+                                             date=self.day, time='11:00 AM')
+        migration = importlib.import_module('api.migrations.0012_backfill_appointment_slots')
+        migration.backfill_slots(django_apps, None)
+
+        self.assertEqual(AppointmentSlot.objects.get(appointment=earlier).start_time, time(11))
+        response = client_for(make_patient('third')).post('/api/appointments/', {
+            'doctor_id': self.doctor.pk, 'date': str(self.day), 'time': '11:00',
+        }, format='json')
+        self.assertEqual(response.status_code, 409)
+
+
+class ConcurrentReserveTests(TransactionTestCase):
+
+    def test_only_one_of_many_concurrent_bookings_wins(self):
+        doctor = make_doctor('doc')
+        day = next_weekday(0)
+        patients = [make_patient(f'p{n}') for n in range(8)]
+        barrier = threading.Barrier(len(patients))
+        outcomes = []
+
+        def book(patient):
+            barrier.wait()
+            try:
+                for _ in range(200):
+                    try:
+                        with transaction.atomic():
+                            appointment = Appointment.objects.create(
+                                patient=patient, doctor=doctor, date=day, time='10:00')
+                            slots.reserve(doctor.pk, day, time(10), appointment)
+                        outcomes.append('booked')
+                        return
+                    except slots.SlotUnavailable:
+                        outcomes.append('conflict')
+                        return
+                    except DatabaseError:
+                        # Lock timeout or deadlock (SQLite fails concurrent writers): retry
+                        pass
+                outcomes.append('gave up')
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=book, args=(patient,)) for patient in patients]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sorted(outcomes), ['booked'] + ['conflict'] * (len(patients) - 1))
+        self.assertEqual(Appointment.objects.count(), 1)
+        slot = AppointmentSlot.objects.get(doctor=doctor, date=day, start_time=time(10))
+        self.assertEqual(slot.appointment, Appointment.objects.get())
+        mask = DoctorDay.objects.get(doctor=doctor, date=day).free_mask
+        self.assertFalse(mask & availability.slot_bit(time(10)))
+
+
+async def read_streaming(response):
+    return b''.join([chunk async for chunk in response.streaming_content])
+
+
+@skipUnless(connection.vendor in FULL_SCAN_PATTERNS, 'no full-scan detection for this database')
+class HotQueryPlanTests(TestCase):
+
+    def test_hot_queries_are_not_full_table_scans(self):
+        pattern = FULL_SCAN_PATTERNS[connection.vendor]
+        for name, queryset in hot_queries():
+            with self.subTest(name):
+                plan = queryset.explain()
+                self.assertIsNone(pattern.search(plan), plan)
+
+
+class AsgiStreamingTests(TestCase):
+
+    def setUp(self):
+        storage = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, storage)
+        settings_override = override_settings(MEDIA_ROOT=storage)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.doctor = make_doctor('doc')
+        self.patient = make_patient('pat')
+        appointment = Appointment.objects.create(
+            patient=self.patient, doctor=self.doctor, date=date.today(), time='10:00')
+        self.recording = CallRecording.objects.create(
+            appointment=appointment, recording_file=ContentFile(b'0123456789', name='call.webm'))
+        self.url = playback.playback_url(RequestFactory().get('/'), self.recording)
+
+    async def test_recording_ranges_stream_asynchronously(self):
+        response = await AsyncClient().get(self.url, headers={'Range': 'bytes=2-5'})
+        self.assertEqual(response.status_code, 206)
+        self.assertTrue(response.is_async)
+        self.assertEqual(response['Content-Range'], 'bytes 2-5/10')
+        self.assertEqual(await read_streaming(response), b'2345')
+
+        response = await AsyncClient().get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(await read_streaming(response), b'0123456789')
+
+    def test_export_pages_through_every_row(self):
+        for hour in range(11, 16):
+            Appointment.objects.create(patient=self.patient, doctor=self.doctor,
+                                       date=date.today(), time=f'{hour}:00')
+        admin = User.objects.create_user(username='adm', password='x', role='admin')
+        with mock.patch.object(AppointmentViewSet, 'export_page_size', 2):
+            response = client_for(admin).get('/api/appointments/export/')
+            lines = b''.join(response.streaming_content).splitlines()
+        self.assertEqual(len(lines), 6)
+        self.assertEqual(len({json.loads(line)['id'] for line in lines}), 6)
+
+
+class ChatHistoryTests(TestCase):
+
+    def setUp(self):
+        self.patient = make_patient('pat')
+        appointment = Appointment.objects.create(patient=self.patient, doctor=make_doctor('doc'),
+                                                 date=date.today(), time='10:00')
+        self.ids = [ChatMessage.objects.create(appointment=appointment, sender=self.patient,
+                                               message=str(n)).pk for n in range(5)]
+        self.url = f'/api/chat/{appointment.pk}/'
+
+    def test_latest_pages_walk_backwards(self):
+        client = client_for(self.patient)
+        page = client.get(self.url, {'latest': 1, 'limit': 2}).json()
+        self.assertEqual([m['id'] for m in page['results']], self.ids[3:])
+        page = client.get(page['next']).json()
+        self.assertEqual([m['id'] for m in page['results']], self.ids[1:3])
+        page = client.get(page['next']).json()
+        self.assertEqual([m['id'] for m in page['results']], self.ids[:1])
+        self.assertIsNone(page['next'])
+
+    def test_since_message_id_returns_only_newer_messages(self):
+        client = client_for(self.patient)
+        page = client.get(self.url, {'since': self.ids[2]}).json()
+        self.assertEqual([m['id'] for m in page['results']], self.ids[3:])
+        self.assertEqual(client.get(self.url, {'since': 'yesterday'}).status_code, 400)
+
+
+class AppointmentSinceTests(TestCase):
+
+    def test_since_returns_only_changed_appointments(self):
+        patient = make_patient('pat')
+        doctor = make_doctor('doc')
+        first, second = (Appointment.objects.create(patient=patient, doctor=doctor,
+                                                    date=date.today(), time=f'{hour}:00')
+                         for hour in (10, 11))
+        client = client_for(patient)
+        page = client.get('/api/appointments/').json()
+        since = max(row['updated_at'] for row in page['results'])
+        self.assertEqual(client.get('/api/appointments/', {'since': since}).json()['results'], [])
+
+        first.status = 'cancelled'
+        first.save()
+        rows = client.get('/api/appointments/', {'since': since}).json()['results']
+        self.assertEqual([(row['id'], row['status']) for row in rows], [(first.pk, 'cancelled')])
+        self.assertEqual(client.get('/api/appointments/', {'since': 'soon'}).status_code, 400)
+
+
+class AppointmentSummaryTests(TestCase):
+
+    def test_counts_cover_every_page_of_the_callers_appointments(self):
+        doctor = make_doctor('doc')
+        patients = [make_patient(f'pat{n}') for n in range(3)]
+        for n, patient in enumerate(patients):
+            Appointment.objects.create(patient=patient, doctor=doctor, date=date.today(),
+                                       time=f'{9 + n}:00', status='pending')
+            Appointment.objects.create(patient=patient, doctor=doctor,
+                                       date=date.today() - timedelta(days=1), time='10:00', status='completed')
+        Appointment.objects.create(patient=patients[0], doctor=make_doctor('other'), date=date.today(),
+                                   time='10:00', status='approved')
+
+        response = client_for(doctor.user).get('/api/appointments/summary/', {'limit': 1})
+        self.assertEqual(response.json(), {
+            'total': 6, 'pending': 3, 'approved': 0, 'declined': 0, 'completed': 3,
+            'today': 3, 'upcoming': 3, 'patients': 3,
+        })
+        counts = client_for(patients[0]).get('/api/appointments/summary/').json()
+        self.assertEqual((counts['total'], counts['upcoming']), (3, 2))
+
+
+class PresenceTests(TestCase):
+
+    def check_store(self, store):
+        first = PresenceRegistry(ttl=60, store=store, worker='w1')
+        second = PresenceRegistry(ttl=60, store=store, worker='w2')
+        first.touch_many([(1, 'Ann', 'doctor'), (2, 'Bob', 'patient')])
+        second.touch(1, 'Ann', 'doctor')
+
+        # Leaving one worker keeps a user connected through another online
+        first.leave(1)
+        self.assertEqual([entry['id'] for entry in first.online()], [1, 2])
+        second.leave(1)
+        self.assertEqual([entry['id'] for entry in second.online()], [2])
+        self.assertEqual(first.online('doctor'), [])
+
+        # Memberships expire without a heartbeat
+        later = presence.time.time() + 61
+        with mock.patch.object(presence.time, 'time', return_value=later):
+            self.assertEqual(first.online(), [])
+
+    def test_memory_store(self):
+        self.check_store(MemoryPresenceStore())
+
+    @skipUnless(fakeredis, 'fakeredis is not installed')
+    def test_redis_store(self):
+        self.check_store(RedisPresenceStore(client=fakeredis.FakeRedis()))
+
+
+class AsyncReadViewTests(TestCase):
+    """The ASYNC_READ_VIEWS endpoints, requested through Django's ASGI handler."""
+
+    def setUp(self):
+        use_async_read_views(self)
+        self.doctor = make_doctor('doc')
+        self.patient = make_patient('pat')
+        self.appointment = Appointment.objects.create(patient=self.patient, doctor=self.doctor,
+                                                      date=date.today(), time='10:00')
+        self.message = ChatMessage.objects.create(appointment=self.appointment, sender=self.patient,
+                                                  message='hello')
+        Medicine.objects.create(name='Aspirin')
+        self.headers = {'Authorization': f'Bearer {tokens_for_user(self.patient).access_token}'}
+
+    async def get(self, path, **params):
+        response = await AsyncClient().get(path, params, headers=self.headers)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    async def test_lists(self):
+        appointments = await self.get('/api/appointments/')
+        self.assertEqual([row['id'] for row in appointments['results']], [self.appointment.pk])
+        medicines = await self.get('/api/medicines/')
+        self.assertEqual([row['name'] for row in medicines], ['Aspirin'])
+        doctors = await self.get('/api/doctors/')
+        self.assertEqual([row['id'] for row in doctors], [self.doctor.pk])
+        chat = await self.get(f'/api/chat/{self.appointment.pk}/', latest=1)
+        self.assertEqual([row['id'] for row in chat['results']], [self.message.pk])
+
+    async def test_missing_token_is_challenged(self):
+        response = await AsyncClient().get('/api/appointments/')
+        self.assertEqual(response.status_code, 401)
+        self.assertIn('Bearer', response['WWW-Authenticate'])
+
+
+class RealtimeMembershipTests(TestCase):
+
+    async def test_granted_membership_is_cached_per_token(self):
+        from realtime import auth
+
+        principal = auth.Principal(1, 'pat', 'Pat', 'patient')
+        principal.jti, principal.token_exp = 'jti-1', time_module.time() + 60
+        with mock.patch.object(auth, 'membership_cache', auth.MembershipCache()), \
+                mock.patch.object(auth, '_participates', side_effect=[False, True]) as participates:
+            self.assertFalse(await auth.can_join(principal, 7))
+            self.assertTrue(await auth.can_join(principal, 7))
+            self.assertTrue(await auth.can_join(principal, 7))
+        self.assertEqual(participates.call_count, 2)
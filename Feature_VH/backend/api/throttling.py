@@ -0,0 +1,112 @@
+"""
+Login throttling for the Virtual Hospital API.
+
+Every login attempt spends a token from two buckets: one keyed by the client
+IP and one keyed by the login id being tried. Buckets refill continuously at
+the configured rate, so a user who mistypes a password is barely slowed down
+while a credential-stuffing burst is rejected with 429 *before* the password
+hasher runs.
+
+Bucket state lives in a pluggable store (LOGIN_THROTTLE_STORE). The default
+in-memory store is per process; `CacheBucketStore` keeps buckets in the
+Django cache so every worker shares them when REDIS_URL is configured.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.module_loading import import_string
+from rest_framework.throttling import BaseThrottle
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate):
+    """Turn 'num/period' (e.g. '5/min') into (capacity, tokens per second)."""
+    num, period = rate.split('/')
+    capacity = int(num)
+    return capacity, capacity / PERIODS[period[0]]
+
+
+class MemoryBucketStore:
+    """Token buckets held in this process, bounded to the most recent keys."""
+
+    def __init__(self, max_keys=10000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consume(self, key, capacity, refill_rate, now=None):
+        """Take one token; return 0 if allowed, else seconds until one refills."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            tokens, stamp = self._buckets.pop(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - stamp) * refill_rate)
+            wait = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / refill_rate
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+            return wait
+
+
+class CacheBucketStore:
+    """Token buckets kept in the Django cache, shared by every worker.
+
+    Read-modify-write is not atomic across processes, so two racing attempts
+    can both spend the last token; the limit is approximate by at most the
+    number of concurrent workers, which is fine for a login throttle.
+    """
+
+    prefix = 'api:login_bucket:'
+
+    def consume(self, key, capacity, refill_rate, now=None):
+        now = time.time() if now is None else now
+        cache_key = self.prefix + key
+        tokens, stamp = cache.get(cache_key) or (capacity, now)
+        tokens = min(capacity, tokens + (now - stamp) * refill_rate)
+        wait = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / refill_rate
+        # Once full again the bucket is indistinguishable from a missing one
+        cache.set(cache_key, (tokens, now), timeout=int((capacity - tokens) / refill_rate) + 1)
+        return wait
+
+
+_store = None
+
+
+def get_store():
+    global _store
+    if _store is None:
+        _store = import_string(settings.LOGIN_THROTTLE_STORE)()
+    return _store
+
+
+class LoginRateThrottle(BaseThrottle):
+    """Token-bucket throttle keyed by client IP and by attempted login id."""
+
+    def allow_request(self, request, view):
+        rates = settings.LOGIN_THROTTLE_RATES
+        # The proxy-resolved client address (see NUM_PROXIES in settings)
+        keys = [('ip', self.get_ident(request))]
+        login_id = request.data.get('username')
+        if isinstance(login_id, str) and login_id.strip():
+            keys.append(('login', login_id.strip().lower()))
+
+        store = get_store()
+        self._wait = 0.0
+        for scope, ident in keys:
+            capacity, refill_rate = parse_rate(rates[scope])
+            self._wait = max(self._wait, store.consume(f'{scope}:{ident}', capacity, refill_rate))
+        return self._wait == 0
+
+    def wait(self):
+        return self._wait
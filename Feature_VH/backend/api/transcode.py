@@ -0,0 +1,90 @@
+"""
+ffmpeg work for call recordings, run inside the processing pool's worker
+processes (see api/processing.py).
+
+Kept free of Django imports so worker processes start cheaply and can be
+spawned rather than forked.
+"""
+import os
+import subprocess
+from array import array
+
+# Mono 8 kHz PCM is plenty for a waveform and for counting samples
+WAVEFORM_RATE = 8000
+# Peaks are first collected per 1/10 s, then folded down to the points wanted
+FINE_PEAKS_PER_SECOND = 10
+
+
+def measure(ffmpeg, path, points, timeout):
+    """Decode the audio track once; return (duration in seconds, waveform peaks).
+
+    Duration is counted from decoded samples rather than trusted from the
+    container header, which MediaRecorder's WebM files often leave empty.
+    Peaks are normalized to 0..1 and the stream is read in fixed blocks, so
+    memory does not grow with the recording's length beyond the fine peaks.
+    """
+    command = [ffmpeg, '-v', 'error', '-i', path, '-vn', '-ac', '1',
+               '-ar', str(WAVEFORM_RATE), '-f', 's16le', '-']
+    window = WAVEFORM_RATE // FINE_PEAKS_PER_SECOND
+    fine, pending, samples = [], array('h'), 0
+
+    with subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL) as proc:
+        while True:
+            block = proc.stdout.read(window * 2 * 64)
+            if not block:
+                break
+            if len(block) % 2:
+                block += proc.stdout.read(1)
+                block = block[:len(block) - len(block) % 2]
+            pending.frombytes(block)
+            samples += len(block) // 2
+            whole = len(pending) - len(pending) % window
+            fine.extend(_peak(pending[i:i + window]) for i in range(0, whole, window))
+            del pending[:whole]
+        proc.wait(timeout=timeout)
+        if proc.returncode:
+            raise RuntimeError(f'ffmpeg exited with status {proc.returncode} while decoding')
+    if pending:
+        fine.append(_peak(pending))
+
+    return samples / WAVEFORM_RATE, _fold(fine, points)
+
+
+def _peak(pcm):
+    return max(max(pcm), -min(pcm))
+
+
+def _fold(fine, points):
+    """Reduce fine peaks to at most `points` values in 0..1."""
+    if not fine:
+        return []
+    step = max(1, -(-len(fine) // points))
+    top = max(fine) or 1
+    return [round(max(fine[i:i + step]) / top, 3) for i in range(0, len(fine), step)]
+
+
+def transcode(ffmpeg, src, dst, args, timeout):
+    """Re-encode src into dst with the given ffmpeg output arguments."""
+    subprocess.run([ffmpeg, '-v', 'error', '-y', '-i', src, *args, dst],
+                   check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=timeout)
+
+
+def process(ffmpeg, src, dst, transcode_args, points, timeout):
+    """Measure and re-encode one recording.
+
+    Returns {'duration', 'waveform', 'output'}; `output` is dst when the
+    re-encoded file came out smaller than src, else None (and dst is removed,
+    including when re-encoding failed).
+    """
+    duration, waveform = measure(ffmpeg, src, points, timeout)
+    output = None
+    try:
+        transcode(ffmpeg, src, dst, transcode_args, timeout)
+        if os.path.getsize(dst) < os.path.getsize(src):
+            output = dst
+    except (subprocess.CalledProcessError, subprocess.TimeoutExpired):
+        pass  # keep the original file; the measurements still apply
+    finally:
+        if output is None and os.path.exists(dst):
+            os.remove(dst)
+    return {'duration': duration, 'waveform': waveform, 'output': output}
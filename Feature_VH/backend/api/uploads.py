@@ -0,0 +1,103 @@
+"""
+Chunked, resumable uploads for call recordings.
+
+A client declares the file size up front (oversize recordings are refused
+before any bytes are sent), then appends chunks at an explicit offset. Each
+chunk is streamed from the request body to a partial file in fixed-size
+reads, so memory per upload stays constant however large the chunk or file.
+A dropped connection keeps every byte that reached the disk: the client asks
+for the current offset and carries on from there. Finalizing hands the
+partial file to the storage backend as the CallRecording's file.
+"""
+import os
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.http import UnreadablePostError
+from django.utils import timezone
+
+from .models import CallRecording, RecordingUpload
+
+# Bytes read from the request body per write
+READ_SIZE = 64 * 1024
+
+
+class OffsetMismatch(Exception):
+    """The chunk does not start where the upload currently ends."""
+
+
+class PartialFile(File):
+    """A finished partial upload; FileSystemStorage moves it instead of copying."""
+
+    def temporary_file_path(self):
+        return self.name
+
+
+def partial_path(upload):
+    return os.path.join(settings.RECORDING_UPLOAD_DIR, f'{upload.pk}.part')
+
+
+def start(upload):
+    """Create the empty partial file for a new upload."""
+    os.makedirs(settings.RECORDING_UPLOAD_DIR, exist_ok=True)
+    open(partial_path(upload), 'wb').close()
+
+
+def append(upload, stream, offset, length):
+    """Write up to `length` bytes from `stream` at `offset`; return the new offset.
+
+    Bytes that arrived before the client went away are kept and counted. The
+    upload row stays locked from the offset check until `received` is stored,
+    so a concurrent or retried chunk for the same offset waits and is then
+    refused instead of truncating bytes that are being written.
+    """
+    with transaction.atomic():
+        received = (RecordingUpload.objects.select_for_update()
+                    .filter(pk=upload.pk).values_list('received', flat=True).first())
+        if received is None or offset != received:
+            raise OffsetMismatch()
+
+        written = 0
+        with open(partial_path(upload), 'r+b') as part:
+            part.seek(offset)
+            part.truncate()
+            try:
+                while written < length:
+                    data = stream.read(min(READ_SIZE, length - written))
+                    if not data:
+                        break
+                    part.write(data)
+                    written += len(data)
+            except (UnreadablePostError, OSError):
+                pass
+
+        RecordingUpload.objects.filter(pk=upload.pk).update(
+            received=offset + written, updated_at=timezone.now(),
+        )
+    upload.received = offset + written
+    return upload.received
+
+
+def finalize(upload):
+    """Turn a complete upload into a CallRecording and drop the upload record."""
+    path = partial_path(upload)
+    with transaction.atomic():
+        recording = CallRecording(
+            appointment_id=upload.appointment_id,
+            duration_seconds=upload.duration_seconds,
+        )
+        with open(path, 'rb') as part:
+            recording.recording_file.save(upload.filename, PartialFile(part, name=path), save=False)
+        recording.save()
+        upload.delete()
+    discard(upload)
+    return recording
+
+
+def discard(upload):
+    """Remove an upload's partial file if it is still around."""
+    try:
+        os.remove(partial_path(upload))
+    except FileNotFoundError:
+        pass
@@ -1,6 +1,7 @@
 """
 URL routing for the Virtual Hospital API.
 """
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from . import views
@@ -9,6 +10,8 @@ router = DefaultRouter()
 router.register(r'appointments', views.AppointmentViewSet, basename='appointments')
 router.register(r'medicines', views.MedicineViewSet, basename='medicines')
 router.register(r'prescriptions', views.PrescriptionViewSet, basename='prescriptions')
+router.register(r'working-hours', views.WorkingHoursViewSet, basename='working-hours')
+router.register(r'availability-exceptions', views.AvailabilityExceptionViewSet, basename='availability-exceptions')
 
 urlpatterns = [
     # Auth
@@ -18,7 +21,9 @@ urlpatterns = [
 
     # Doctors
     path('doctors/', views.DoctorListView.as_view(), name='doctor-list'),
+    path('doctors/availability/', views.doctor_availability, name='doctor-availability'),
     path('doctors/<int:pk>/', views.DoctorDetailView.as_view(), name='doctor-detail'),
+    path('doctors/<int:pk>/slots/', views.doctor_slots, name='doctor-slots'),
 
     # Patients
     path('patients/', views.PatientListView.as_view(), name='patient-list'),
@@ -29,6 +34,14 @@ urlpatterns = [
     # Recordings
     path('recordings/', views.upload_recording, name='upload-recording'),
     path('recordings/<int:appointment_id>/', views.get_recordings, name='get-recordings'),
+    path('recordings/stream/<int:recording_id>/', views.stream_recording, name='recording-stream'),
+    path('recordings/uploads/', views.start_recording_upload, name='recording-upload-start'),
+    path('recordings/uploads/<uuid:upload_id>/', views.recording_upload, name='recording-upload'),
+    path('recordings/uploads/<uuid:upload_id>/finalize/', views.finalize_recording_upload,
+         name='recording-upload-finalize'),
+
+    # Presence
+    path('presence/', views.online_users, name='presence'),
 
     # Admin
     path('admin/stats/', views.admin_stats, name='admin-stats'),
@@ -36,3 +49,15 @@ urlpatterns = [
     # Router URLs
     path('', include(router.urls)),
 ]
+
+# ASGI deployments serve the read-heavy lists from async views; they take
+# precedence over the synchronous routes above and delegate writes to them.
+if settings.ASYNC_READ_VIEWS:
+    from . import async_views
+
+    urlpatterns = [
+        path('doctors/', async_views.doctor_list, name='doctor-list'),
+        path('appointments/', async_views.appointment_list, name='appointments-list'),
+        path('medicines/', async_views.medicine_list, name='medicines-list'),
+        path('chat/<int:appointment_id>/', async_views.chat_history_list, name='chat-history'),
+    ] + urlpatterns
@@ -1,30 +1,54 @@
 """
 API Views for the Virtual Hospital Platform.
 """
-from rest_framework import viewsets, generics, status, filters
-from rest_framework.decorators import api_view, permission_classes, action
+import hashlib
+import json
+from datetime import time
+
+from rest_framework import viewsets, generics, status
+from rest_framework.decorators import api_view, permission_classes, throttle_classes, action
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework.renderers import JSONRenderer
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
 from django.db.models import Count, Q
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.cache import patch_cache_control
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.http import parse_etags
 
 from .models import (
     User, DoctorProfile, PatientProfile, Medicine,
     Appointment, Prescription, PrescriptionItem,
-    ChatMessage, CallRecording,
+    WorkingHours, AvailabilityException,
+    ChatMessage, CallRecording, RecordingUpload,
 )
 from .serializers import (
     UserSerializer, UserCreateSerializer,
     DoctorProfileSerializer, DoctorProfileUpdateSerializer,
     PatientProfileSerializer, PatientProfileUpdateSerializer,
     MedicineSerializer,
-    AppointmentSerializer, AppointmentCreateSerializer,
+    AppointmentSerializer, AppointmentRowSerializer, AppointmentCreateSerializer,
+    AppointmentSlotSerializer, WorkingHoursSerializer, AvailabilityExceptionSerializer,
     PrescriptionSerializer, PrescriptionCreateSerializer,
     ChatMessageSerializer,
-    CallRecordingSerializer,
+    CallRecordingSerializer, RecordingUploadSerializer,
 )
-from .permissions import IsDoctor, IsPatient, IsAdmin
+from .authentication import tokens_for_user
+from .caching import ADMIN_STATS_KEY, doctor_directory_key
+from .hashing import HasherBusy, verify_password
+from .pagination import AppointmentPagination, ChatHistoryPagination, RecentChatPagination
+from .permissions import IsDoctor, IsPatient, IsAdmin, appointments_of
+from .presence import presence
+from .search import RankedSearchFilter, doctor_index, medicine_index
+from .throttling import LoginRateThrottle
+from . import availability, playback, slots, streaming, uploads
 
 
 @api_view(['GET'])
@@ -52,7 +76,7 @@ def register_user(request):
     serializer = UserCreateSerializer(data=request.data)
     if serializer.is_valid():
         user = serializer.save()
-        refresh = RefreshToken.for_user(user)
+        refresh = tokens_for_user(user)
         return Response({
             'user': UserSerializer(user, context={'request': request}).data,
             'access_token': str(refresh.access_token),
@@ -65,6 +89,7 @@ def register_user(request):
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([LoginRateThrottle])
 def token_auth(request):
     """Authenticate user via username OR email, and verify role."""
     login_id = request.data.get('username')  # Can be username or email
@@ -86,7 +111,15 @@ def token_auth(request):
             status=status.HTTP_401_UNAUTHORIZED
         )
 
-    if not user.check_password(password):
+    try:
+        valid = verify_password(user, password)
+    except HasherBusy:
+        return Response(
+            {'detail': 'Login is busy, please retry shortly.'},
+            status=status.HTTP_503_SERVICE_UNAVAILABLE,
+            headers={'Retry-After': '1'},
+        )
+    if not valid:
         return Response(
             {'detail': 'Invalid credentials'},
             status=status.HTTP_401_UNAUTHORIZED
@@ -99,7 +132,7 @@ def token_auth(request):
             status=status.HTTP_403_FORBIDDEN
         )
 
-    refresh = RefreshToken.for_user(user)
+    refresh = tokens_for_user(user)
     return Response({
         'access_token': str(refresh.access_token),
         'refresh_token': str(refresh),
@@ -140,14 +173,47 @@ def current_user(request):
 # ─── Doctors ──────────────────────────────────────────────────────────────────
 
 class DoctorListView(generics.ListAPIView):
-    """List all doctor profiles (public)."""
+    """List all doctor profiles (public).
+
+    Responses are pre-rendered JSON snapshots cached per search term and
+    served with a strong ETag, so repeat requests can be answered with 304.
+    """
     queryset = DoctorProfile.objects.select_related('user').all()
     serializer_class = DoctorProfileSerializer
     permission_classes = [AllowAny]
-    filter_backends = [filters.SearchFilter]
-    search_fields = ['speciality', 'user__first_name', 'user__last_name']
+    filter_backends = [RankedSearchFilter]
+    search_index = doctor_index
     pagination_class = None  # Return all doctors without pagination
 
+    def list(self, request, *args, **kwargs):
+        search = request.query_params.get('search', '')
+        key = doctor_directory_key(request.build_absolute_uri('/'), search)
+        snapshot = cache.get(key)
+        if snapshot is None:
+            queryset = self.filter_queryset(self.get_queryset())
+            snapshot = doctor_directory_snapshot(self.get_serializer(queryset, many=True).data)
+            cache.set(key, snapshot, settings.DOCTOR_DIRECTORY_CACHE_TTL)
+        return doctor_directory_response(request, snapshot)
+
+
+def doctor_directory_snapshot(data):
+    """Render serialized doctors once, keyed by a strong ETag of the body."""
+    body = JSONRenderer().render(data)
+    return f'"{hashlib.sha1(body).hexdigest()}"', body
+
+
+def doctor_directory_response(request, snapshot):
+    """Serve a directory snapshot, answering 304 when the client's copy is current."""
+    etag, body = snapshot
+    if_none_match = parse_etags(request.META.get('HTTP_IF_NONE_MATCH', ''))
+    if etag in if_none_match or '*' in if_none_match:
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(body, content_type='application/json')
+    response['ETag'] = etag
+    patch_cache_control(response, public=True, max_age=settings.DOCTOR_DIRECTORY_MAX_AGE)
+    return response
+
 
 class DoctorDetailView(generics.RetrieveUpdateAPIView):
     """Get or update a single doctor profile."""
@@ -160,6 +226,76 @@ class DoctorDetailView(generics.RetrieveUpdateAPIView):
         return DoctorProfileSerializer
 
 
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def doctor_slots(request, pk):
+    """Next free appointment slots of a doctor, soonest first (`limit`, max 50)."""
+    try:
+        limit = max(1, min(int(request.query_params.get('limit', 10)), 50))
+    except ValueError:
+        limit = 10
+    serializer = AppointmentSlotSerializer(slots.next_available(pk, limit), many=True)
+    return Response(serializer.data)
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def doctor_availability(request):
+    """Doctors of a speciality with free slots on a date (or date range) and time window.
+
+    Query: `speciality` (required), `date` or `date_from`/`date_to` (at most
+    31 days), optional `from`/`to` times (HH:MM).
+    """
+    params = request.query_params
+    speciality = params.get('speciality', '').strip()
+    if not speciality:
+        return Response({'speciality': 'This parameter is required.'}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        date_from = parse_date(params.get('date_from') or params.get('date') or '')
+        date_to = parse_date(params.get('date_to') or '') or date_from
+        start = time.fromisoformat(params['from']) if params.get('from') else None
+        end = time.fromisoformat(params['to']) if params.get('to') else None
+    except ValueError:
+        date_from = None
+    if date_from is None or date_to < date_from or (date_to - date_from).days > 30:
+        return Response(
+            {'detail': 'Give `date` or a `date_from`/`date_to` range of at most 31 days, and HH:MM times.'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    return Response([
+        {
+            'doctor_id': day.doctor_id,
+            'name': f"Dr. {day.doctor.user.get_full_name()}",
+            'speciality': day.speciality,
+            'date': day.date,
+            'free_slots': [t.strftime('%H:%M') for t in free],
+        }
+        for day, free in availability.free_doctors(speciality, date_from, date_to, start, end)
+    ])
+
+
+class WorkingHoursViewSet(viewsets.ModelViewSet):
+    """The requesting doctor's weekly working hours."""
+    serializer_class = WorkingHoursSerializer
+    permission_classes = [IsDoctor]
+    pagination_class = None
+
+    def get_queryset(self):
+        return WorkingHours.objects.filter(doctor__user_id=self.request.user.pk)
+
+    def perform_create(self, serializer):
+        serializer.save(doctor=DoctorProfile.objects.get(user_id=self.request.user.pk))
+
+
+class AvailabilityExceptionViewSet(WorkingHoursViewSet):
+    """The requesting doctor's time off and extra hours on specific dates."""
+    serializer_class = AvailabilityExceptionSerializer
+
+    def get_queryset(self):
+        return AvailabilityException.objects.filter(doctor__user_id=self.request.user.pk)
+
+
 # ─── Patients ─────────────────────────────────────────────────────────────────
 
 class PatientListView(generics.ListAPIView):
@@ -173,21 +309,113 @@ class PatientListView(generics.ListAPIView):
 # ─── Appointments ─────────────────────────────────────────────────────────────
 
 class AppointmentViewSet(viewsets.ModelViewSet):
-    """CRUD for appointments. Filtered by user role."""
+    """CRUD for appointments. Filtered by user role.
+
+    Lists are keyset-paginated newest-first and accept `date_from`,
+    `date_to` (YYYY-MM-DD) and `status` (comma-separated) filters, plus
+    `since` (ISO 8601) to fetch only appointments changed after a previous
+    response's newest `updated_at`.
+    """
     serializer_class = AppointmentSerializer
     permission_classes = [IsAuthenticated]
-    pagination_class = None
+    pagination_class = AppointmentPagination
+    # Rows per keyset query when exporting
+    export_page_size = 2000
 
     def get_queryset(self):
         user = self.request.user
         qs = Appointment.objects.select_related('patient', 'doctor__user')
-        if user.role == 'doctor' and hasattr(user, 'doctor_profile'):
-            return qs.filter(doctor=user.doctor_profile)
+        if user.role == 'doctor':
+            qs = qs.filter(doctor__user_id=user.pk)
         elif user.role == 'patient':
-            return qs.filter(patient=user)
-        elif user.role == 'admin' or user.is_superuser:
-            return qs.all()
-        return qs.none()
+            qs = qs.filter(patient_id=user.pk)
+        elif not (user.role == 'admin' or user.is_superuser):
+            return qs.none()
+        return self._apply_filters(qs)
+
+    def _apply_filters(self, qs):
+        params = self.request.query_params
+        for param, lookup in (('date_from', 'date__gte'), ('date_to', 'date__lte')):
+            value = params.get(param)
+            if value:
+                try:
+                    parsed = parse_date(value)
+                except ValueError:
+                    parsed = None
+                if parsed is None:
+                    raise ValidationError({param: 'Expected a date in YYYY-MM-DD format.'})
+                qs = qs.filter(**{lookup: parsed})
+        statuses = [s for s in params.get('status', '').split(',') if s]
+        if statuses:
+            qs = qs.filter(status__in=statuses)
+        since = params.get('since')
+        if since:
+            try:
+                since_dt = parse_datetime(since)
+            except ValueError:
+                since_dt = None
+            if since_dt is None:
+                raise ValidationError({'since': 'Expected an ISO 8601 timestamp.'})
+            qs = qs.filter(updated_at__gt=since_dt)
+        return qs
+
+    def list(self, request, *args, **kwargs):
+        # Lean read path: column projection + plain dict rendering
+        queryset = AppointmentRowSerializer.rows(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(queryset)
+        return self.get_paginated_response(AppointmentRowSerializer(page, many=True).data)
+
+    @action(detail=False, methods=['get'])
+    def summary(self, request):
+        """Counts over every appointment the list would return, in one query.
+
+        Lists arrive a page at a time, so dashboards take their totals from
+        here rather than from the rows they have loaded.
+        """
+        today = timezone.localdate()
+        counts = self.get_queryset().aggregate(
+            total=Count('id'),
+            pending=Count('id', filter=Q(status='pending')),
+            approved=Count('id', filter=Q(status='approved')),
+            declined=Count('id', filter=Q(status='declined')),
+            completed=Count('id', filter=Q(status='completed')),
+            today=Count('id', filter=Q(date=today)),
+            upcoming=Count('id', filter=Q(date__gte=today, status__in=['pending', 'approved'])),
+            patients=Count('patient', distinct=True),
+        )
+        return Response(counts)
+
+    @action(detail=False, methods=['get'], permission_classes=[IsAdmin])
+    def export(self, request):
+        """Stream every matching appointment as NDJSON (admins only).
+
+        Rows are fetched in keyset pages on the list ordering, since a
+        server-side cursor is not available on MySQL (`.iterator()` would
+        buffer the whole result client-side).
+        """
+        queryset = AppointmentRowSerializer.rows(self.get_queryset())
+        serializer = AppointmentRowSerializer()
+        keyset = AppointmentPagination()
+
+        def pages():
+            key = None
+            while True:
+                page = queryset.order_by(*keyset.ordering)
+                if key is not None:
+                    page = page.filter(keyset.after(key))
+                rows = list(page[:self.export_page_size])
+                if not rows:
+                    return
+                yield ''.join(
+                    json.dumps(serializer.to_representation(row), cls=DjangoJSONEncoder) + '\n'
+                    for row in rows
+                )
+                key = keyset.key_of(rows[-1])
+
+        response = StreamingHttpResponse(streaming.body(request, pages()),
+                                         content_type='application/x-ndjson')
+        response['Content-Disposition'] = 'attachment; filename="appointments.ndjson"'
+        return response
 
     def create(self, request, *args, **kwargs):
         serializer = AppointmentCreateSerializer(
@@ -206,8 +434,14 @@ class AppointmentViewSet(viewsets.ModelViewSet):
         appointment = self.get_object()
         new_status = request.data.get('status')
         if new_status and new_status in ['approved', 'declined', 'completed']:
-            appointment.status = new_status
-            appointment.save()
+            with transaction.atomic():
+                if appointment.status == 'declined' and new_status != 'declined':
+                    # Its slot was released on decline and may be taken now
+                    slots.reclaim(appointment)
+                appointment.status = new_status
+                appointment.save()
+                if new_status == 'declined':
+                    slots.release(appointment)
             return Response(
                 AppointmentSerializer(appointment, context={'request': request}).data
             )
@@ -223,8 +457,8 @@ class MedicineViewSet(viewsets.ModelViewSet):
     """CRUD for medicines. Viewable by all, editable by Admins only."""
     queryset = Medicine.objects.all()
     serializer_class = MedicineSerializer
-    filter_backends = [filters.SearchFilter]
-    search_fields = ['name', 'category']
+    filter_backends = [RankedSearchFilter]
+    search_index = medicine_index
     pagination_class = None
 
     def get_permissions(self):
@@ -245,9 +479,9 @@ class PrescriptionViewSet(viewsets.ModelViewSet):
         user = self.request.user
         qs = Prescription.objects.select_related('doctor', 'patient').prefetch_related('items__medicine')
         if user.role == 'doctor':
-            return qs.filter(doctor=user)
+            return qs.filter(doctor_id=user.pk)
         elif user.role == 'patient':
-            return qs.filter(patient=user)
+            return qs.filter(patient_id=user.pk)
         return qs.all()
 
     def create(self, request, *args, **kwargs):
@@ -268,21 +502,61 @@ class PrescriptionViewSet(viewsets.ModelViewSet):
 @api_view(['GET', 'POST'])
 @permission_classes([IsAuthenticated])
 def chat_history(request, appointment_id):
-    """Get chat history or send a message for a specific appointment."""
+    """Get chat history or send a message for a specific appointment.
+
+    History is paged oldest-first on (timestamp, id): follow `next` for the
+    following page, or pass `since` to fetch only newer messages. With
+    `latest` the first page holds the newest messages and `next` leads to
+    older ones, so clients can load the backlog lazily.
+    """
     if request.method == 'POST':
         serializer = ChatMessageSerializer(
             data=request.data, context={'request': request}
         )
         if serializer.is_valid():
-            serializer.save(sender=request.user, appointment_id=appointment_id)
+            serializer.save(sender_id=request.user.pk, appointment_id=appointment_id)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    messages = chat_messages(appointment_id, request.query_params.get('since'))
+    if messages is None:
+        return Response({'since': CHAT_SINCE_ERROR}, status=status.HTTP_400_BAD_REQUEST)
+
+    paginator = chat_paginator(request)
+    page = paginator.paginate_queryset(messages, request)
+    serializer = ChatMessageSerializer(page, many=True, context={'request': request})
+    return paginator.get_paginated_response(serializer.data)
+
+
+CHAT_SINCE_ERROR = 'Expected a message id or an ISO 8601 timestamp.'
+
+
+def chat_messages(appointment_id, since=None):
+    """Messages of an appointment, optionally only those newer than `since`.
+
+    `since` is either the id of the last message the client has or an ISO
+    8601 timestamp. Returns None when it is neither.
+    """
     messages = ChatMessage.objects.filter(
         appointment_id=appointment_id
-    ).select_related('sender').order_by('timestamp')
-    serializer = ChatMessageSerializer(messages, many=True, context={'request': request})
-    return Response(serializer.data)
+    ).select_related('sender')
+
+    # Only messages newer than what the client already has
+    if since:
+        if since.isdigit():
+            return messages.filter(id__gt=int(since))
+        since_dt = parse_datetime(since)
+        if since_dt is None:
+            return None
+        messages = messages.filter(timestamp__gt=since_dt)
+    return messages
+
+
+def chat_paginator(request):
+    """Newest-first paginator when the client asks for the `latest` page."""
+    if request.query_params.get('latest'):
+        return RecentChatPagination()
+    return ChatHistoryPagination()
 
 
 # ─── Call Recordings ─────────────────────────────────────────────────────────
@@ -301,54 +575,175 @@ def upload_recording(request):
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_recordings(request, appointment_id):
-    """Get recordings for an appointment."""
-    recordings = CallRecording.objects.filter(appointment_id=appointment_id)
+    """Get recordings for an appointment (participants and admins only)."""
+    appointment = (Appointment.objects.filter(appointments_of(request.user), pk=appointment_id)
+                   .select_related('doctor').first())
+    if appointment is None:
+        return Response({'detail': 'Not found.'}, status=status.HTTP_404_NOT_FOUND)
+    recordings = CallRecording.objects.filter(appointment=appointment).select_related('appointment__doctor')
     serializer = CallRecordingSerializer(recordings, many=True, context={'request': request})
     return Response(serializer.data)
 
 
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def stream_recording(request, recording_id):
+    """Play a recording, with Range support for seeking.
+
+    Allowed with a valid signed `sig` (the recording's `stream_url`) or as an
+    authenticated participant of the appointment.
+    """
+    recordings = CallRecording.objects.all()
+    if not playback.valid_signature(recording_id, request.query_params.get('sig', '')):
+        user = request.user
+        if not user.is_authenticated:
+            return Response({'detail': 'Authentication credentials were not provided.'},
+                            status=status.HTTP_401_UNAUTHORIZED)
+        recordings = recordings.filter(appointments_of(user, 'appointment__'))
+    recording = recordings.filter(pk=recording_id).first()
+    if recording is None:
+        return Response({'detail': 'Not found.'}, status=status.HTTP_404_NOT_FOUND)
+    return playback.recording_response(request, recording)
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def start_recording_upload(request):
+    """Start a chunked recording upload (declared size max 50 MB).
+
+    Send the file as PATCH requests to the returned upload, each with an
+    `Upload-Offset` header, then POST to its `finalize/` URL. After a dropped
+    connection, GET the upload to learn where to resume.
+    """
+    serializer = RecordingUploadSerializer(data=request.data, context={'request': request})
+    if serializer.is_valid():
+        upload = serializer.save(owner_id=request.user.pk)
+        uploads.start(upload)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+    return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+def _upload_offset_response(upload, status_code=status.HTTP_200_OK, detail=None):
+    data = {'id': str(upload.pk), 'offset': upload.received, 'total_size': upload.total_size}
+    if detail:
+        data['detail'] = detail
+    return Response(data, status=status_code, headers={'Upload-Offset': str(upload.received)})
+
+
+@api_view(['GET', 'PATCH', 'DELETE'])
+@permission_classes([IsAuthenticated])
+def recording_upload(request, upload_id):
+    """Report the resume offset of, append a chunk to, or abandon an upload.
+
+    PATCH bodies are raw bytes (not multipart) and are streamed to disk.
+    """
+    upload = RecordingUpload.objects.filter(pk=upload_id, owner_id=request.user.pk).first()
+    if upload is None:
+        return Response({'detail': 'Not found.'}, status=status.HTTP_404_NOT_FOUND)
+
+    if request.method == 'GET':
+        return _upload_offset_response(upload)
+
+    if request.method == 'DELETE':
+        upload.delete()
+        uploads.discard(upload)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    try:
+        offset = int(request.headers['Upload-Offset'])
+    except (KeyError, ValueError):
+        return Response({'detail': 'Upload-Offset header is required.'}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        length = int(request.headers['Content-Length'])
+    except (KeyError, ValueError):
+        return Response({'detail': 'Content-Length header is required.'}, status=status.HTTP_411_LENGTH_REQUIRED)
+    if length <= 0:
+        return Response({'detail': 'Chunk is empty.'}, status=status.HTTP_400_BAD_REQUEST)
+    if length > settings.RECORDING_CHUNK_MAX_SIZE:
+        return Response(
+            {'detail': f'Chunks must not exceed {settings.RECORDING_CHUNK_MAX_SIZE} bytes.'},
+            status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+        )
+    if offset + length > upload.total_size:
+        return Response(
+            {'detail': 'Chunk runs past the declared file size.'},
+            status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+        )
+
+    try:
+        uploads.append(upload, request.stream, offset, length)
+    except uploads.OffsetMismatch:
+        upload.refresh_from_db(fields=['received'])
+        return _upload_offset_response(upload, status.HTTP_409_CONFLICT, 'Offset does not match the upload.')
+    return _upload_offset_response(upload)
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def finalize_recording_upload(request, upload_id):
+    """Turn a fully received upload into a call recording."""
+    upload = RecordingUpload.objects.filter(pk=upload_id, owner_id=request.user.pk).first()
+    if upload is None:
+        return Response({'detail': 'Not found.'}, status=status.HTTP_404_NOT_FOUND)
+    if upload.received != upload.total_size:
+        return _upload_offset_response(upload, status.HTTP_409_CONFLICT, 'Upload is incomplete.')
+
+    recording = uploads.finalize(upload)
+    serializer = CallRecordingSerializer(recording, context={'request': request})
+    return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+
+# ─── Presence ────────────────────────────────────────────────────────────────
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def online_users(request):
+    """List users with a live realtime connection. Non-admins only see doctors."""
+    role = request.query_params.get('role')
+    user = request.user
+    if not (user.role == 'admin' or user.is_superuser):
+        role = 'doctor'
+    return Response(presence.online(role))
+
+
 # ─── Admin Stats ─────────────────────────────────────────────────────────────
 
 @api_view(['GET'])
 @permission_classes([IsAdmin])
 def admin_stats(request):
-    """Get platform statistics for admin dashboard."""
-    from django.utils import timezone
-    from datetime import timedelta
-
-    total_doctors = DoctorProfile.objects.count()
-    total_patients = PatientProfile.objects.count()
-    total_appointments = Appointment.objects.count()
-    pending_appointments = Appointment.objects.filter(status='pending').count()
-    approved_appointments = Appointment.objects.filter(status='approved').count()
-    total_medicines = Medicine.objects.count()
-
-    # Active monitoring: users with last_login in last 15 minutes
-    time_threshold = timezone.now() - timedelta(minutes=15)
-    active_users = User.objects.filter(last_login__gte=time_threshold)
-    
-    online_doctors = []
-    online_patients = []
-    
-    for u in active_users:
-        user_data = {
-            'id': u.id,
-            'name': u.get_full_name() or u.username,
-            'role': u.role,
-            'last_active': u.last_login
-        }
-        if u.role == 'doctor':
-            online_doctors.append(user_data)
-        elif u.role == 'patient':
-            online_patients.append(user_data)
+    """Get platform statistics for admin dashboard.
+
+    Counters are cached for ADMIN_STATS_CACHE_TTL seconds; online users are
+    read live from the presence registry.
+    """
+    counters = cache.get(ADMIN_STATS_KEY)
+    if counters is None:
+        counters = _compute_admin_counters()
+        cache.set(ADMIN_STATS_KEY, counters, settings.ADMIN_STATS_CACHE_TTL)
 
+    # Active monitoring: users with a live realtime connection
     return Response({
-        'total_doctors': total_doctors,
-        'total_patients': total_patients,
-        'total_appointments': total_appointments,
-        'pending_appointments': pending_appointments,
-        'approved_appointments': approved_appointments,
-        'total_medicines': total_medicines,
-        'online_doctors': online_doctors,
-        'online_patients': online_patients,
+        **counters,
+        'online_doctors': presence.online('doctor'),
+        'online_patients': presence.online('patient'),
     })
+
+
+def _compute_admin_counters():
+    stats = Appointment.objects.aggregate(
+        total_appointments=Count('id'),
+        pending_appointments=Count('id', filter=Q(status='pending')),
+        approved_appointments=Count('id', filter=Q(status='approved')),
+    )
+    stats.update(User.objects.aggregate(
+        total_doctors=Count('doctor_profile'),
+        total_patients=Count('patient_profile'),
+    ))
+    return {
+        'total_doctors': stats['total_doctors'],
+        'total_patients': stats['total_patients'],
+        'total_appointments': stats['total_appointments'],
+        'pending_appointments': stats['pending_appointments'],
+        'approved_appointments': stats['approved_appointments'],
+        'total_medicines': Medicine.objects.count(),
+    }
@@ -0,0 +1,9 @@
+"""
+Timed scripts for the API's and realtime server's hot paths.
+
+Run one from backend/ with `python -m benchmarks.<name>`. Each script
+creates a throwaway test database from the configured settings (the same
+way `manage.py test` does), seeds it, prints its timings and drops it again,
+so it never touches real data. Absolute numbers depend on the database
+and machine; compare the rows of one run with each other.
+"""
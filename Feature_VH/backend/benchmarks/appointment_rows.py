@@ -0,0 +1,58 @@
+"""
+Rendering an appointments page: AppointmentSerializer vs AppointmentRowSerializer.
+
+Both fetch the same page from the database and produce the same response
+shape; the row serializer reads values() rows with names joined in SQL.
+Usage: python -m benchmarks.appointment_rows
+"""
+from datetime import date, timedelta
+
+from benchmarks.harness import measure, report, test_database
+
+from api.models import Appointment, DoctorProfile, User
+from api.serializers import AppointmentRowSerializer, AppointmentSerializer
+
+DOCTORS = 20
+PATIENTS = 200
+APPOINTMENTS = 5000
+PAGE = 500
+
+
+def _seed():
+    doctors = [
+        DoctorProfile.objects.create(user=User.objects.create_user(
+            username=f'doctor{n}', password='x', role='doctor', first_name='Doc', last_name=str(n)))
+        for n in range(DOCTORS)
+    ]
+    patients = User.objects.bulk_create([
+        User(username=f'patient{n}', role='patient', first_name='Pat', last_name=str(n))
+        for n in range(PATIENTS)
+    ])
+    Appointment.objects.bulk_create([
+        Appointment(patient=patients[n % PATIENTS], doctor=doctors[n % DOCTORS],
+                    date=date(2030, 1, 1) + timedelta(days=n % 90), time='10:00', reason='Checkup')
+        for n in range(APPOINTMENTS)
+    ], batch_size=1000)
+
+
+def main():
+    with test_database():
+        _seed()
+        queryset = Appointment.objects.order_by('-date', '-created_at', '-id')
+
+        def model_serializer():
+            page = queryset.select_related('patient', 'doctor__user')[:PAGE]
+            AppointmentSerializer(page, many=True).data
+
+        def row_serializer():
+            page = AppointmentRowSerializer.rows(queryset)[:PAGE]
+            AppointmentRowSerializer(page, many=True).data
+
+        report(f'one page of {PAGE} appointments, fetch + render', [
+            ('AppointmentSerializer (select_related)', measure(model_serializer)),
+            ('AppointmentRowSerializer (values rows)', measure(row_serializer)),
+        ])
+
+
+if __name__ == '__main__':
+    main()
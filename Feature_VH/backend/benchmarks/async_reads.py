@@ -0,0 +1,124 @@
+"""
+Concurrent reads through Django's ASGI application with and without
+ASYNC_READ_VIEWS, next to the same requests served one at a time (a single
+sync worker).
+
+Fires 200 concurrent GETs at the doctor directory (served from the cache),
+the medicine list and a patient's appointment list. Every query is delayed
+by BENCHMARK_QUERY_LATENCY_MS (default 5) to stand in for the round trip
+to a database server; with SQLite in-process there is nothing to wait on
+and async cannot help.
+Usage: [BENCHMARK_QUERY_LATENCY_MS=50] python -m benchmarks.async_reads
+"""
+import asyncio
+import importlib
+import os
+import time
+
+from benchmarks.harness import report, test_database
+
+from django.core.asgi import get_asgi_application
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.test import Client, override_settings
+from django.urls import clear_url_caches
+
+from api import urls
+from api.authentication import tokens_for_user
+from api.models import Appointment, DoctorProfile, Medicine, User
+from config import urls as root_urls
+
+REQUESTS = 200
+PATHS = ('/api/doctors/', '/api/medicines/', '/api/appointments/')
+QUERY_LATENCY = float(os.environ.get('BENCHMARK_QUERY_LATENCY_MS', '5')) / 1000
+
+
+def _delay(execute, sql, params, many, context):
+    time.sleep(QUERY_LATENCY)
+    return execute(sql, params, many, context)
+
+
+def _add_latency(sender, connection, **kwargs):
+    connection.execute_wrappers.append(_delay)
+
+
+def _reload_urls():
+    # The root urlconf holds the api resolver, which caches its patterns
+    importlib.reload(urls)
+    importlib.reload(root_urls)
+    clear_url_caches()
+
+
+def _seed():
+    doctors = [
+        DoctorProfile.objects.create(user=User.objects.create_user(username=f'doctor{n}', password='x',
+                                                                   role='doctor'))
+        for n in range(50)
+    ]
+    patient = User.objects.create_user(username='patient', password='x', role='patient')
+    Medicine.objects.bulk_create([Medicine(name=f'Medicine {n}') for n in range(200)])
+    Appointment.objects.bulk_create([
+        Appointment(patient=patient, doctor=doctors[n % 50], date='2030-01-01', time='10:00')
+        for n in range(200)
+    ])
+    return patient
+
+
+async def _asgi_get(application, path, token):
+    """One GET through the ASGI application, as an ASGI server would send it."""
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+        'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'query_string': b'',
+        'root_path': '', 'server': ('testserver', 80), 'client': ('127.0.0.1', 50000),
+        'headers': [(b'host', b'testserver'), (b'authorization', f'Bearer {token}'.encode())],
+    }
+    sent = []
+    incoming = [{'type': 'http.request', 'body': b'', 'more_body': False}]
+
+    async def receive():
+        if incoming:
+            return incoming.pop()
+        # The client never disconnects early
+        await asyncio.Event().wait()
+
+    async def send(message):
+        sent.append(message)
+
+    await application(scope, receive, send)
+    return sent[0]['status']
+
+
+async def _concurrent(path, token):
+    application = get_asgi_application()
+    start = time.perf_counter()
+    statuses = await asyncio.gather(*(_asgi_get(application, path, token) for _ in range(REQUESTS)))
+    assert set(statuses) == {200}, statuses
+    return time.perf_counter() - start
+
+
+def _serial(path, token):
+    client = Client()
+    start = time.perf_counter()
+    for _ in range(REQUESTS):
+        assert client.get(path, headers={'Authorization': f'Bearer {token}'}).status_code == 200
+    return time.perf_counter() - start
+
+
+def main():
+    with test_database():
+        token = str(tokens_for_user(_seed()).access_token)
+        _add_latency(None, connection)
+        connection_created.connect(_add_latency)
+        rows = []
+        for path in PATHS:
+            rows.append((f'{path} one sync worker', _serial(path, token)))
+            rows.append((f'{path} ASGI, sync views', asyncio.run(_concurrent(path, token))))
+            with override_settings(ASYNC_READ_VIEWS=True):
+                _reload_urls()
+                rows.append((f'{path} ASGI, async views', asyncio.run(_concurrent(path, token))))
+            _reload_urls()
+        report(f'{REQUESTS} GETs, {QUERY_LATENCY * 1000:.0f} ms per query, total wall time', rows)
+
+
+if __name__ == '__main__':
+    main()
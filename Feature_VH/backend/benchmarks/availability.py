@@ -0,0 +1,103 @@
+"""
+"Which cardiologists are free Thursday afternoon" at 5000 doctors.
+
+Compares availability.free_doctors (one indexed lookup on the DoctorDay
+bitmaps) with answering from DoctorProfile and Appointment rows, and times
+the bitmap maintenance: a full rebuild, one doctor's rebuild after a
+calendar edit, and claiming a slot.
+Usage: python -m benchmarks.availability
+"""
+import random
+from datetime import date, datetime, time, timedelta
+
+from benchmarks.harness import measure, report, test_database
+
+from django.conf import settings
+
+from api import availability
+from api.models import Appointment, AppointmentSlot, DoctorProfile, User
+
+DOCTORS = 5000
+DAYS = 30
+SPECIALITIES = ('Cardiology', 'Dermatology', 'Neurology', 'Pediatrics', 'Orthopedics',
+                'Psychiatry', 'Oncology', 'General', 'Radiology', 'Urology')
+BOOKINGS = 300000
+AFTERNOON = (time(13), time(17))
+
+
+def _seed(start):
+    rng = random.Random(1)
+    users = User.objects.bulk_create([
+        User(username=f'doctor{n}', role='doctor') for n in range(DOCTORS)
+    ], batch_size=1000)
+    doctors = DoctorProfile.objects.bulk_create([
+        DoctorProfile(user=user, speciality=SPECIALITIES[n % len(SPECIALITIES)])
+        for n, user in enumerate(users)
+    ], batch_size=1000)
+    patient = User.objects.create_user(username='patient', password='x', role='patient')
+    step = timedelta(minutes=settings.APPOINTMENT_SLOT_MINUTES)
+    opening = datetime.combine(start, settings.APPOINTMENT_DAY_START)
+    slots_per_day = int((datetime.combine(start, settings.APPOINTMENT_DAY_END) - opening) / step)
+    booked = {(rng.randrange(DOCTORS), rng.randrange(DAYS), rng.randrange(slots_per_day))
+              for _ in range(BOOKINGS)}
+    booked = sorted(booked)
+    appointments = Appointment.objects.bulk_create([
+        Appointment(patient=patient, doctor=doctors[d], date=start + timedelta(days=day),
+                    time=(opening + step * slot).strftime('%H:%M'), status='approved')
+        for d, day, slot in booked
+    ], batch_size=2000)
+    AppointmentSlot.objects.bulk_create([
+        AppointmentSlot(doctor=doctors[d], date=start + timedelta(days=day),
+                        start_time=(opening + step * slot).time(), appointment=appointment)
+        for (d, day, slot), appointment in zip(booked, appointments)
+    ], batch_size=2000)
+    return doctors
+
+
+def _free_from_appointments(speciality, day, start, end):
+    """The same answer without bitmaps: every doctor's bookings in the window."""
+    step = timedelta(minutes=settings.APPOINTMENT_SLOT_MINUTES)
+    window = []
+    moment = datetime.combine(day, start)
+    while moment < datetime.combine(day, end):
+        window.append(moment.strftime('%H:%M'))
+        moment += step
+    taken = {}
+    for doctor_id, booked in (Appointment.objects.filter(doctor__speciality=speciality, date=day)
+                              .exclude(status='declined').values_list('doctor_id', 'time')):
+        taken.setdefault(doctor_id, set()).add(booked)
+    doctors = DoctorProfile.objects.filter(speciality=speciality, available=True).select_related('user')
+    return [doctor for doctor in doctors if set(window) - taken.get(doctor.pk, set())]
+
+
+def main():
+    with test_database():
+        start = date.today() + timedelta(days=1)
+        doctors = _seed(start)
+        thursday = start + timedelta(days=(3 - start.weekday()) % 7)
+
+        rebuild_all = measure(lambda: availability.rebuild(None, start, DAYS), repeat=1)
+        bitmap = availability.free_doctors('Cardiology', thursday, start=AFTERNOON[0], end=AFTERNOON[1])
+        scanned = _free_from_appointments('Cardiology', thursday, *AFTERNOON)
+        assert len(bitmap) == len(scanned), (len(bitmap), len(scanned))
+
+        doctor = doctors[0]
+        free = availability.free_doctors('Cardiology', thursday)
+        report(f'{DOCTORS} doctors, {DAYS} days, {BOOKINGS} bookings; '
+               f'{len(bitmap)} cardiologists free Thursday afternoon', [
+            ('free_doctors (bitmap lookup)',
+             measure(lambda: availability.free_doctors('Cardiology', thursday,
+                                                       start=AFTERNOON[0], end=AFTERNOON[1]), 10)),
+            ('from profiles + appointments', measure(lambda: _free_from_appointments('Cardiology', thursday,
+                                                                                     *AFTERNOON), 10)),
+            (f'rebuild all {DOCTORS * DAYS} doctor days', rebuild_all),
+            ('rebuild one doctor (calendar edit)',
+             measure(lambda: availability.rebuild([doctor.pk], start, DAYS), 10)),
+            ('claim + release one slot',
+             measure(lambda: (availability.claim(free[0][0].doctor_id, thursday, free[0][1][0]),
+                              availability.release(free[0][0].doctor_id, thursday, free[0][1][0])), 50)),
+        ])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+"""
+Chat history reads for a long conversation: everything vs keyset pages.
+
+Compares serializing the whole history (what chat_history returned before)
+with the first page of the newest messages and with a reconnect that only
+asks for messages newer than the last one the client has.
+Usage: python -m benchmarks.chat_history
+"""
+from benchmarks.harness import api_client, measure, report, test_database
+
+from api.models import Appointment, ChatMessage, DoctorProfile, User
+from api.serializers import ChatMessageSerializer
+
+MESSAGES = 5000
+
+
+def main():
+    with test_database():
+        patient = User.objects.create_user(username='patient', password='x', role='patient')
+        doctor_user = User.objects.create_user(username='doctor', password='x', role='doctor')
+        doctor = DoctorProfile.objects.create(user=doctor_user)
+        appointment = Appointment.objects.create(patient=patient, doctor=doctor, date='2030-01-01', time='10:00')
+        ChatMessage.objects.bulk_create([
+            ChatMessage(appointment=appointment, sender=patient if n % 2 else doctor_user,
+                        message=f'Message number {n}')
+            for n in range(MESSAGES)
+        ], batch_size=1000)
+        last_id = ChatMessage.objects.latest('id').id
+        client = api_client(patient)
+        url = f'/api/chat/{appointment.pk}/'
+
+        def everything():
+            messages = ChatMessage.objects.filter(appointment=appointment).select_related('sender')
+            ChatMessageSerializer(messages, many=True).data
+
+        def latest_page():
+            assert client.get(url, {'latest': 1}).status_code == 200
+
+        def since_last_seen():
+            assert client.get(url, {'since': last_id - 5}).status_code == 200
+
+        report(f'{MESSAGES} messages, per request', [
+            ('whole history, serialized', measure(everything)),
+            ('GET ?latest=1 (newest page of 100)', measure(latest_page, 10)),
+            ('GET ?since=<id> (5 new messages)', measure(since_last_seen, 10)),
+        ])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+"""
+Authenticating a request and checking its role: SimpleJWT's
+JWTAuthentication (one User query per request) vs ClaimsJWTAuthentication.
+
+Also counts the queries each makes, which is the part that grows with
+database latency.
+Usage: python -m benchmarks.claims_auth
+"""
+from benchmarks.harness import measure, report, test_database
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from api.authentication import ClaimsJWTAuthentication, tokens_for_user
+from api.models import User
+from api.permissions import IsDoctor
+
+REQUESTS = 1000
+
+
+def main():
+    with test_database():
+        doctor = User.objects.create_user(username='doctor', password='x', role='doctor')
+        header = f'Bearer {tokens_for_user(doctor).access_token}'
+        factory = APIRequestFactory()
+
+        def authorize(backend):
+            def call():
+                request = Request(factory.get('/api/appointments/', HTTP_AUTHORIZATION=header))
+                request.user, request.auth = backend.authenticate(request)
+                assert IsDoctor().has_permission(request, None)
+            return call
+
+        rows = []
+        for label, backend in (('JWTAuthentication', JWTAuthentication()),
+                               ('ClaimsJWTAuthentication', ClaimsJWTAuthentication())):
+            call = authorize(backend)
+            with CaptureQueriesContext(connection) as queries:
+                call()
+            rows.append((f'{label} ({len(queries)} queries)', measure(call, REQUESTS)))
+        report('authenticate + IsDoctor, per request', rows)
+
+
+if __name__ == '__main__':
+    main()
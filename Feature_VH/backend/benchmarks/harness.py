@@ -0,0 +1,69 @@
+"""
+Shared setup and timing helpers for the benchmark scripts.
+
+Importing this module sets Django up, so scripts import it before anything
+from Django or the apps.
+"""
+import os
+import statistics
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+import django
+django.setup()
+
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+
+@contextmanager
+def test_database():
+    """Create the test database for the duration of a benchmark."""
+    if connection.vendor == 'sqlite':
+        # A file, so that pool threads share it like a server database
+        test_settings = connection.settings_dict.setdefault('TEST', {})
+        test_settings['NAME'] = os.path.join(tempfile.mkdtemp(), 'benchmark.sqlite3')
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+def api_client(user):
+    """APIClient sending a bearer access token for user, as the frontend does."""
+    from rest_framework.test import APIClient
+    from api.authentication import tokens_for_user
+
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {tokens_for_user(user).access_token}')
+    return client
+
+
+def measure(fn, number=1, repeat=5):
+    """Median seconds per call of fn() over `repeat` rounds of `number` calls."""
+    rounds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        rounds.append((time.perf_counter() - start) / number)
+    return statistics.median(rounds)
+
+
+def report(title, rows):
+    """Print (label, seconds) rows as a small table, in ms (µs below 1 ms)."""
+    print(title)
+    width = max(len(label) for label, _ in rows)
+    for label, seconds in rows:
+        if seconds < 0.001:
+            print(f'  {label:<{width}}  {seconds * 1e6:10.1f} µs')
+        else:
+            print(f'  {label:<{width}}  {seconds * 1000:10.1f} ms')
@@ -0,0 +1,78 @@
+"""
+A credential-stuffing burst against /api/token-auth/, with and without the
+login throttle, and what it does to a legitimate login meanwhile.
+
+8 threads send 160 wrong-password attempts for 40 existing accounts from
+one address; a real user then logs in from another address while the burst
+is still running.
+Usage: python -m benchmarks.login_burst
+"""
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.harness import report, test_database
+
+from django.db import connection
+from django.test import Client, override_settings
+
+from api.models import User
+
+THREADS = 8
+ATTEMPTS = 160
+ACCOUNTS = 40
+UNTHROTTLED = {'ip': '100000/s', 'login': '100000/s'}
+
+
+def _post(client, username, password, address):
+    response = client.post('/api/token-auth/', {'username': username, 'password': password},
+                           content_type='application/json', REMOTE_ADDR=address)
+    return response.status_code
+
+
+def _burst():
+    statuses = Counter()
+    clients = threading.local()
+
+    def attempt(n):
+        if not hasattr(clients, 'client'):
+            clients.client = Client()
+        try:
+            statuses[_post(clients.client, f'user{n % ACCOUNTS}', 'wrong', '203.0.113.9')] += 1
+        finally:
+            connection.close()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(THREADS) as pool:
+        futures = [pool.submit(attempt, n) for n in range(ATTEMPTS)]
+        time.sleep(0.2)
+        login_start = time.perf_counter()
+        legit = _post(Client(), 'real', 'correct horse', '198.51.100.7')
+        login_time = time.perf_counter() - login_start
+        for future in futures:
+            future.result()
+    return time.perf_counter() - start, login_time, legit, statuses
+
+
+def main():
+    with test_database():
+        for n in range(ACCOUNTS):
+            User.objects.create_user(username=f'user{n}', password='secret', role='patient')
+        User.objects.create_user(username='real', password='correct horse', role='patient')
+
+        rows = []
+        # Unthrottled first: its buckets are capped back to the real rates afterwards
+        for label, rates in (('unthrottled', UNTHROTTLED), ('throttled', None)):
+            with override_settings(**({'LOGIN_THROTTLE_RATES': rates} if rates else {})):
+                elapsed, login_time, legit, statuses = _burst()
+            summary = ', '.join(f'{code}: {count}' for code, count in sorted(statuses.items()))
+            rows += [
+                (f'{label}: burst ({summary})', elapsed),
+                (f'{label}: legitimate login during burst ({legit})', login_time),
+            ]
+        report(f'{ATTEMPTS} bad logins from {THREADS} threads', rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""
+Event-loop stalls caused by realtime ORM work, inline vs realtime.db.run_db.
+
+A heartbeat task ticks every millisecond while 200 connections load their
+principal and write a chat message at once; its longest late tick is how
+long every other room on the worker would have been frozen.
+Usage: python -m benchmarks.realtime_db_offload
+"""
+import asyncio
+import os
+import time
+
+from benchmarks.harness import report, test_database
+
+from api.models import Appointment, ChatMessage, DoctorProfile, User
+from realtime import db
+from realtime.auth import _load_principal
+
+CONNECTIONS = 200
+
+
+def _handshake(user_id, appointment_id):
+    principal = _load_principal(user_id)
+    ChatMessage.objects.create(appointment_id=appointment_id, sender_id=principal.id, message='hi')
+
+
+async def _run(call):
+    stalls = []
+    done = asyncio.Event()
+
+    async def heartbeat():
+        while not done.is_set():
+            before = time.perf_counter()
+            await asyncio.sleep(0.001)
+            stalls.append(time.perf_counter() - before - 0.001)
+
+    ticker = asyncio.create_task(heartbeat())
+    start = time.perf_counter()
+    await asyncio.gather(*(call() for _ in range(CONNECTIONS)))
+    elapsed = time.perf_counter() - start
+    done.set()
+    await ticker
+    return elapsed, max(stalls)
+
+
+def main():
+    with test_database():
+        patient = User.objects.create_user(username='patient', password='x', role='patient')
+        doctor_user = User.objects.create_user(username='doctor', password='x', role='doctor')
+        doctor = DoctorProfile.objects.create(user=doctor_user)
+        appointment = Appointment.objects.create(patient=patient, doctor=doctor, date='2030-01-01', time='10:00')
+        args = (patient.pk, appointment.pk)
+
+        async def inline():
+            _handshake(*args)
+
+        async def offloaded():
+            await db.run_db(_handshake, *args)
+
+        # What the handlers did before: Django refuses it unless told otherwise
+        os.environ['DJANGO_ALLOW_ASYNC_UNSAFE'] = 'true'
+        inline_time, inline_stall = asyncio.run(_run(inline))
+        del os.environ['DJANGO_ALLOW_ASYNC_UNSAFE']
+        pool_time, pool_stall = asyncio.run(_run(offloaded))
+        db.shutdown()
+        report(f'{CONNECTIONS} concurrent handshakes', [
+            ('inline: total', inline_time),
+            ('inline: longest loop stall', inline_stall),
+            (f'run_db ({db.DB_POOL_SIZE} threads): total', pool_time),
+            (f'run_db ({db.DB_POOL_SIZE} threads): longest loop stall', pool_stall),
+        ])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""
+Room broadcast latency through the in-process and Redis backplanes.
+
+Two ConnectionManagers stand in for two workers; every room has one socket
+on each, and each broadcast is timed until it reaches the other worker's
+socket. Uses the Redis server at REALTIME_BACKPLANE_URL if set, otherwise
+fakeredis as a local stand-in (which only shows the backplane's own
+overhead, not the network round trip).
+Usage: python -m benchmarks.realtime_fanout
+"""
+import asyncio
+import os
+import statistics
+import time
+
+from benchmarks.harness import report
+
+from realtime.backplane import InProcessBackplane, RedisBackplane
+from realtime.manager import ConnectionManager
+
+ROOMS = 50
+MESSAGES = 2000
+
+
+class FakeSocket:
+    """Records when each frame arrives."""
+
+    def __init__(self, arrivals):
+        self.arrivals = arrivals
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, frame):
+        self.arrivals.append(time.perf_counter())
+
+
+async def _run(backplanes):
+    arrivals = []
+    managers = [ConnectionManager('bench', backplane) for backplane in backplanes]
+    for backplane in backplanes:
+        await backplane.start()
+    sender = managers[0]
+    receiver = managers[-1]
+    senders = []
+    for room in range(ROOMS):
+        sending = FakeSocket([])
+        await sender.connect(sending, str(room))
+        await receiver.connect(FakeSocket(arrivals), str(room))
+        senders.append(sending)
+
+    latencies = []
+    for n in range(MESSAGES):
+        room = n % ROOMS
+        expected = len(arrivals) + 1
+        sent = time.perf_counter()
+        await sender.broadcast_frame('{"type":"chat","message":"hi"}', 'chat', str(room), exclude=senders[room])
+        while len(arrivals) < expected:
+            await asyncio.sleep(0)
+        latencies.append(arrivals[-1] - sent)
+
+    for manager in managers:
+        for websocket, connection in list(manager.connections.items()):
+            manager.disconnect(websocket, connection.room_id)
+    for backplane in backplanes:
+        await backplane.stop()
+    latencies.sort()
+    return statistics.median(latencies), latencies[int(len(latencies) * 0.99)]
+
+
+def _redis_pair():
+    url = os.environ.get('REALTIME_BACKPLANE_URL')
+    if url:
+        return 'redis', [RedisBackplane(url), RedisBackplane(url)]
+    import fakeredis
+    server = fakeredis.FakeServer()
+    return 'fakeredis', [RedisBackplane(client=fakeredis.FakeAsyncRedis(server=server)) for _ in range(2)]
+
+
+def main():
+    local_p50, local_p99 = asyncio.run(_run([InProcessBackplane()]))
+    name, pair = _redis_pair()
+    redis_p50, redis_p99 = asyncio.run(_run(pair))
+    report(f'{MESSAGES} broadcasts over {ROOMS} rooms, publish to delivery', [
+        ('in-process, one worker: p50', local_p50),
+        ('in-process, one worker: p99', local_p99),
+        (f'{name}, across two workers: p50', redis_p50),
+        (f'{name}, across two workers: p99', redis_p99),
+    ])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""
+Per-frame cost of relaying signaling and chat frames.
+
+Compares the dict rebuild and re-encode the handlers did before with
+Session.relay_frame / Session.chat_frame, for a trickle of ICE candidates
+and for chat messages.
+Usage: python -m benchmarks.realtime_relay
+"""
+import json
+from datetime import datetime
+
+from benchmarks.harness import measure, report
+
+from realtime.auth import Principal
+from realtime.session import Session
+
+FRAMES = 10000
+ICE = json.dumps({
+    'type': 'ice-candidate',
+    'candidate': {
+        'candidate': 'candidate:842163049 1 udp 1677729535 203.0.113.7 50514 typ srflx '
+                     'raddr 10.0.0.12 rport 50514 generation 0 ufrag sXyZ network-cost 999',
+        'sdpMid': '0',
+        'sdpMLineIndex': 0,
+    },
+})
+
+
+def main():
+    principal = Principal(42, 'dr.house', 'Gregory House', 'doctor')
+    session = Session(principal, '7')
+    timestamp = datetime(2030, 1, 1).isoformat()
+
+    def dict_relay():
+        data = json.loads(ICE)
+        relay = {**data, 'from_user_id': principal.id, 'from_user_name': principal.full_name}
+        json.dumps(relay, separators=(',', ':'), ensure_ascii=False)
+
+    def session_relay():
+        session.relay_frame(ICE, json.loads(ICE))
+
+    def dict_chat():
+        json.dumps({
+            'type': 'chat', 'sender': principal.full_name or principal.username,
+            'sender_role': principal.role, 'sender_id': principal.id,
+            'message': 'See you at ten', 'timestamp': timestamp,
+        }, separators=(',', ':'), ensure_ascii=False)
+
+    def session_chat():
+        session.chat_frame('See you at ten', timestamp)
+
+    report(f'per frame, median of 5 x {FRAMES}', [
+        ('ICE relay: rebuild dict + dumps', measure(dict_relay, FRAMES)),
+        ('ICE relay: Session.relay_frame', measure(session_relay, FRAMES)),
+        ('chat: build dict + dumps', measure(dict_chat, FRAMES)),
+        ('chat: Session.chat_frame', measure(session_chat, FRAMES)),
+    ])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""
+Serving a 50 MB recording: reading it into memory vs the playback endpoint.
+
+Times each response until its body has been consumed, and records the
+peak Python memory allocated (tracemalloc) while doing so. Covers a whole
+file, a seek (open-ended range, what a browser sends) and a bounded range,
+plus the X-Accel-Redirect hand-off where the proxy sends the bytes.
+Usage: python -m benchmarks.recording_playback
+"""
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.harness import api_client, report, test_database
+
+from django.http import HttpResponse
+from django.test import override_settings
+
+from api.models import Appointment, CallRecording, DoctorProfile, User
+
+SIZE = 50 * 1024 * 1024
+
+
+def _timed(get):
+    """(seconds, peak bytes) to produce a response and drain its body."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    response = get()
+    received = 0
+    if response.streaming:
+        for chunk in response.streaming_content:
+            received += len(chunk)
+    else:
+        received = len(response.content)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    response.close()
+    return elapsed, peak, received
+
+
+def main():
+    media = tempfile.mkdtemp()
+    try:
+        with test_database(), override_settings(MEDIA_ROOT=media):
+            os.makedirs(os.path.join(media, 'recordings'))
+            with open(os.path.join(media, 'recordings', 'call.webm'), 'wb') as f:
+                f.write(os.urandom(SIZE))
+            patient = User.objects.create_user(username='patient', password='x', role='patient')
+            doctor = DoctorProfile.objects.create(
+                user=User.objects.create_user(username='doctor', password='x', role='doctor'))
+            appointment = Appointment.objects.create(patient=patient, doctor=doctor,
+                                                     date='2030-01-01', time='10:00')
+            # bulk_create: no post_save, so no background processing is queued
+            CallRecording.objects.bulk_create([CallRecording(
+                appointment=appointment, recording_file='recordings/call.webm', file_size=SIZE)])
+            recording = CallRecording.objects.get(appointment=appointment)
+            client = api_client(patient)
+            url = f'/api/recordings/stream/{recording.pk}/'
+
+            def read_into_memory():
+                with recording.recording_file.open('rb') as f:
+                    return HttpResponse(f.read(), content_type='video/webm')
+
+            cases = [
+                ('read into memory, whole file', read_into_memory),
+                ('playback, whole file', lambda: client.get(url)),
+                ('playback, seek (bytes=25000000-)', lambda: client.get(url, HTTP_RANGE='bytes=25000000-')),
+                ('playback, 1 MB range', lambda: client.get(url, HTTP_RANGE='bytes=25000000-26048575')),
+            ]
+            rows, memory = [], []
+            for label, get in cases:
+                elapsed, peak, received = _timed(get)
+                rows.append((f'{label} ({received / 2 ** 20:.0f} MiB)', elapsed))
+                memory.append(f'  {label}: peak Python memory {peak / 2 ** 20:.1f} MiB')
+            with override_settings(RECORDING_ACCEL_REDIRECT_PREFIX='/protected/'):
+                elapsed, peak, _ = _timed(lambda: client.get(url))
+            rows.append(('X-Accel-Redirect hand-off', elapsed))
+            memory.append(f'  X-Accel-Redirect hand-off: peak Python memory {peak / 2 ** 20:.1f} MiB')
+            report(f'{SIZE // 2 ** 20} MiB recording, response produced and drained', rows)
+            print('\n'.join(memory))
+    finally:
+        shutil.rmtree(media)
+
+
+if __name__ == '__main__':
+    main()
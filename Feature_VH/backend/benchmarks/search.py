@@ -0,0 +1,74 @@
+"""
+Medicine search: LIKE '%term%' vs the in-process index, and what a refresh
+of the index costs the searches running meanwhile.
+Usage: python -m benchmarks.search
+"""
+import random
+import time
+
+from benchmarks.harness import measure, report, test_database
+
+from django.db.models import Q
+
+from api.models import Medicine
+from api.search import medicine_index
+
+MEDICINES = 20000
+WORDS = ('amoxicillin', 'ibuprofen', 'paracetamol', 'cetirizine', 'omeprazole', 'metformin',
+         'atorvastatin', 'salbutamol', 'loratadine', 'prednisolone', 'tablet', 'syrup',
+         'capsule', 'injection', 'extended', 'release', 'pediatric', 'forte')
+CATEGORIES = ('Antibiotic', 'Analgesic', 'Antihistamine', 'Antacid', 'Antidiabetic', 'Statin')
+
+
+def _seed():
+    rng = random.Random(1)
+    Medicine.objects.bulk_create([
+        Medicine(name=' '.join(rng.sample(WORDS, 2)) + f' {n}', category=rng.choice(CATEGORIES),
+                 description=' '.join(rng.sample(WORDS, 6)))
+        for n in range(MEDICINES)
+    ], batch_size=2000)
+
+
+def _slowest_search_during_rebuild():
+    """Longest single search while a background rebuild runs."""
+    slowest = 0.0
+    medicine_index._rebuild_in_background()
+    worker = medicine_index._rebuilder
+    while worker.is_alive():
+        start = time.perf_counter()
+        medicine_index.search('paracetamol')
+        slowest = max(slowest, time.perf_counter() - start)
+    return slowest
+
+
+def main():
+    with test_database():
+        _seed()
+        medicine_index.rebuild()
+
+        def like():
+            list(Medicine.objects.filter(
+                Q(name__icontains='paracet') | Q(category__icontains='paracet')
+                | Q(description__icontains='paracet')
+            ).values_list('pk', flat=True)[:50])
+
+        def blocked_search():
+            # Before: a stale index was rebuilt under the lock by the search itself
+            medicine_index.rebuild()
+            medicine_index.search('paracetamol')
+
+        medicine = Medicine.objects.first()
+
+        report(f'{MEDICINES} medicines', [
+            ("LIKE '%paracet%' on three columns", measure(like)),
+            ("index: 'paracet' (prefix)", measure(lambda: medicine_index.search('paracet'), 20)),
+            ("index: 'paracetmol' (typo)", measure(lambda: medicine_index.search('paracetmol'), 20)),
+            ('index: patch one saved row', measure(lambda: medicine_index.refresh(pk=medicine.pk), 20)),
+            ('full rebuild', measure(medicine_index.rebuild, repeat=3)),
+            ('search that finds the index stale, before', measure(blocked_search, repeat=3)),
+            ('slowest search during a background rebuild', _slowest_search_during_rebuild()),
+        ])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+"""
+A booking burst on one doctor's day, and "next available" lookups.
+
+8 threads send 320 bookings for 16 slots (20 patients per slot) through
+POST /api/appointments/; exactly 16 must succeed. Then, with the doctor
+booked solid for 60 days, times slots.next_available (bitmap rows) against
+working out the first free slot from the appointments table.
+Usage: python -m benchmarks.slot_booking
+"""
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+
+from benchmarks.harness import api_client, measure, report, test_database
+
+from django.conf import settings
+from django.db import connection
+
+from api import availability, slots
+from api.models import Appointment, AppointmentSlot, DoctorProfile, User
+
+THREADS = 8
+SLOTS = 16
+CONTENDERS = 20
+BOOKED_DAYS = 60
+
+
+def _burst(doctor, day, patients):
+    statuses = Counter()
+    first = datetime.combine(day, settings.APPOINTMENT_DAY_START)
+    step = timedelta(minutes=settings.APPOINTMENT_SLOT_MINUTES)
+    times = [(first + step * n).strftime('%H:%M') for n in range(SLOTS)]
+    clients = [api_client(patient) for patient in patients]
+
+    def book(n):
+        client = clients[n % len(clients)]
+        try:
+            response = client.post('/api/appointments/', {
+                'doctor_id': doctor.pk, 'date': str(day), 'time': times[n % SLOTS],
+            }, format='json')
+            statuses[response.status_code] += 1
+        finally:
+            connection.close()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(THREADS) as pool:
+        list(pool.map(book, range(SLOTS * CONTENDERS)))
+    return time.perf_counter() - start, statuses
+
+
+def _first_free_from_appointments(doctor_id, start):
+    """What finding a free slot took without slots: scan each day's bookings."""
+    step = timedelta(minutes=settings.APPOINTMENT_SLOT_MINUTES)
+    for offset in range(BOOKED_DAYS + 30):
+        day = start + timedelta(days=offset)
+        if day.weekday() not in settings.APPOINTMENT_WORKING_DAYS:
+            continue
+        taken = set(Appointment.objects.filter(doctor_id=doctor_id, date=day)
+                    .exclude(status='declined').values_list('time', flat=True))
+        moment = datetime.combine(day, settings.APPOINTMENT_DAY_START)
+        end = datetime.combine(day, settings.APPOINTMENT_DAY_END)
+        while moment < end:
+            if moment.strftime('%H:%M') not in taken:
+                return day, moment.time()
+            moment += step
+    return None
+
+
+def main():
+    with test_database():
+        doctor = DoctorProfile.objects.create(
+            user=User.objects.create_user(username='doctor', password='x', role='doctor'))
+        patients = [User.objects.create_user(username=f'patient{n}', password='x', role='patient')
+                    for n in range(CONTENDERS)]
+        day = date.today() + timedelta(days=7 - date.today().weekday())  # next Monday
+        availability.rebuild([doctor.pk], day, 1)
+        elapsed, statuses = _burst(doctor, day, patients)
+        booked = AppointmentSlot.objects.filter(doctor=doctor, appointment__isnull=False).count()
+        assert booked == SLOTS and statuses[201] == SLOTS, (booked, statuses)
+
+        # Book every working slot for the next BOOKED_DAYS days
+        start = date.today() + timedelta(days=1)
+        availability.rebuild([doctor.pk], start, BOOKED_DAYS + 30)
+        for offset in range(BOOKED_DAYS):
+            current = start + timedelta(days=offset)
+            midnight = datetime.combine(current, datetime.min.time())
+            for free in slots.next_available(doctor.pk, limit=64, after=midnight):
+                if free.date != current:
+                    break
+                appointment = Appointment.objects.create(patient=patients[0], doctor=doctor, date=current,
+                                                         time=free.start_time.strftime('%H:%M'))
+                slots.reserve(doctor.pk, current, free.start_time, appointment)
+        after = datetime.combine(start, datetime.min.time())
+
+        summary = ', '.join(f'{code}: {count}' for code, count in sorted(statuses.items()))
+        report(f'{SLOTS * CONTENDERS} bookings for {SLOTS} slots from {THREADS} threads, '
+               f'then {BOOKED_DAYS} days booked solid', [
+            (f'booking burst ({summary})', elapsed),
+            ('next available: bitmap rows', measure(lambda: slots.next_available(doctor.pk, limit=1, after=after), 20)),
+            ('next available: scan appointments', measure(lambda: _first_free_from_appointments(doctor.pk, start), 5)),
+        ])
+
+
+if __name__ == '__main__':
+    main()
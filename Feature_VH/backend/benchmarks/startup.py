@@ -0,0 +1,55 @@
+"""
+Startup time and memory of the combined entry point vs the split deployment.
+
+Each entry point is imported in a fresh interpreter, as a server worker
+would at boot: config.combined alone, and config.asgi plus realtime.main in
+two separate processes. Reports the wall time until the application object
+exists and the peak RSS, summed over the processes of each deployment.
+Usage: python -m benchmarks.startup
+"""
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmarks.harness import report
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ROUNDS = 3
+CHILD = '''
+import resource
+import {module}
+print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+'''
+
+
+def _boot(module):
+    """(seconds, peak RSS in bytes) for one fresh process importing module."""
+    start = time.perf_counter()
+    out = subprocess.run([sys.executable, '-c', CHILD.format(module=module)], cwd=BACKEND,
+                         capture_output=True, text=True, check=True).stdout
+    # ru_maxrss is in KiB on Linux
+    return time.perf_counter() - start, int(out.split()[-1]) * 1024
+
+
+def _deployment(modules):
+    rounds = [[_boot(module) for module in modules] for _ in range(ROUNDS)]
+    seconds = statistics.median(sum(t for t, _ in processes) for processes in rounds)
+    rss = statistics.median(sum(r for _, r in processes) for processes in rounds)
+    return seconds, rss
+
+
+def main():
+    rows, memory = [], []
+    for label, modules in (('combined (config.combined)', ['config.combined']),
+                           ('split (config.asgi + realtime.main)', ['config.asgi', 'realtime.main'])):
+        seconds, rss = _deployment(modules)
+        rows.append((f'{label}: boot', seconds))
+        memory.append(f'  {label}: peak RSS {rss / 2 ** 20:.0f} MiB')
+    report(f'median of {ROUNDS} cold starts, summed over processes', rows)
+    print('\n'.join(memory))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,15 @@
-"""ASGI config."""
+"""ASGI config.
+
+Serving through an ASGI server (e.g. `uvicorn config.asgi:application`)
+enables the async read views unless ASYNC_READ_VIEWS says otherwise.
+Streaming responses (recording playback, appointment export) switch to
+async iterators here (api/streaming.py), as Django would otherwise buffer
+them whole; with no sendfile under ASGI, set RECORDING_ACCEL_REDIRECT_PREFIX
+to let the proxy serve recording files.
+"""
 import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+os.environ.setdefault('ASYNC_READ_VIEWS', 'true')
 application = get_asgi_application()
@@ -0,0 +1,34 @@
+"""Combined ASGI entry point: Django API and realtime service in one process.
+
+    uvicorn config.combined:application --port 8000
+
+WebSocket traffic, the realtime health check and the ASGI lifespan go to the
+FastAPI app in realtime/main.py; every other HTTP request goes to Django.
+Both halves share one settings import, one app registry and one set of
+in-process caches (auth principals, search indexes, presence), instead of
+loading Django twice in two servers. The split deployment (config.asgi plus
+`uvicorn realtime.main:app`) keeps working unchanged. The notes on streaming
+responses in config/asgi.py apply here too.
+"""
+import os
+
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+os.environ.setdefault('ASYNC_READ_VIEWS', 'true')
+django_application = get_asgi_application()
+
+# Imported after Django is set up; realtime.main's own setup is then a no-op
+from realtime.main import app as realtime_application  # noqa: E402
+
+# HTTP paths served by the realtime app rather than Django
+REALTIME_HTTP_PATHS = ('/health',)
+
+
+async def application(scope, receive, send):
+    """Route one ASGI connection to the realtime app or to Django."""
+    if scope['type'] == 'http' and scope['path'] not in REALTIME_HTTP_PATHS:
+        await django_application(scope, receive, send)
+    else:
+        # websocket and lifespan (Django's handler only speaks http)
+        await realtime_application(scope, receive, send)
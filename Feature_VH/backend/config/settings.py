@@ -4,7 +4,8 @@ Django settings for Virtual Hospital Platform.
 import os
 import dj_database_url
 from pathlib import Path
-from datetime import timedelta
+from datetime import time, timedelta
+from corsheaders.defaults import default_headers
 from dotenv import load_dotenv
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -90,6 +91,44 @@ if 'ENGINE' in DATABASES['default']:
         }
     }
 
+# ---------- Cache ----------
+# Use a shared Redis cache when REDIS_URL is set so every worker (and the
+# realtime service) sees the same entries; fall back to per-process memory,
+# where one worker's invalidations never reach the others (see api/checks.py).
+REDIS_URL = os.environ.get('REDIS_URL', '')
+SHARED_CACHE = bool(REDIS_URL)
+if SHARED_CACHE:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Seconds the admin dashboard stats are served from cache (less when the
+# cache is per-process and other workers' writes cannot invalidate them)
+ADMIN_STATS_CACHE_TTL = int(os.environ.get('ADMIN_STATS_CACHE_TTL', '30' if SHARED_CACHE else '5'))
+
+# Seconds a rendered doctor directory snapshot is kept (briefly when the
+# cache is per-process, as other workers' edits cannot retire it), and the
+# max-age browsers/CDNs may serve it for before revalidating with its ETag
+DOCTOR_DIRECTORY_CACHE_TTL = int(os.environ.get('DOCTOR_DIRECTORY_CACHE_TTL', '600' if SHARED_CACHE else '10'))
+DOCTOR_DIRECTORY_MAX_AGE = int(os.environ.get('DOCTOR_DIRECTORY_MAX_AGE', '60'))
+
+# Without a shared cache, seconds a worker's search indexes (api/search.py)
+# are used before being rebuilt from the database
+SEARCH_INDEX_MAX_AGE = int(os.environ.get('SEARCH_INDEX_MAX_AGE', '30'))
+
+# Seconds a user stays "online" after the realtime service's last heartbeat.
+# Presence is kept in Redis when REDIS_URL is set, else in process memory.
+PRESENCE_TTL = int(os.environ.get('PRESENCE_TTL', '90'))
+
 # ---------- Auth ----------
 AUTH_USER_MODEL = 'api.User'
 
@@ -98,9 +137,16 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 # ---------- REST Framework ----------
+# Reverse proxies in front of the app (Render's load balancer is one). The
+# client IP used by the login throttle is read that many entries from the end
+# of X-Forwarded-For, which the proxies append to; with 0 the header is ignored
+# and REMOTE_ADDR is used, since a client can put anything in it.
+NUM_PROXIES = int(os.environ.get('NUM_PROXIES', '1' if os.environ.get('RENDER') else '0'))
+
 REST_FRAMEWORK = {
+    'NUM_PROXIES': NUM_PROXIES,
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.ClaimsJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
@@ -114,6 +160,38 @@ REST_FRAMEWORK = {
     'PAGE_SIZE': 50,
 }
 
+# ---------- Login hardening ----------
+# Token buckets per client IP and per login id ('num/period'); attempts beyond
+# the bucket get 429 before the password hasher runs.
+LOGIN_THROTTLE_RATES = {
+    'ip': os.environ.get('LOGIN_THROTTLE_IP_RATE', '20/min'),
+    'login': os.environ.get('LOGIN_THROTTLE_LOGIN_RATE', '5/min'),
+}
+# 'api.throttling.CacheBucketStore' shares buckets across workers via CACHES
+LOGIN_THROTTLE_STORE = os.environ.get('LOGIN_THROTTLE_STORE', 'api.throttling.MemoryBucketStore')
+# Concurrent password checks per process, extra attempts allowed to wait, and
+# how long (seconds) an admitted attempt may wait before answering 503.
+PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', '2'))
+PASSWORD_HASH_QUEUE = int(os.environ.get('PASSWORD_HASH_QUEUE', '8'))
+PASSWORD_HASH_TIMEOUT = float(os.environ.get('PASSWORD_HASH_TIMEOUT', '5'))
+
+# Serve the doctor/medicine/appointment/chat lists from async views
+# (api/async_views.py). config/asgi.py turns this on; leave it off under WSGI.
+ASYNC_READ_VIEWS = os.environ.get('ASYNC_READ_VIEWS', 'False').lower() == 'true'
+
+# ---------- Appointment slots ----------
+# Bookings claim slots on a fixed grid (api/slots.py) within the doctor's
+# working hours; the default working day below applies to doctors who have
+# not set any.
+APPOINTMENT_SLOT_MINUTES = int(os.environ.get('APPOINTMENT_SLOT_MINUTES', '30'))
+APPOINTMENT_DAY_START = time.fromisoformat(os.environ.get('APPOINTMENT_DAY_START', '09:00'))
+APPOINTMENT_DAY_END = time.fromisoformat(os.environ.get('APPOINTMENT_DAY_END', '17:00'))
+# Default calendar for doctors without WorkingHours: weekday numbers (Monday = 0)
+APPOINTMENT_WORKING_DAYS = [int(d) for d in os.environ.get('APPOINTMENT_WORKING_DAYS', '0,1,2,3,4').split(',')]
+# Days ahead kept in the per-doctor free/busy bitmaps (api/availability.py).
+# A day's bitmap holds 24h / APPOINTMENT_SLOT_MINUTES bits, at most 63.
+AVAILABILITY_HORIZON_DAYS = int(os.environ.get('AVAILABILITY_HORIZON_DAYS', '90'))
+
 # ---------- JWT ----------
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=7),
@@ -128,6 +206,8 @@ CORS_ALLOWED_ORIGINS = [
     "http://localhost:3000",                                            
 ]
 CORS_ALLOW_CREDENTIALS = True
+# Chunked recording uploads send their position in Upload-Offset
+CORS_ALLOW_HEADERS = (*default_headers, 'upload-offset')
 
 # ---------- Static & Media ----------
 STATIC_URL = '/static/'
@@ -138,7 +218,33 @@ MEDIA_ROOT = BASE_DIR / 'media'
 
 # ---------- File Upload Limits ----------
 DATA_UPLOAD_MAX_MEMORY_SIZE = 52428800   # 50 MB
-FILE_UPLOAD_MAX_MEMORY_SIZE = 52428800   # 50 MB
+# Larger multipart files spool to a temp file instead of worker RAM
+FILE_UPLOAD_MAX_MEMORY_SIZE = 2621440    # 2.5 MB
+
+# Chunked recording uploads (api/uploads.py): where partial files live until
+# finalized (keep it on the same filesystem as MEDIA_ROOT so finalizing is a
+# rename) and the largest chunk accepted per request.
+RECORDING_UPLOAD_DIR = os.environ.get('RECORDING_UPLOAD_DIR', str(BASE_DIR / 'upload_tmp'))
+RECORDING_CHUNK_MAX_SIZE = int(os.environ.get('RECORDING_CHUNK_MAX_SIZE', str(8 * 1024 * 1024)))
+
+# Recording playback (api/playback.py): lifetime in seconds of signed
+# stream URLs, and the internal location under which the front proxy
+# (e.g. nginx `internal;` alias of MEDIA_ROOT) serves files. When the prefix
+# is set, Django only authorizes and replies with X-Accel-Redirect.
+RECORDING_URL_MAX_AGE = int(os.environ.get('RECORDING_URL_MAX_AGE', '3600'))
+RECORDING_ACCEL_REDIRECT_PREFIX = os.environ.get('RECORDING_ACCEL_REDIRECT_PREFIX', '')
+
+# Recording post-processing (api/processing.py): worker processes, the
+# ffmpeg binary, output codec arguments (the file keeps its extension),
+# waveform resolution and a per-ffmpeg-step timeout in seconds.
+RECORDING_PROCESS_WORKERS = int(os.environ.get('RECORDING_PROCESS_WORKERS', '1'))
+RECORDING_FFMPEG = os.environ.get('RECORDING_FFMPEG', 'ffmpeg')
+RECORDING_TRANSCODE_ARGS = os.environ.get(
+    'RECORDING_TRANSCODE_ARGS',
+    '-c:v libvpx-vp9 -crf 42 -b:v 0 -deadline good -cpu-used 4 -row-mt 1 -c:a libopus -b:a 24k',
+)
+RECORDING_WAVEFORM_POINTS = int(os.environ.get('RECORDING_WAVEFORM_POINTS', '200'))
+RECORDING_PROCESS_TIMEOUT = int(os.environ.get('RECORDING_PROCESS_TIMEOUT', '900'))
 
 # ---------- Internationalization ----------
 LANGUAGE_CODE = 'en-us'
@@ -0,0 +1,144 @@
+"""
+Cached JWT verification for WebSocket handshakes.
+
+The token signature and expiry are checked on every handshake (pure CPU);
+the user lookup behind it is cached per token `jti`, so reconnects with the
+same token do not touch the database. Entries live until the token expires or
+AUTH_CACHE_TTL seconds pass, whichever comes first, and the least recently
+used entry is evicted once AUTH_CACHE_SIZE is reached.
+
+Rooms are per appointment; only its patient and doctor (or an admin) may
+join them. A granted membership is cached per (jti, appointment) on the same
+terms, so reconnects to a room skip that query too.
+"""
+import os
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.tokens import AccessToken
+
+from django.db.models import Q
+
+from api.models import Appointment, User
+
+from .db import run_db
+
+AUTH_CACHE_SIZE = int(os.environ.get('REALTIME_AUTH_CACHE_SIZE', '10000'))
+AUTH_CACHE_TTL = float(os.environ.get('REALTIME_AUTH_CACHE_TTL', '300'))
+
+
+class Principal:
+    """The verified user fields the realtime handlers need.
+
+    `jti` and `token_exp` identify the token the principal was verified from.
+    """
+    __slots__ = ('id', 'username', 'full_name', 'role', 'jti', 'token_exp')
+
+    def __init__(self, id: int, username: str, full_name: str, role: str):
+        self.id = id
+        self.username = username
+        self.full_name = full_name
+        self.role = role
+        self.jti = None
+        self.token_exp = None
+
+
+class PrincipalCache:
+    """LRU of jti -> (principal, expires_at)."""
+
+    def __init__(self, max_size: int = AUTH_CACHE_SIZE, ttl: float = AUTH_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[Principal, float]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, jti: str) -> Optional[Principal]:
+        entry = self._entries.get(jti)
+        if entry is not None:
+            principal, expires_at = entry
+            if expires_at > time.time():
+                self._entries.move_to_end(jti)
+                self.hits += 1
+                return principal
+            del self._entries[jti]
+        self.misses += 1
+        return None
+
+    def put(self, jti: str, principal: Principal, token_exp: float):
+        self._entries[jti] = (principal, min(token_exp, time.time() + self.ttl))
+        self._entries.move_to_end(jti)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        return {'size': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+
+class MembershipCache(PrincipalCache):
+    """LRU of (jti, appointment id) -> True for rooms the token may join."""
+
+
+principal_cache = PrincipalCache()
+membership_cache = MembershipCache()
+
+
+def _load_principal(user_id) -> Optional[Principal]:
+    row = User.objects.filter(id=user_id).values_list(
+        'id', 'username', 'first_name', 'last_name', 'role'
+    ).first()
+    if row is None:
+        return None
+    pk, username, first_name, last_name, role = row
+    return Principal(pk, username, f"{first_name} {last_name}".strip(), role)
+
+
+async def verify_token(token: str) -> Optional[Principal]:
+    """Verify JWT token and return the principal it belongs to."""
+    try:
+        access_token = AccessToken(token)
+        user_id = access_token['user_id']
+    except (TokenError, KeyError):
+        return None
+
+    jti = access_token.get('jti')
+    if jti:
+        principal = principal_cache.get(jti)
+        if principal is not None:
+            return principal
+
+    try:
+        principal = await run_db(_load_principal, user_id)
+    except Exception:
+        return None
+    if principal is not None and jti:
+        principal.jti, principal.token_exp = jti, access_token['exp']
+        principal_cache.put(jti, principal, principal.token_exp)
+    return principal
+
+
+def _participates(principal: Principal, appointment_id: int) -> bool:
+    appointments = Appointment.objects.filter(pk=appointment_id)
+    if principal.role != 'admin':
+        appointments = appointments.filter(Q(patient_id=principal.id) | Q(doctor__user_id=principal.id))
+    return appointments.exists()
+
+
+async def can_join(principal: Principal, appointment_id: int) -> bool:
+    """Whether the appointment exists and the principal takes part in it.
+
+    Only granted memberships are cached, so a room refused now (e.g. an
+    appointment not yet committed) can be joined as soon as it qualifies.
+    """
+    key = (principal.jti, appointment_id) if principal.jti else None
+    if key is not None and membership_cache.get(key):
+        return True
+    try:
+        allowed = await run_db(_participates, principal, appointment_id)
+    except Exception:
+        return False
+    if allowed and key is not None:
+        membership_cache.put(key, True, principal.token_exp)
+    return allowed
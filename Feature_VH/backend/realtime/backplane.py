@@ -0,0 +1,124 @@
+"""
+Pub/sub backplane that fans room messages out across realtime workers.
+
+Every ConnectionManager publishes room broadcasts to the backplane instead of
+writing to its own sockets; each worker subscribed to the channel then
+delivers the message to the sockets it holds locally. The in-process
+backplane (the default) short-circuits straight back to the local manager, so
+a single worker behaves exactly as before. Setting REALTIME_BACKPLANE_URL to a
+redis:// URL switches to Redis pub/sub so rooms span workers and hosts.
+"""
+import asyncio
+import json
+import os
+import uuid
+from typing import Awaitable, Callable, Dict
+
+# Identifies this process in envelopes so the sender's own socket can be excluded
+NODE_ID = uuid.uuid4().hex
+
+Handler = Callable[[dict], Awaitable[None]]
+
+
+class Backplane:
+    """Base class: routes envelopes published on a channel to its handler."""
+
+    def __init__(self):
+        self._handlers: Dict[str, Handler] = {}
+
+    def subscribe(self, channel: str, handler: Handler):
+        """Register the local handler for a channel (before start())."""
+        self._handlers[channel] = handler
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    async def publish(self, channel: str, envelope: dict):
+        raise NotImplementedError
+
+    async def _dispatch(self, channel: str, envelope: dict):
+        handler = self._handlers.get(channel)
+        if handler is not None:
+            await handler(envelope)
+
+
+class InProcessBackplane(Backplane):
+    """Single-process backplane: publishing delivers directly to the local handler."""
+
+    async def publish(self, channel: str, envelope: dict):
+        await self._dispatch(channel, envelope)
+
+
+class RedisBackplane(Backplane):
+    """Redis pub/sub backplane shared by every worker pointing at the same server.
+
+    A pre-built asyncio client may be passed instead of a URL (e.g. a
+    fakeredis instance for local testing).
+    """
+
+    RECONNECT_DELAY = 1.0
+
+    def __init__(self, url: str = None, client=None, prefix: str = 'vh:realtime:'):
+        super().__init__()
+        if client is None:
+            import redis.asyncio as redis
+            client = redis.from_url(url)
+        self.prefix = prefix
+        self._client = client
+        self._pubsub = None
+        self._task = None
+
+    async def start(self):
+        self._pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+        await self._pubsub.subscribe(*(self.prefix + channel for channel in self._handlers))
+        self._task = asyncio.create_task(self._listen())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._pubsub is not None:
+            await self._pubsub.aclose()
+            self._pubsub = None
+        await self._client.aclose()
+
+    async def publish(self, channel: str, envelope: dict):
+        await self._client.publish(self.prefix + channel, json.dumps(envelope))
+
+    async def _listen(self):
+        while True:
+            try:
+                async for item in self._pubsub.listen():
+                    if item.get('type') != 'message':
+                        continue
+                    channel = item['channel']
+                    if isinstance(channel, bytes):
+                        channel = channel.decode()
+                    try:
+                        await self._dispatch(channel[len(self.prefix):], json.loads(item['data']))
+                    except Exception:
+                        pass
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # Connection dropped; the client reconnects and resubscribes on the next read
+                await asyncio.sleep(self.RECONNECT_DELAY)
+
+
+def get_backplane() -> Backplane:
+    """Build the backplane configured by REALTIME_BACKPLANE_URL."""
+    url = os.environ.get('REALTIME_BACKPLANE_URL', '')
+    if url.startswith(('redis://', 'rediss://', 'unix://')):
+        return RedisBackplane(url)
+    return InProcessBackplane()
+
+
+# Global backplane shared by the chat and signaling managers
+backplane = get_backplane()
@@ -0,0 +1,39 @@
+"""
+Off-loop execution of Django ORM work for the realtime server.
+
+Django's ORM is synchronous, so every query issued from a WebSocket handler
+would otherwise block the event loop (and every other room on the worker).
+Calls are dispatched to a bounded thread pool instead; each pool thread keeps
+its own persistent DB connection, recycled the same way Django does around a
+request (CONN_MAX_AGE / health checks).
+"""
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from django.db import close_old_connections
+
+DB_POOL_SIZE = int(os.environ.get('REALTIME_DB_POOL_SIZE', '8'))
+
+_executor = ThreadPoolExecutor(max_workers=DB_POOL_SIZE, thread_name_prefix='realtime-db')
+
+
+def _call(fn, args, kwargs):
+    """Run fn inside a pool thread, recycling stale connections around it."""
+    close_old_connections()
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        close_old_connections()
+
+
+async def run_db(fn, *args, **kwargs):
+    """Await a blocking ORM call without stalling the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, partial(_call, fn, args, kwargs))
+
+
+def shutdown():
+    """Wait for in-flight queries and stop the pool."""
+    _executor.shutdown(wait=True)
@@ -1,12 +1,13 @@
 """
 FastAPI Real-time Server for WebSocket Chat and WebRTC Signaling.
 Run separately: uvicorn realtime.main:app --port 8001 --reload
+or together with the Django API: uvicorn config.combined:application
 """
 import os
 import sys
 import json
+from contextlib import asynccontextmanager
 from datetime import datetime
-from typing import Optional
 
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Query
 from fastapi.middleware.cors import CORSMiddleware
@@ -18,13 +19,28 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 import django
 django.setup()
 
-import jwt
-from django.conf import settings as django_settings
-from api.models import User, ChatMessage, Appointment
-
+from . import db
+from .auth import can_join, membership_cache, principal_cache, verify_token
+from .backplane import backplane
 from .manager import chat_manager, signal_manager
+from .persistence import chat_writer
+from .presence import presence_tracker
+from .session import Session
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await backplane.start()
+    await chat_writer.start()
+    await presence_tracker.start()
+    yield
+    await presence_tracker.stop()
+    await chat_writer.stop()
+    await backplane.stop()
+    db.shutdown()
+
 
-app = FastAPI(title="Virtual Hospital Realtime", version="1.0.0")
+app = FastAPI(title="Virtual Hospital Realtime", version="1.0.0", lifespan=lifespan)
 
 # CORS
 app.add_middleware(
@@ -36,35 +52,29 @@ app.add_middleware(
 )
 
 
-def verify_token(token: str) -> Optional[User]:
-    """Verify JWT token and return user."""
-    try:
-        from rest_framework_simplejwt.tokens import AccessToken
-        access_token = AccessToken(token)
-        user_id = access_token['user_id']
-        return User.objects.get(id=user_id)
-    except Exception:
-        return None
-
-
 # ─── WebSocket Chat ───────────────────────────────────────────────────────────
 
 @app.websocket("/ws/chat/{appointment_id}")
 async def websocket_chat(websocket: WebSocket, appointment_id: int, token: str = Query(...)):
     """Real-time chat for a consultation room."""
-    user = verify_token(token)
+    user = await verify_token(token)
     if not user:
         await websocket.close(code=4001, reason="Invalid token")
         return
+    if not await can_join(user, appointment_id):
+        await websocket.close(code=4003, reason="Not a participant of this appointment")
+        return
 
     room_id = f"chat_{appointment_id}"
+    session = Session(user, room_id)
     await chat_manager.connect(websocket, room_id)
+    await presence_tracker.connected(session)
 
     try:
         # Send join notification
         await chat_manager.broadcast({
             "type": "system",
-            "message": f"{user.get_full_name()} joined the chat",
+            "message": f"{session.full_name} joined the chat",
             "timestamp": datetime.now().strftime("%I:%M %p"),
         }, room_id)
 
@@ -75,43 +85,26 @@ async def websocket_chat(websocket: WebSocket, appointment_id: int, token: str =
             if not message_text.strip():
                 continue
 
-            # Persist to database
-            try:
-                chat_msg = ChatMessage.objects.create(
-                    appointment_id=appointment_id,
-                    sender=user,
-                    message=message_text,
-                )
-                timestamp = chat_msg.timestamp.strftime("%I:%M %p")
-            except Exception:
-                timestamp = datetime.now().strftime("%I:%M %p")
+            # Persisted in the background by the write-behind queue
+            chat_writer.enqueue(appointment_id, session.user_id, message_text)
+            timestamp = datetime.now().strftime("%I:%M %p")
 
             # Broadcast to room (including sender for confirmation)
-            broadcast_data = {
-                "type": "chat",
-                "sender": user.get_full_name() or user.username,
-                "sender_role": user.role,
-                "sender_id": user.id,
-                "message": message_text,
-                "timestamp": timestamp,
-            }
-
-            # Send to all in room
-            for connection in chat_manager.active_connections.get(room_id, set()):
-                try:
-                    await connection.send_json(broadcast_data)
-                except Exception:
-                    pass
+            await chat_manager.broadcast_frame(
+                session.chat_frame(message_text, timestamp), "chat", room_id
+            )
 
     except WebSocketDisconnect:
         chat_manager.disconnect(websocket, room_id)
         await chat_manager.broadcast({
             "type": "system",
-            "message": f"{user.get_full_name()} left the chat",
+            "message": f"{session.full_name} left the chat",
             "timestamp": datetime.now().strftime("%I:%M %p"),
         }, room_id)
     except Exception:
         chat_manager.disconnect(websocket, room_id)
+    finally:
+        await presence_tracker.disconnected(session)
 
 
 # ─── WebSocket WebRTC Signaling ───────────────────────────────────────────────
@@ -119,54 +112,61 @@ async def websocket_chat(websocket: WebSocket, appointment_id: int, token: str =
 @app.websocket("/ws/signal/{appointment_id}")
 async def websocket_signal(websocket: WebSocket, appointment_id: int, token: str = Query(...)):
     """WebRTC signaling relay for video calls."""
-    user = verify_token(token)
+    user = await verify_token(token)
     if not user:
         await websocket.close(code=4001, reason="Invalid token")
         return
+    if not await can_join(user, appointment_id):
+        await websocket.close(code=4003, reason="Not a participant of this appointment")
+        return
 
     room_id = f"signal_{appointment_id}"
+    session = Session(user, room_id)
     await signal_manager.connect(websocket, room_id)
+    await presence_tracker.connected(session)
 
     try:
         # Notify others that a peer joined
         await signal_manager.broadcast({
             "type": "peer-joined",
-            "user_id": user.id,
-            "user_name": user.get_full_name(),
-            "role": user.role,
+            "user_id": session.user_id,
+            "user_name": session.full_name,
+            "role": session.role,
             "peer_count": signal_manager.get_room_count(room_id),
         }, room_id, exclude=websocket)
 
         while True:
-            data = await websocket.receive_json()
+            raw = await websocket.receive_text()
+            data = json.loads(raw)
+            if not isinstance(data, dict):
+                continue
             signal_type = data.get("type", "")
 
             # Relay signaling messages to other peers
             if signal_type in ("offer", "answer", "ice-candidate"):
-                relay_data = {
-                    **data,
-                    "from_user_id": user.id,
-                    "from_user_name": user.get_full_name(),
-                }
-                await signal_manager.broadcast(relay_data, room_id, exclude=websocket)
+                await signal_manager.broadcast_frame(
+                    session.relay_frame(raw, data), signal_type, room_id, exclude=websocket
+                )
 
             elif signal_type == "call-ended":
                 await signal_manager.broadcast({
                     "type": "call-ended",
-                    "user_id": user.id,
-                    "user_name": user.get_full_name(),
+                    "user_id": session.user_id,
+                    "user_name": session.full_name,
                 }, room_id, exclude=websocket)
 
     except WebSocketDisconnect:
         signal_manager.disconnect(websocket, room_id)
         await signal_manager.broadcast({
             "type": "peer-left",
-            "user_id": user.id,
-            "user_name": user.get_full_name(),
+            "user_id": session.user_id,
+            "user_name": session.full_name,
             "peer_count": signal_manager.get_room_count(room_id),
         }, room_id)
     except Exception:
         signal_manager.disconnect(websocket, room_id)
+    finally:
+        await presence_tracker.disconnected(session)
 
 
 # ─── Health Check ─────────────────────────────────────────────────────────────
@@ -178,4 +178,10 @@ async def health_check():
         "service": "Virtual Hospital Realtime",
         "chat_rooms": len(chat_manager.active_connections),
         "signal_rooms": len(signal_manager.active_connections),
+        "chat_persistence": chat_writer.stats(),
+        "chat_delivery": chat_manager.stats(),
+        "signal_delivery": signal_manager.stats(),
+        "auth_cache": principal_cache.stats(),
+        "membership_cache": membership_cache.stats(),
+        "presence": presence_tracker.stats(),
     }
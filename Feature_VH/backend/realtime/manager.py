@@ -1,51 +1,252 @@
 """
 WebSocket Connection Manager for chat rooms and signaling.
 """
-from typing import Dict, List, Set
+import asyncio
+import os
+import time
+from collections import deque
+from typing import Dict, FrozenSet, Optional, Set
 from fastapi import WebSocket
 import json
 
+from .backplane import NODE_ID, Backplane, backplane
 
-class ConnectionManager:
-    """Manages WebSocket connections per room (appointment_id)."""
+SEND_TIMEOUT = float(os.environ.get('REALTIME_SEND_TIMEOUT', '5'))
+MAX_QUEUED_FRAMES = int(os.environ.get('REALTIME_MAX_QUEUED_FRAMES', '256'))
+MAX_QUEUED_BYTES = int(os.environ.get('REALTIME_MAX_QUEUED_BYTES', str(1024 * 1024)))
+
+
+class OutboundPolicy:
+    """What to do when a connection's outbound queue is full.
+
+    Frames whose type is in `droppable` are discarded first, oldest first, to
+    make room. If that is not enough, an incoming droppable frame is dropped;
+    a frame in `protected` always closes the connection rather than being
+    lost; any other frame is dropped or closes the connection according to
+    `on_overflow` ('drop' or 'close').
+    """
+    __slots__ = ('max_frames', 'max_bytes', 'droppable', 'protected', 'on_overflow')
+
+    def __init__(self, droppable=(), protected=(), on_overflow: str = 'close',
+                 max_frames: int = MAX_QUEUED_FRAMES, max_bytes: int = MAX_QUEUED_BYTES):
+        self.max_frames = max_frames
+        self.max_bytes = max_bytes
+        self.droppable: FrozenSet[str] = frozenset(droppable)
+        self.protected: FrozenSet[str] = frozenset(protected)
+        self.on_overflow = on_overflow
+
+
+class RoomStats:
+    """Send latency for one room's outbound frames."""
+    __slots__ = ('sends', 'last_ms', 'max_ms', 'avg_ms')
 
     def __init__(self):
+        self.sends = 0
+        self.last_ms = 0.0
+        self.max_ms = 0.0
+        self.avg_ms = 0.0
+
+    def record(self, elapsed_ms: float):
+        self.sends += 1
+        self.last_ms = elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        # Exponentially weighted so the average tracks recent behaviour
+        self.avg_ms = elapsed_ms if self.sends == 1 else self.avg_ms * 0.9 + elapsed_ms * 0.1
+
+    def as_dict(self) -> dict:
+        return {
+            'sends': self.sends,
+            'last_ms': round(self.last_ms, 2),
+            'avg_ms': round(self.avg_ms, 2),
+            'max_ms': round(self.max_ms, 2),
+        }
+
+
+class Connection:
+    """A registered socket with its bounded outbound queue and writer task."""
+    __slots__ = ('websocket', 'room_id', 'queue', 'queued_bytes', 'ready', 'writer', 'dropped')
+
+    def __init__(self, websocket: WebSocket, room_id: str):
+        self.websocket = websocket
+        self.room_id = room_id
+        # (frame_type, frame) pairs waiting for the writer
+        self.queue: deque = deque()
+        self.queued_bytes = 0
+        self.ready = asyncio.Event()
+        self.writer: Optional[asyncio.Task] = None
+        self.dropped = 0
+
+    def offer(self, frame_type: str, frame: str, policy: OutboundPolicy) -> bool:
+        """Queue a frame; returns False if the policy says to close instead."""
+        size = len(frame)
+        queue = self.queue
+        while queue and (len(queue) >= policy.max_frames or self.queued_bytes + size > policy.max_bytes):
+            victim = next((i for i, (t, _) in enumerate(queue) if t in policy.droppable), None)
+            if victim is None:
+                break
+            _, stale = queue[victim]
+            del queue[victim]
+            self.queued_bytes -= len(stale)
+            self.dropped += 1
+
+        if queue and (len(queue) >= policy.max_frames or self.queued_bytes + size > policy.max_bytes):
+            if frame_type in policy.droppable or (
+                frame_type not in policy.protected and policy.on_overflow == 'drop'
+            ):
+                self.dropped += 1
+                return True
+            return False
+
+        queue.append((frame_type, frame))
+        self.queued_bytes += size
+        self.ready.set()
+        return True
+
+
+class ConnectionManager:
+    """Manages WebSocket connections per room (appointment_id).
+
+    Connections are held per process; broadcasts go through the backplane so
+    every worker holding sockets for the room delivers to them. Each message
+    is encoded to JSON once and placed on every peer's bounded outbound
+    queue, which a per-connection writer task drains; a slow peer only
+    backs up its own queue and is dropped from or closed per the policy.
+    """
+
+    def __init__(self, channel: str, backplane: Backplane, policy: OutboundPolicy = None):
+        self.channel = channel
+        self.backplane = backplane
+        self.policy = policy or OutboundPolicy()
         # room_id -> set of active websockets
         self.active_connections: Dict[str, Set[WebSocket]] = {}
+        self.connections: Dict[WebSocket, Connection] = {}
+        self.room_stats: Dict[str, RoomStats] = {}
+        self.evictions = 0
+        self._closing: Set[asyncio.Task] = set()
+        backplane.subscribe(channel, self._deliver)
 
     async def connect(self, websocket: WebSocket, room_id: str):
         """Accept connection and add to room."""
         await websocket.accept()
         if room_id not in self.active_connections:
             self.active_connections[room_id] = set()
+            self.room_stats[room_id] = RoomStats()
         self.active_connections[room_id].add(websocket)
+        connection = Connection(websocket, room_id)
+        connection.writer = asyncio.create_task(self._write(connection))
+        self.connections[websocket] = connection
 
     def disconnect(self, websocket: WebSocket, room_id: str):
         """Remove connection from room."""
+        connection = self.connections.pop(websocket, None)
+        if connection is not None and connection.writer is not asyncio.current_task():
+            connection.writer.cancel()
         if room_id in self.active_connections:
             self.active_connections[room_id].discard(websocket)
             if not self.active_connections[room_id]:
                 del self.active_connections[room_id]
+                self.room_stats.pop(room_id, None)
 
     async def send_personal(self, message: dict, websocket: WebSocket):
         """Send message to a specific connection."""
-        await websocket.send_json(message)
+        connection = self.connections.get(websocket)
+        if connection is not None:
+            frame = json.dumps(message, separators=(',', ':'), ensure_ascii=False)
+            if not connection.offer(message.get('type', ''), frame, self.policy):
+                self._evict(connection)
 
     async def broadcast(self, message: dict, room_id: str, exclude: WebSocket = None):
-        """Broadcast message to all connections in a room."""
-        if room_id in self.active_connections:
-            for connection in self.active_connections[room_id]:
-                if connection != exclude:
-                    try:
-                        await connection.send_json(message)
-                    except Exception:
-                        pass
+        """Broadcast message to all connections in a room, on every worker."""
+        frame = json.dumps(message, separators=(',', ':'), ensure_ascii=False)
+        await self.broadcast_frame(frame, message.get('type', ''), room_id, exclude)
+
+    async def broadcast_frame(self, frame: str, frame_type: str, room_id: str, exclude: WebSocket = None):
+        """Broadcast an already-encoded JSON frame of the given type."""
+        await self.backplane.publish(self.channel, {
+            'room': room_id,
+            'origin': self._origin(exclude) if exclude is not None else None,
+            'type': frame_type,
+            'frame': frame,
+        })
+
+    async def _deliver(self, envelope: dict):
+        """Queue a backplane envelope on the sockets held by this worker."""
+        room_id = envelope['room']
+        origin = envelope.get('origin')
+        frame_type = envelope['type']
+        frame = envelope['frame']
+        for websocket in list(self.active_connections.get(room_id, ())):
+            if origin is not None and self._origin(websocket) == origin:
+                continue
+            connection = self.connections.get(websocket)
+            if connection is not None and not connection.offer(frame_type, frame, self.policy):
+                self._evict(connection)
+
+    async def _write(self, connection: Connection):
+        """Writer task: drain one connection's queue in order."""
+        websocket = connection.websocket
+        queue = connection.queue
+        try:
+            while True:
+                while not queue:
+                    connection.ready.clear()
+                    await connection.ready.wait()
+                _, frame = queue.popleft()
+                connection.queued_bytes -= len(frame)
+                started = time.perf_counter()
+                await asyncio.wait_for(websocket.send_text(frame), timeout=SEND_TIMEOUT)
+                stats = self.room_stats.get(connection.room_id)
+                if stats is not None:
+                    stats.record((time.perf_counter() - started) * 1000)
+        except asyncio.CancelledError:
+            raise
+        except asyncio.TimeoutError:
+            self._evict(connection)
+        except Exception:
+            # Socket already gone; the handler's receive loop cleans up
+            pass
+
+    def _evict(self, connection: Connection):
+        """Drop a slow consumer; its handler sees the disconnect and cleans up."""
+        if self.connections.get(connection.websocket) is not connection:
+            return
+        self.evictions += 1
+        self.disconnect(connection.websocket, connection.room_id)
+        task = asyncio.create_task(self._close(connection.websocket))
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    @staticmethod
+    async def _close(websocket: WebSocket):
+        try:
+            await asyncio.wait_for(websocket.close(code=1013, reason="Slow consumer"), timeout=SEND_TIMEOUT)
+        except Exception:
+            pass
+
+    @staticmethod
+    def _origin(websocket: WebSocket) -> str:
+        return f"{NODE_ID}:{id(websocket)}"
 
     def get_room_count(self, room_id: str) -> int:
-        """Get number of active connections in a room."""
+        """Get number of active connections in a room on this worker."""
         return len(self.active_connections.get(room_id, set()))
 
+    def stats(self) -> dict:
+        """Queue depth, drops and per-room send latency for the health check."""
+        return {
+            'queued_frames': sum(len(c.queue) for c in self.connections.values()),
+            'dropped_frames': sum(c.dropped for c in self.connections.values()),
+            'evictions': self.evictions,
+            'rooms': {room_id: stats.as_dict() for room_id, stats in self.room_stats.items()},
+        }
+
 
 # Global managers
-chat_manager = ConnectionManager()
-signal_manager = ConnectionManager()
+# Chat history is persisted, so a client that falls behind is closed and reloads it on reconnect
+chat_manager = ConnectionManager('chat', backplane, OutboundPolicy(droppable={'system'}))
+# Stale ICE candidates are the cheapest to lose; offer/answer must never be dropped
+signal_manager = ConnectionManager('signal', backplane, OutboundPolicy(
+    droppable={'ice-candidate'},
+    protected={'offer', 'answer', 'call-ended'},
+    on_overflow='close',
+))
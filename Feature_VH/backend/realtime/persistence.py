@@ -0,0 +1,153 @@
+"""
+Write-behind persistence for realtime chat messages.
+
+Chat frames are broadcast as soon as they arrive and buffered here; the buffer
+is flushed to the database with a single bulk INSERT whenever it reaches
+CHAT_BATCH_SIZE rows or CHAT_FLUSH_INTERVAL seconds have passed, and drained
+on shutdown.
+
+A batch the database rejects (e.g. a row whose appointment was deleted) is
+retried row by row so only the offending rows are dropped; batches that fail
+for other reasons (database unavailable) are kept for the next flush.
+"""
+import asyncio
+import os
+import time
+from typing import List, Optional
+
+from django.db import IntegrityError, transaction
+
+from api.models import ChatMessage
+
+from .db import run_db
+
+CHAT_BATCH_SIZE = int(os.environ.get('REALTIME_CHAT_BATCH_SIZE', '200'))
+CHAT_FLUSH_INTERVAL = float(os.environ.get('REALTIME_CHAT_FLUSH_INTERVAL', '0.5'))
+CHAT_MAX_PENDING = int(os.environ.get('REALTIME_CHAT_MAX_PENDING', '10000'))
+
+
+class ChatWriteBehind:
+    """Buffers ChatMessage rows and flushes them with bulk_create."""
+
+    def __init__(self, batch_size: int = CHAT_BATCH_SIZE,
+                 flush_interval: float = CHAT_FLUSH_INTERVAL,
+                 max_pending: int = CHAT_MAX_PENDING):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._buffer: List[ChatMessage] = []
+        self._wakeup = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        # Counters exposed on /health
+        self.flushed = 0
+        self.dropped = 0
+        self.rejected = 0
+        self.flush_count = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+
+    def enqueue(self, appointment_id: int, sender_id: int, message: str):
+        """Buffer a message for the next flush."""
+        if len(self._buffer) >= self.max_pending:
+            self.dropped += 1
+            return
+        self._buffer.append(ChatMessage(
+            appointment_id=appointment_id,
+            sender_id=sender_id,
+            message=message,
+        ))
+        if len(self._buffer) >= self.batch_size:
+            self._wakeup.set()
+
+    async def start(self):
+        """Start the background flush loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the flush loop and drain whatever is still buffered."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self):
+        """Write the current buffer in one bulk INSERT."""
+        async with self._lock:
+            batch, self._buffer = self._buffer, []
+            if not batch:
+                return
+            size = len(batch)
+            started = time.perf_counter()
+            try:
+                rejected = await run_db(_insert, batch, self.batch_size)
+            except Exception:
+                # Put back what was not written so the next flush retries it, within the cap
+                room = self.max_pending - len(self._buffer)
+                self.dropped += max(len(batch) - room, 0)
+                self._buffer[:0] = batch[:max(room, 0)]
+                return
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self.rejected += rejected
+            self.flushed += size - rejected
+            self.flush_count += 1
+            self.last_flush_ms = round(elapsed_ms, 2)
+            self.max_flush_ms = max(self.max_flush_ms, self.last_flush_ms)
+
+    def stats(self) -> dict:
+        """Queue depth and flush latency for the health check."""
+        return {
+            'queue_depth': len(self._buffer),
+            'flushed': self.flushed,
+            'dropped': self.dropped,
+            'rejected': self.rejected,
+            'flushes': self.flush_count,
+            'last_flush_ms': self.last_flush_ms,
+            'max_flush_ms': self.max_flush_ms,
+        }
+
+
+def _insert(batch, batch_size) -> int:
+    """Insert the batch, falling back to one row at a time if it is rejected.
+
+    Rows are removed from `batch` once written or rejected, so on any other
+    error it holds exactly the rows still to retry. Returns how many rows the
+    database rejected.
+    """
+    try:
+        with transaction.atomic():
+            ChatMessage.objects.bulk_create(batch, batch_size=batch_size)
+        batch.clear()
+        return 0
+    except IntegrityError:
+        # Ids some backends assigned before the rollback are void
+        for row in batch:
+            row.pk = None
+
+    rejected = 0
+    while batch:
+        try:
+            with transaction.atomic():
+                ChatMessage.objects.bulk_create(batch[:1])
+        except IntegrityError:
+            rejected += 1
+        del batch[0]
+    return rejected
+
+
+# Global writer
+chat_writer = ChatWriteBehind()
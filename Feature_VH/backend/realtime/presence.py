@@ -0,0 +1,82 @@
+"""
+Feeds the presence registry from this worker's WebSocket connections.
+"""
+import asyncio
+import os
+from typing import Dict, List, Optional
+
+from api.presence import presence
+
+from .db import run_db
+from .session import Session
+
+PRESENCE_HEARTBEAT = float(os.environ.get('REALTIME_PRESENCE_HEARTBEAT', '30'))
+
+
+class PresenceTracker:
+    """Counts each user's sockets on this worker and heartbeats the online ones."""
+
+    def __init__(self, heartbeat: float = PRESENCE_HEARTBEAT):
+        self.heartbeat = heartbeat
+        # user_id -> [open sockets, (id, name, role)]
+        self._users: Dict[int, List] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    async def connected(self, session: Session):
+        entry = self._users.get(session.user_id)
+        if entry is not None:
+            entry[0] += 1
+            return
+        user = (session.user_id, session.display_name, session.role)
+        self._users[session.user_id] = [1, user]
+        try:
+            await run_db(presence.touch_many, [user])
+        except Exception:
+            pass
+
+    async def disconnected(self, session: Session):
+        entry = self._users.get(session.user_id)
+        if entry is None:
+            return
+        entry[0] -= 1
+        if entry[0] > 0:
+            return
+        del self._users[session.user_id]
+        try:
+            await run_db(presence.leave, session.user_id)
+        except Exception:
+            pass
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for user_id in list(self._users):
+            try:
+                await run_db(presence.leave, user_id)
+            except Exception:
+                pass
+        self._users.clear()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.heartbeat)
+            users = [user for _, user in self._users.values()]
+            try:
+                await run_db(presence.touch_many, users)
+            except Exception:
+                pass
+
+    def stats(self) -> dict:
+        return {'online_users': len(self._users)}
+
+
+presence_tracker = PresenceTracker()
@@ -0,0 +1,51 @@
+"""
+Per-connection session state for the realtime handlers.
+"""
+import json
+
+from .auth import Principal
+
+
+def _encode(value) -> str:
+    return json.dumps(value, separators=(',', ':'), ensure_ascii=False)
+
+
+class Session:
+    """Sender metadata for one socket, rendered once at handshake.
+
+    Relayed frames are built by splicing pre-encoded JSON fragments onto the
+    client's raw text, so a stream of ICE candidates costs one parse (to read
+    the type) and one string concatenation per frame.
+    """
+    __slots__ = ('user_id', 'username', 'full_name', 'display_name', 'role', 'room_id',
+                 'relay_suffix', 'chat_prefix')
+
+    def __init__(self, principal: Principal, room_id: str):
+        self.user_id = principal.id
+        self.username = principal.username
+        self.full_name = principal.full_name
+        self.display_name = principal.full_name or principal.username
+        self.role = principal.role
+        self.room_id = room_id
+        # Appended to a relayed offer/answer/ICE object in place of its closing brace
+        self.relay_suffix = f',"from_user_id":{self.user_id},"from_user_name":{_encode(self.full_name)}}}'
+        # Everything in a chat frame up to the message text
+        self.chat_prefix = (
+            f'{{"type":"chat","sender":{_encode(self.display_name)},'
+            f'"sender_role":{_encode(self.role)},"sender_id":{self.user_id},"message":'
+        )
+
+    def relay_frame(self, raw: str, data: dict) -> str:
+        """Raw client JSON object with the sender fields added.
+
+        `data` is `raw` parsed. Client-supplied `from_*` keys are stripped by
+        re-encoding the object first, since a duplicate key would leave the
+        sender up to whichever copy the receiving parser keeps.
+        """
+        if any(key.startswith('from_') for key in data):
+            raw = _encode({key: value for key, value in data.items() if not key.startswith('from_')})
+        return raw.rstrip()[:-1] + self.relay_suffix
+
+    def chat_frame(self, message: str, timestamp: str) -> str:
+        """Encoded chat broadcast for a message from this session."""
+        return f'{self.chat_prefix}{_encode(message)},"timestamp":{_encode(timestamp)}}}'
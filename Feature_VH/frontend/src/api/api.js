@@ -53,7 +53,9 @@ export const patientAPI = {
 };
 
 export const appointmentAPI = {
-    getAll: () => api.get('/appointments/'),
+    getAll: (params) => api.get('/appointments/', { params }),
+    getPage: (url) => api.get(url),
+    getSummary: () => api.get('/appointments/summary/'),
     create: (data) => api.post('/appointments/', data),
     updateStatus: (id, status) => api.patch(`/appointments/${id}/`, { status }),
 };
@@ -68,7 +70,8 @@ export const adminAPI = {
 };
 
 export const chatAPI = {
-    getMessages: (appointmentId) => api.get(`/chat/${appointmentId}/`),
+    getMessages: (appointmentId, params) => api.get(`/chat/${appointmentId}/`, { params }),
+    getPage: (url) => api.get(url),
     sendMessage: (appointmentId, data) => api.post(`/chat/${appointmentId}/`, data),
 };
 
@@ -77,6 +80,13 @@ export const recordingAPI = {
     upload: (data) => api.post('/recordings/', data, {
         headers: { 'Content-Type': 'multipart/form-data' }
     }),
+    // Chunked, resumable uploads
+    startUpload: (data) => api.post('/recordings/uploads/', data),
+    getUpload: (uploadId) => api.get(`/recordings/uploads/${uploadId}/`),
+    uploadChunk: (uploadId, offset, chunk) => api.patch(`/recordings/uploads/${uploadId}/`, chunk, {
+        headers: { 'Content-Type': 'application/octet-stream', 'Upload-Offset': offset }
+    }),
+    finalizeUpload: (uploadId) => api.post(`/recordings/uploads/${uploadId}/finalize/`),
 };
 
 export const prescriptionAPI = {
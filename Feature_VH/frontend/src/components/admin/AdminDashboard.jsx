@@ -32,7 +32,7 @@ const AdminDashboard = () => {
     description: ''
   });
 
-  const { appointments, fetchAppointments } = useAppointmentStore();
+  const { appointments, nextCursor, isLoading, fetchAppointments, fetchMore } = useAppointmentStore();
 
   useEffect(() => {
     fetchAppointments();
@@ -549,6 +549,18 @@ const AdminDashboard = () => {
                   ))}
                 </tbody>
               </table>
+              {nextCursor && (
+                <div className="flex justify-center py-3">
+                  <button
+                    type="button"
+                    onClick={fetchMore}
+                    disabled={isLoading}
+                    className="text-xs text-teal-600 hover:text-teal-700 font-semibold disabled:opacity-50"
+                  >
+                    Load more appointments
+                  </button>
+                </div>
+              )}
             </div>
           </motion.div>
         )}
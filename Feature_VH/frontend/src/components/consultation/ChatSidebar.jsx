@@ -10,7 +10,9 @@ const ChatSidebar = () => {
   const [newMessage, setNewMessage] = useState('');
   const messagesEndRef = useRef(null);
 
-  const { messages, isConnected, connect, disconnect, sendMessage, loadHistory } = useChatStore();
+  const {
+    messages, isConnected, olderCursor, connect, disconnect, sendMessage, loadHistory, loadOlder,
+  } = useChatStore();
   const user = useAuthStore((state) => state.user);
 
   useEffect(() => {
@@ -58,6 +60,17 @@ const ChatSidebar = () => {
 
       {/* Messages */}
       <div className="flex-1 overflow-y-auto p-6 space-y-4">
+        {olderCursor && (
+          <div className="flex justify-center">
+            <button
+              type="button"
+              onClick={loadOlder}
+              className="text-xs text-teal-600 hover:text-teal-700 font-semibold"
+            >
+              Load earlier messages
+            </button>
+          </div>
+        )}
         {messages.map((message) => (
           <motion.div
             key={message.id}
@@ -1,4 +1,4 @@
-import { useState } from 'react';
+import { useState, useEffect } from 'react';
 import { motion } from 'framer-motion';
 import { Calendar, Users, Clock, TrendingUp, FileText } from 'lucide-react';
 import useAppointmentStore from '../../store/appointmentStore';
@@ -8,13 +8,17 @@ import Footer from '../shared/Footer';
 
 const DoctorDashboard = () => {
   const [activeTab, setActiveTab] = useState('appointments');
-  const { appointments, updateAppointmentStatus } = useAppointmentStore();
+  const {
+    appointments, summary, nextCursor, isLoading, fetchAppointments, fetchMore, updateAppointmentStatus,
+  } = useAppointmentStore();
 
+  useEffect(() => {
+    fetchAppointments();
+  }, [fetchAppointments]);
+
+  // Lists show the loaded pages; counts come from the server and cover them all
   const pendingAppointments = appointments.filter(apt => apt.status === 'pending');
   const approvedAppointments = appointments.filter(apt => apt.status === 'approved');
-  const todayAppointments = appointments.filter(apt => 
-    new Date(apt.date).toDateString() === new Date().toDateString()
-  );
 
   const handleApprove = (id) => {
     updateAppointmentStatus(id, 'approved');
@@ -27,7 +31,7 @@ const DoctorDashboard = () => {
   const stats = [
     {
       title: "Today's Appointments",
-      value: todayAppointments.length,
+      value: summary?.today ?? 0,
       icon: Calendar,
       color: "bg-blue-500",
       bgLight: "bg-blue-100",
@@ -35,7 +39,7 @@ const DoctorDashboard = () => {
     },
     {
       title: "Pending Requests",
-      value: pendingAppointments.length,
+      value: summary?.pending ?? 0,
       icon: Clock,
       color: "bg-yellow-500",
       bgLight: "bg-yellow-100",
@@ -43,15 +47,15 @@ const DoctorDashboard = () => {
     },
     {
       title: "Total Patients",
-      value: appointments.length,
+      value: summary?.patients ?? 0,
       icon: Users,
       color: "bg-teal-500",
       bgLight: "bg-teal-100",
       textColor: "text-teal-600"
     },
     {
-      title: "Approved Today",
-      value: approvedAppointments.length,
+      title: "Approved",
+      value: summary?.approved ?? 0,
       icon: TrendingUp,
       color: "bg-green-500",
       bgLight: "bg-green-100",
@@ -151,7 +155,7 @@ const DoctorDashboard = () => {
             {pendingAppointments.length > 0 && (
               <div className="mb-8">
                 <h2 className="text-2xl font-bold text-navy-900 mb-4">
-                  Pending Requests ({pendingAppointments.length})
+                  Pending Requests ({summary?.pending ?? pendingAppointments.length})
                 </h2>
                 <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-6">
                   {pendingAppointments.map((appointment) => (
@@ -170,7 +174,7 @@ const DoctorDashboard = () => {
             {approvedAppointments.length > 0 && (
               <div>
                 <h2 className="text-2xl font-bold text-navy-900 mb-4">
-                  Upcoming Appointments ({approvedAppointments.length})
+                  Upcoming Appointments ({summary?.approved ?? approvedAppointments.length})
                 </h2>
                 <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-6">
                   {approvedAppointments.map((appointment) => (
@@ -193,6 +197,19 @@ const DoctorDashboard = () => {
                 <p className="text-navy-600">New appointment requests will appear here</p>
               </div>
             )}
+
+            {nextCursor && (
+              <div className="flex justify-center mt-8">
+                <button
+                  type="button"
+                  onClick={fetchMore}
+                  disabled={isLoading}
+                  className="btn-secondary disabled:opacity-50"
+                >
+                  Load more appointments
+                </button>
+              </div>
+            )}
           </motion.div>
         )}
 
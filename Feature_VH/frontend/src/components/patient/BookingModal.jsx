@@ -15,7 +15,7 @@ const BookingModal = ({ doctor, isOpen, onClose }) => {
     type: 'video'
   });
 
-  const handleSubmit = (e) => {
+  const handleSubmit = async (e) => {
     e.preventDefault();
 
     const appointment = {
@@ -27,7 +27,11 @@ const BookingModal = ({ doctor, isOpen, onClose }) => {
       ...formData
     };
 
-    addAppointment(appointment);
+    const booked = await addAppointment(appointment);
+    if (!booked) {
+      alert(useAppointmentStore.getState().error);
+      return;
+    }
     alert('Appointment request submitted successfully!');
     onClose();
   };
@@ -137,6 +141,7 @@ const BookingModal = ({ doctor, isOpen, onClose }) => {
                       id="time"
                       name="time"
                       type="time"
+                      step="1800"
                       required
                       value={formData.time}
                       onChange={(e) => setFormData({ ...formData, time: e.target.value })}
@@ -9,7 +9,7 @@ import Footer from '../shared/Footer';
 
 const PatientOverview = () => {
     const { user } = useAuthStore();
-    const { appointments, fetchAppointments } = useAppointmentStore();
+    const { appointments, summary, nextCursor, isLoading, fetchAppointments, fetchMore } = useAppointmentStore();
 
     useEffect(() => {
         fetchAppointments();
@@ -63,7 +63,7 @@ const PatientOverview = () => {
                                 <h2 className="text-base font-semibold text-navy-900">Your appointments</h2>
                             </div>
                             <span className="badge-info text-xs">
-                                {upcomingAppointments.length} upcoming
+                                {summary?.upcoming ?? upcomingAppointments.length} upcoming
                             </span>
                         </div>
                         {upcomingAppointments.length === 0 ? (
@@ -91,6 +91,16 @@ const PatientOverview = () => {
                                 ))}
                             </ul>
                         )}
+                        {nextCursor && (
+                            <button
+                                type="button"
+                                onClick={fetchMore}
+                                disabled={isLoading}
+                                className="mt-3 text-xs text-teal-600 hover:text-teal-700 font-semibold disabled:opacity-50"
+                            >
+                                Load older appointments
+                            </button>
+                        )}
                     </motion.div>
 
                     {/* Medical History */}
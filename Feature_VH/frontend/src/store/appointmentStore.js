@@ -1,27 +1,103 @@
 import { create } from 'zustand';
 import { appointmentAPI } from '../api/api';
 
-const useAppointmentStore = create((set) => ({
+// Map API response to frontend structure
+const toAppointment = (apt) => ({
+  ...apt,
+  patientName: apt.patient?.user ? `${apt.patient.user.first_name} ${apt.patient.user.last_name}` : 'Unknown Patient',
+  doctorName: apt.doctor?.user ? `Dr. ${apt.doctor.user.first_name} ${apt.doctor.user.last_name}` : 'Unknown Doctor',
+});
+
+// Newest `updated_at` seen, used as the `since` watermark of the next refresh
+const latestUpdate = (rows, current) => rows.reduce(
+  (latest, apt) => (apt.updated_at && (!latest || new Date(apt.updated_at) > new Date(latest)) ? apt.updated_at : latest),
+  current,
+);
+
+const useAppointmentStore = create((set, get) => ({
   appointments: [],
+  // Server-side counts over every appointment, not just the loaded pages
+  summary: null,
+  nextCursor: null,
+  syncedAt: null,
   isLoading: false,
   error: null,
 
+  /**
+   * Load the newest page of appointments, or on later calls only the
+   * appointments changed since the last load. Older pages are fetched on
+   * demand with fetchMore.
+   */
   fetchAppointments: async () => {
     set({ isLoading: true });
+    get().fetchSummary();
     try {
+      const { syncedAt } = get();
+      if (syncedAt) {
+        let response = await appointmentAPI.getAll({ since: syncedAt });
+        let changed = response.data.results;
+        while (response.data.next) {
+          response = await appointmentAPI.getPage(response.data.next);
+          changed = changed.concat(response.data.results);
+        }
+        const byId = new Map(changed.map(apt => [apt.id, toAppointment(apt)]));
+        set((state) => ({
+          appointments: [
+            ...changed.filter(apt => !state.appointments.some(known => known.id === apt.id)).map(apt => byId.get(apt.id)),
+            ...state.appointments.map(apt => byId.get(apt.id) || apt),
+          ],
+          syncedAt: latestUpdate(changed, syncedAt),
+          isLoading: false,
+        }));
+        return;
+      }
+
       const response = await appointmentAPI.getAll();
-      const data = response.data;
+      const data = response.data.results;
+      set({
+        appointments: data.map(toAppointment),
+        nextCursor: response.data.next,
+        syncedAt: latestUpdate(data, null),
+        isLoading: false,
+      });
+    } catch (error) {
+      console.error("Fetch appointments error:", error);
+      set({ error: error.message, isLoading: false });
+    }
+  },
 
-      // Map API response to frontend structure
-      const mappedData = data.map(apt => ({
-        ...apt,
-        patientName: apt.patient?.user ? `${apt.patient.user.first_name} ${apt.patient.user.last_name}` : 'Unknown Patient',
-        doctorName: apt.doctor?.user ? `Dr. ${apt.doctor.user.first_name} ${apt.doctor.user.last_name}` : 'Unknown Doctor',
-      }));
+  /**
+   * Refresh the appointment counts shown on the dashboards.
+   */
+  fetchSummary: async () => {
+    try {
+      const response = await appointmentAPI.getSummary();
+      set({ summary: response.data });
+    } catch (error) {
+      console.error("Fetch appointment summary error:", error);
+    }
+  },
 
-      set({ appointments: mappedData, isLoading: false });
+  /**
+   * Append the next (older) page of appointments.
+   */
+  fetchMore: async () => {
+    const cursor = get().nextCursor;
+    if (!cursor) return;
+    set({ isLoading: true });
+    try {
+      const response = await appointmentAPI.getPage(cursor);
+      const data = response.data.results;
+      set((state) => ({
+        appointments: state.appointments.concat(
+          data.filter(apt => !state.appointments.some(known => known.id === apt.id)).map(toAppointment)
+        ),
+        nextCursor: response.data.next,
+        syncedAt: latestUpdate(data, state.syncedAt),
+        isLoading: false,
+      }));
     } catch (error) {
-      console.error("Fetch appointments error:", error);
+      console.error("Fetch more appointments error:", error);
       set({ error: error.message, isLoading: false });
     }
   },
@@ -45,6 +121,7 @@ const useAppointmentStore = create((set) => ({
         appointments: [...state.appointments, newAppointment],
         isLoading: false
       }));
+      get().fetchSummary();
       return true;
     } catch (error) {
       console.error("Add appointment error:", error);
@@ -61,6 +138,7 @@ const useAppointmentStore = create((set) => ({
           apt.id === id ? { ...apt, status: newStatus } : apt
         )
       }));
+      get().fetchSummary();
       return true;
     } catch (error) {
       console.error("Update appointment status error:", error);
@@ -68,6 +146,11 @@ const useAppointmentStore = create((set) => ({
     }
   },
 
+  /**
+   * Forget loaded appointments and sync state (e.g. on logout).
+   */
+  reset: () => set({ appointments: [], summary: null, nextCursor: null, syncedAt: null, error: null }),
+
   getAppointmentsByStatus: (status) => {
     return (state) => state.appointments.filter(apt => apt.status === status);
   }
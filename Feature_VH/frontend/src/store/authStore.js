@@ -1,5 +1,6 @@
 import { create } from 'zustand';
 import { authAPI } from '../api/api';
+import useAppointmentStore from './appointmentStore';
 
 const useAuthStore = create((set) => ({
   user: null,
@@ -64,6 +65,7 @@ const useAuthStore = create((set) => ({
 
   logout: () => {
     localStorage.removeItem('token');
+    useAppointmentStore.getState().reset();
     set({
       user: null,
       isAuthenticated: false,
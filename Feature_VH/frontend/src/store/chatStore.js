@@ -3,33 +3,79 @@ import { chatAPI } from '../api/api';
 
 const WS_URL = import.meta.env.VITE_WS_URL || 'ws://localhost:8001';
 
+const toMessage = (msg) => ({
+    id: msg.id,
+    persisted: true,
+    sender: msg.sender_role,
+    senderName: msg.sender_name,
+    senderId: msg.sender,
+    text: msg.message,
+    time: new Date(msg.timestamp).toLocaleTimeString([], { hour: '2-digit', minute: '2-digit' }),
+});
+
 const useChatStore = create((set, get) => ({
     messages: [],
     isConnected: false,
     ws: null,
     error: null,
+    appointmentId: null,
+    lastId: null,
+    olderCursor: null,
 
     /**
      * Load chat history from REST API.
+     *
+     * The first visit to a room loads only the newest page; returning to the
+     * same room fetches just the messages after the last one already held.
      */
     loadHistory: async (appointmentId) => {
         try {
-            const response = await chatAPI.getMessages(appointmentId);
+            const { appointmentId: current, lastId } = get();
+            if (current === appointmentId && lastId) {
+                let response = await chatAPI.getMessages(appointmentId, { since: lastId });
+                let newer = response.data.results;
+                while (response.data.next) {
+                    response = await chatAPI.getPage(response.data.next);
+                    newer = newer.concat(response.data.results);
+                }
+                // Persisted copies replace the live frames received meanwhile
+                set((state) => ({
+                    messages: state.messages.filter(msg => msg.persisted).concat(newer.map(toMessage)),
+                    lastId: newer.length ? newer[newer.length - 1].id : lastId,
+                }));
+                return;
+            }
+
+            const response = await chatAPI.getMessages(appointmentId, { latest: 1 });
+            const history = response.data.results;
             set({
-                messages: response.data.map(msg => ({
-                    id: msg.id,
-                    sender: msg.sender_role,
-                    senderName: msg.sender_name,
-                    senderId: msg.sender,
-                    text: msg.message,
-                    time: new Date(msg.timestamp).toLocaleTimeString([], { hour: '2-digit', minute: '2-digit' }),
-                }))
+                appointmentId,
+                messages: history.map(toMessage),
+                lastId: history.length ? history[history.length - 1].id : null,
+                olderCursor: response.data.next,
             });
         } catch (error) {
             console.error('Failed to load chat history:', error);
         }
     },
 
+    /**
+     * Prepend the page of messages before the oldest one loaded.
+     */
+    loadOlder: async () => {
+        const cursor = get().olderCursor;
+        if (!cursor) return;
+        try {
+            const response = await chatAPI.getPage(cursor);
+            set((state) => ({
+                messages: response.data.results.map(toMessage).concat(state.messages),
+                olderCursor: response.data.next,
+            }));
+        } catch (error) {
+            console.error('Failed to load older messages:', error);
+        }
+    },
+
     /**
      * Connect to WebSocket chat room.
      */
@@ -100,11 +146,18 @@ const useChatStore = create((set, get) => ({
 
     /**
      * Disconnect from chat.
+     *
+     * Persisted messages are kept so the next loadHistory of the same room
+     * only asks for what was sent in between.
      */
     disconnect: () => {
         const ws = get().ws;
         if (ws) ws.close();
-        set({ ws: null, isConnected: false, messages: [] });
+        set((state) => ({
+            ws: null,
+            isConnected: false,
+            messages: state.messages.filter(msg => msg.persisted),
+        }));
     },
 }));
 
@@ -3,6 +3,8 @@ import { recordingAPI } from '../api/api';
 
 const MAX_SIZE_MB = 50;
 const MAX_SIZE_BYTES = MAX_SIZE_MB * 1024 * 1024;
+const CHUNK_SIZE = 4 * 1024 * 1024;
+const MAX_CHUNK_RETRIES = 5;
 
 const useRecordingStore = create((set, get) => ({
     isRecording: false,
@@ -96,12 +98,31 @@ const useRecordingStore = create((set, get) => ({
 
         try {
             const duration = startTime ? Math.round((Date.now() - startTime) / 1000) : 0;
-            const formData = new FormData();
-            formData.append('recording_file', recordingBlob, `call_${appointmentId}_${Date.now()}.webm`);
-            formData.append('appointment', appointmentId);
-            formData.append('duration_seconds', duration);
+            const { data: upload } = await recordingAPI.startUpload({
+                appointment: appointmentId,
+                filename: `call_${appointmentId}_${Date.now()}.webm`,
+                total_size: recordingBlob.size,
+                duration_seconds: duration,
+            });
+
+            // Send fixed-size chunks; after a failure ask the server where to resume
+            let offset = upload.offset;
+            let retries = 0;
+            while (offset < recordingBlob.size) {
+                try {
+                    const chunk = recordingBlob.slice(offset, offset + CHUNK_SIZE);
+                    const response = await recordingAPI.uploadChunk(upload.id, offset, chunk);
+                    offset = response.data.offset;
+                    retries = 0;
+                    set({ uploadProgress: Math.round((offset / recordingBlob.size) * 100) });
+                } catch (chunkError) {
+                    if (++retries > MAX_CHUNK_RETRIES) throw chunkError;
+                    const { data: status } = await recordingAPI.getUpload(upload.id);
+                    offset = status.offset;
+                }
+            }
 
-            await recordingAPI.upload(formData);
+            await recordingAPI.finalizeUpload(upload.id);
 
             set({ isUploading: false, uploadProgress: 100, error: null });
             return true;